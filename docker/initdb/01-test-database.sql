@@ -0,0 +1,2 @@
+-- Base dédiée aux tests (tests/test_query_plans.py), séparée de botdb
+CREATE DATABASE botdb_test OWNER botuser;
@@ -0,0 +1,99 @@
+"""
+Benchmark de l'échange des patterns jsonb
+
+Compare l'ancien échange en texte (json.dumps, cast ::jsonb, json.loads à
+la lecture) au codec binaire orjson enregistré sur les connexions du pool,
+pour des patterns de 256×256 pixels. Les mesures sont faites sur une table
+temporaire, les données réelles ne sont jamais modifiées.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_jsonb.py
+"""
+import asyncio
+import json
+import random
+import time
+from src.database.codecs import register_codecs
+from src.database.database import Database
+from src.utils.config import load_config
+
+SIZE = 256
+PALETTE_SIZE = 32
+SHAPES = 400
+ROWS = 20
+
+
+def make_pattern(size: int) -> dict:
+    """
+    Pixel art synthétique : rectangles de couleurs d'une palette sur un fond,
+    sous forme de lignes de couleurs hexadécimales
+    """
+    palette = [f"#{random.randrange(0x1000000):06x}" for _ in range(PALETTE_SIZE)]
+    pixels = [[palette[0]] * size for _ in range(size)]
+    for _ in range(SHAPES):
+        color = random.choice(palette)
+        x, y = random.randrange(size), random.randrange(size)
+        width, height = random.randint(1, size // 8), random.randint(1, size // 8)
+        for row in pixels[y:y + height]:
+            row[x:x + width] = [color] * len(row[x:x + width])
+    return {'width': size, 'height': size, 'pixels': pixels}
+
+
+async def setup_patterns(conn) -> None:
+    await conn.execute("""
+        DROP TABLE IF EXISTS pg_temp.patterns;
+        CREATE TEMP TABLE patterns (id SERIAL PRIMARY KEY, json_data JSONB NOT NULL);
+    """)
+
+
+async def text(conn, patterns: list) -> tuple:
+    await conn.reset_type_codec('jsonb', schema='pg_catalog')
+    start = time.perf_counter()
+    await conn.executemany(
+        "INSERT INTO patterns (json_data) VALUES ($1::jsonb)",
+        [(json.dumps(pattern),) for pattern in patterns]
+    )
+    written = time.perf_counter()
+    rows = await conn.fetch("SELECT json_data FROM patterns ORDER BY id")
+    decoded = [json.loads(row['json_data']) for row in rows]
+    return written - start, time.perf_counter() - written, decoded
+
+
+async def binary(conn, patterns: list) -> tuple:
+    await register_codecs(conn)
+    start = time.perf_counter()
+    await conn.executemany(
+        "INSERT INTO patterns (json_data) VALUES ($1)",
+        [(pattern,) for pattern in patterns]
+    )
+    written = time.perf_counter()
+    rows = await conn.fetch("SELECT json_data FROM patterns ORDER BY id")
+    decoded = [row['json_data'] for row in rows]
+    return written - start, time.perf_counter() - written, decoded
+
+
+async def measure(conn, exchange, patterns: list) -> tuple:
+    await setup_patterns(conn)
+    write, read, decoded = await exchange(conn, patterns)
+    assert decoded == patterns
+    return write, read
+
+
+async def main():
+    patterns = [make_pattern(SIZE) for _ in range(ROWS)]
+    size = len(json.dumps(patterns[0]))
+    db = await Database.create(load_config())
+    try:
+        async with db.pool.acquire() as conn:
+            print(f"{ROWS} patterns {SIZE}×{SIZE} ({size / 1024:.0f} Kio en JSON)")
+            print(f"{'Méthode':<10} {'Écriture (ms)':>14} {'Lecture (ms)':>14}")
+            for name, exchange in (("texte", text), ("binaire", binary)):
+                write, read = await measure(conn, exchange, patterns)
+                print(f"{name:<10} {write * 1000:>14.1f} {read * 1000:>14.1f}")
+            await conn.execute("DROP TABLE pg_temp.patterns")
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
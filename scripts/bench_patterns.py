@@ -0,0 +1,86 @@
+"""
+Benchmark du stockage des patterns
+
+Compare, pour des patterns de 256×256 pixels, le stockage en jsonb au
+format compact (palette et grille d'indices compressée) : taille en base,
+temps d'écriture et temps de lecture jusqu'à un objet utilisable (document
+JSON ou tableau numpy). Les mesures sont faites sur une table temporaire,
+les données réelles ne sont jamais modifiées.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_patterns.py
+"""
+import asyncio
+import time
+from scripts.bench_jsonb import ROWS, SIZE, make_pattern
+from src.database.database import Database
+from src.utils.config import load_config
+from src.utils.patterns import parse_pattern, pattern_columns, pattern_from_record, to_document
+
+
+async def setup_patterns(conn) -> None:
+    await conn.execute("""
+        DROP TABLE IF EXISTS pg_temp.patterns;
+        CREATE TEMP TABLE patterns (
+            id SERIAL PRIMARY KEY,
+            json_data JSONB,
+            pattern_width INTEGER,
+            pattern_height INTEGER,
+            pattern_palette JSONB,
+            pattern_pixels BYTEA,
+            pattern_meta JSONB
+        );
+        ALTER TABLE patterns ALTER COLUMN pattern_pixels SET STORAGE EXTERNAL;
+    """)
+
+
+async def write_json(conn, documents: list) -> None:
+    await conn.executemany(
+        "INSERT INTO patterns (json_data) VALUES ($1)",
+        [(document,) for document in documents]
+    )
+
+
+async def write_compact(conn, documents: list) -> None:
+    await conn.executemany("""
+        INSERT INTO patterns (pattern_width, pattern_height, pattern_palette, pattern_pixels, pattern_meta)
+        VALUES ($1, $2, $3, $4, $5)
+    """, [pattern_columns(parse_pattern(document)) for document in documents])
+
+
+async def read(conn) -> list:
+    rows = await conn.fetch("SELECT * FROM patterns ORDER BY id")
+    return [row['json_data'] if row['pattern_pixels'] is None else pattern_from_record(row) for row in rows]
+
+
+async def measure(conn, write, documents: list) -> tuple:
+    await setup_patterns(conn)
+    start = time.perf_counter()
+    await write(conn, documents)
+    written = time.perf_counter()
+    results = await read(conn)
+    elapsed = time.perf_counter() - written
+    size = await conn.fetchval("SELECT sum(pg_column_size(patterns.*)) FROM patterns")
+    return size, written - start, elapsed, results
+
+
+async def main():
+    documents = [make_pattern(SIZE) for _ in range(ROWS)]
+    db = await Database.create(load_config())
+    try:
+        async with db.pool.acquire() as conn:
+            print(f"{ROWS} patterns {SIZE}×{SIZE}")
+            print(f"{'Format':<10} {'Taille (Kio)':>14} {'Écriture (ms)':>14} {'Lecture (ms)':>14}")
+            for name, write in (("jsonb", write_json), ("compact", write_compact)):
+                size, write_time, read_time, results = await measure(conn, write, documents)
+                print(f"{name:<10} {size / 1024:>14.0f} {write_time * 1000:>14.1f} {read_time * 1000:>14.1f}")
+
+            # Le format compact doit restituer exactement les documents d'origine
+            assert [to_document(pattern) for pattern in results] == documents
+            await conn.execute("DROP TABLE pg_temp.patterns")
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Benchmark de l'enregistrement des décomptes de votes
+
+Compare l'ancienne écriture ligne par ligne à l'écriture groupée de
+VoteService.save_vote_counts pour 10, 1 000 et 10 000 votes actifs.
+Les mesures sont faites sur une table temporaire qui masque `votes`,
+les données réelles ne sont donc jamais modifiées.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_vote_counts.py
+"""
+import asyncio
+import random
+import time
+from src.database.database import Database
+from src.services.vote_service import VoteService
+from src.utils.config import load_config
+
+SIZES = (10, 1_000, 10_000)
+
+
+async def setup_votes(conn, size: int) -> dict:
+    await conn.execute("""
+        DROP TABLE IF EXISTS pg_temp.votes;
+        CREATE TEMP TABLE votes (LIKE votes INCLUDING ALL);
+    """)
+    await conn.execute("""
+        INSERT INTO votes (title, image_name, created_by, session_id, message_id, vote_count)
+        SELECT 'bench', 'bench.png', 0, 1, n, 0
+        FROM generate_series(1, $1) AS n
+    """, size)
+    await conn.execute("ANALYZE votes")
+    return {message_id: random.randint(1, 100) for message_id in range(1, size + 1)}
+
+
+async def per_row(conn, vote_counts: dict) -> None:
+    for message_id, vote_count in vote_counts.items():
+        await conn.execute("""
+            UPDATE votes
+            SET vote_count = $1, updated_at = CURRENT_TIMESTAMP
+            WHERE message_id = $2
+        """, vote_count, message_id)
+
+
+async def batched(conn, vote_counts: dict) -> None:
+    await VoteService.save_vote_counts(conn, vote_counts)
+
+
+async def measure(conn, write, vote_counts: dict) -> tuple:
+    queries = []
+    conn.add_query_logger(queries.append)
+    start = time.perf_counter()
+    await write(conn, vote_counts)
+    elapsed = time.perf_counter() - start
+    # asyncpg appelle les loggers via call_soon : les laisser passer avant de compter
+    await asyncio.sleep(0)
+    conn.remove_query_logger(queries.append)
+    return len(queries), elapsed
+
+
+async def main():
+    db = await Database.create(load_config())
+    try:
+        async with db.pool.acquire() as conn:
+            # Préparation des requêtes (et introspection des types tableau) hors mesure
+            await setup_votes(conn, 1)
+            for write in (per_row, batched):
+                await write(conn, {0: 0})
+
+            print(f"{'Votes':>8} {'Méthode':<10} {'Allers-retours':>15} {'Temps (ms)':>12}")
+            for size in SIZES:
+                for name, write in (("ligne", per_row), ("groupé", batched)):
+                    vote_counts = await setup_votes(conn, size)
+                    round_trips, elapsed = await measure(conn, write, vote_counts)
+                    print(f"{size:>8} {name:<10} {round_trips:>15} {elapsed * 1000:>12.1f}")
+
+                # Un second passage sans changement ne doit rien réécrire
+                changed = await VoteService.save_vote_counts(conn, vote_counts)
+                print(f"{size:>8} {'inchangé':<10} {'1':>15} {'(' + str(changed) + ' lignes)':>12}")
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
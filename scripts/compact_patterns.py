@@ -0,0 +1,79 @@
+"""
+Conversion des patterns JSON existants au format compact
+
+Les grilles de pixels de votes.json_data et votes_pattern.json_data sont
+décomposées en palette et grille d'indices compressée (colonnes pattern_*),
+puis json_data est vidé. Les documents qui ne sont pas des grilles de
+pixels, ou que le format compact ne restitue pas à l'identique, restent en
+JSON. Le script peut être relancé sans risque.
+
+Usage:
+    PYTHONPATH=. python scripts/compact_patterns.py
+"""
+import asyncio
+import sys
+from src.database.database import Database
+from src.utils.config import load_config
+from src.utils.patterns import available, matches_document, parse_pattern, pattern_columns
+
+TABLES = ('votes', 'votes_pattern')
+BATCH_SIZE = 100
+
+
+async def compact_table(conn, table: str) -> int:
+    compacted = 0
+    last_id = 0
+    while True:
+        rows = await conn.fetch(f"""
+            SELECT id, json_data
+            FROM {table}
+            WHERE id > $1 AND json_data IS NOT NULL AND pattern_pixels IS NULL
+            ORDER BY id
+            LIMIT $2
+        """, last_id, BATCH_SIZE)
+        if not rows:
+            return compacted
+        last_id = rows[-1]['id']
+
+        updates = []
+        for row in rows:
+            pattern = parse_pattern(row['json_data'])
+            if pattern is None:
+                continue
+            # json_data n'est vidé que si le document est restitué à l'identique
+            if not matches_document(pattern, row['json_data']):
+                print(f"{table} #{row['id']}: conversion non fidèle, ignoré", file=sys.stderr)
+                continue
+            updates.append((row['id'], *pattern_columns(pattern)))
+
+        await conn.executemany(f"""
+            UPDATE {table}
+            SET pattern_width = $2,
+                pattern_height = $3,
+                pattern_palette = $4,
+                pattern_pixels = $5,
+                pattern_meta = $6,
+                json_data = NULL
+            WHERE id = $1
+        """, updates)
+        compacted += len(updates)
+
+
+async def main() -> int:
+    if not available():
+        print("numpy et zstandard sont nécessaires", file=sys.stderr)
+        return 1
+
+    db = await Database.create(load_config())
+    try:
+        async with db.pool.acquire() as conn:
+            for table in TABLES:
+                compacted = await compact_table(conn, table)
+                print(f"{table}: {compacted} patterns convertis")
+        return 0
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
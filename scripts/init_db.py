@@ -1,11 +1,11 @@
 import asyncio
-import asyncpg
-from src.database.database import get_connection
+from src.database.database import Database
+from src.utils.config import load_config
 
 async def init_database():
-    conn = await get_connection()
-    # Créer les tables
-    await conn.close()
+    # Créer les tables en appliquant les migrations manquantes
+    db = await Database.create(load_config())
+    await db.close()
 
 if __name__ == "__main__":
     asyncio.run(init_database())
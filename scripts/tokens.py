@@ -0,0 +1,61 @@
+"""
+Import et export en masse des tokens
+
+L'import lit un fichier CSV (avec en-tête) ou JSONL contenant les colonnes
+discord_user_id, access_token, refresh_token, valid_token et expires_at, et
+remplace les tokens des utilisateurs déjà enregistrés. L'export produit un
+fichier relisible par l'import, valeurs des tokens comprises : à conserver
+en lieu sûr.
+
+Usage:
+    PYTHONPATH=. python scripts/tokens.py import tokens.jsonl
+    PYTHONPATH=. python scripts/tokens.py export tokens.csv
+"""
+import argparse
+import asyncio
+import sys
+import time
+from src.database.database import Database
+from src.services.token_service import TokenService
+from src.utils.config import load_config
+from src.utils.token_files import read_token_records, token_file_format
+
+
+async def import_tokens(token_service: TokenService, path: str, format: str) -> bool:
+    with open(path, newline='', encoding='utf-8') as file:
+        imported = await token_service.import_tokens(read_token_records(file, format))
+    if imported < 0:
+        return False
+    print(f"{imported} tokens importés")
+    return True
+
+
+async def export_tokens(token_service: TokenService, path: str, format: str) -> bool:
+    with open(path, 'wb') as output:
+        return await token_service.export_tokens(output, format)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Import et export en masse des tokens")
+    parser.add_argument('action', choices=('import', 'export'))
+    parser.add_argument('path', help="Fichier .csv ou .jsonl")
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help="Par défaut selon l'extension")
+    args = parser.parse_args()
+    format = args.format or token_file_format(args.path)
+
+    db = await Database.create(load_config())
+    try:
+        token_service = TokenService(db.pool)
+        start = time.perf_counter()
+        action = import_tokens if args.action == 'import' else export_tokens
+        if not await action(token_service, args.path, format):
+            print("Échec, voir les logs", file=sys.stderr)
+            return 1
+        print(f"Terminé en {time.perf_counter() - start:.1f} s")
+        return 0
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
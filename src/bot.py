@@ -1,9 +1,20 @@
 import os
+from datetime import timedelta
 from typing import Optional
 import discord
 from discord.ext import commands
 from discord import app_commands
-from src.database import Database
+from src.database import Database, queries
+from src.services.channel_service import ChannelService
+from src.services.private_channel_service import PrivateChannelService
+from src.services.chat_expiry_service import ChatExpiryScheduler
+from src.services.token_service import TokenService
+from src.services.token_refresh_service import TokenRefresher
+from src.services.token_lease_service import TokenLeasePool
+from src.services.token_validation_service import TokenValidator
+from src.services.token_invalidation_service import TokenInvalidator
+from src.utils.helpers import get_channel_role
+from src.utils.jobs import start_job
 from src.utils.logger import get_logger
 from src.utils.config import Config
 
@@ -31,6 +42,14 @@ class PixelBot(commands.Bot):
         self.config = config
         self.logger = get_logger(__name__)
         self.db: Optional[Database] = None
+        self.channel_index: Optional[ChannelService] = None
+        self.private_channels: Optional[PrivateChannelService] = None
+        self.chat_expiry: Optional[ChatExpiryScheduler] = None
+        self.token_service: Optional[TokenService] = None
+        self.token_refresher: Optional[TokenRefresher] = None
+        self.token_leases: Optional[TokenLeasePool] = None
+        self.token_validator: Optional[TokenValidator] = None
+        self.token_invalidator: Optional[TokenInvalidator] = None
 
     async def setup_hook(self) -> None:
         """Configuration initiale du bot"""
@@ -40,10 +59,74 @@ class PixelBot(commands.Bot):
             # Initialiser la base de données
             self.db = await Database.create(self.config)
             self.logger.info("Database initialized successfully")
+
+            # Service des tokens partagé par les cogs, pour un cache unique
+            tokens_config = self.config.get('tokens')
+            self.token_service = TokenService(
+                self.db.pool,
+                cache_size=tokens_config.get('cache_size', 10000) if tokens_config else 10000,
+                cache_ttl=tokens_config.get('cache_ttl', 300) if tokens_config else 300,
+                batch_reads=tokens_config.get('batch_reads', False) if tokens_config else False
+            )
+
+            # Rafraîchir les tokens si un endpoint OAuth est configuré
+            oauth_config = self.config.get('oauth')
+            token_url = oauth_config.get('token_url') if oauth_config else None
+            if token_url and not token_url.startswith("${"):
+                self.token_refresher = TokenRefresher(self.token_service, oauth_config)
+                self.token_refresher.start()
+
+            # Invalidation par tranches, reprise si le bot s'est arrêté en cours
+            invalidation_config = self.config.get('invalidation')
+            self.token_invalidator = TokenInvalidator(
+                self.token_service,
+                self.db.pool,
+                chunk_size=invalidation_config.get('chunk_size', 1000) if invalidation_config else 1000,
+                delay=invalidation_config.get('delay_seconds', 0.1) if invalidation_config else 0.1
+            )
+            if await self.token_invalidator.get_state():
+                self.logger.info("Reprise de l'invalidation des tokens interrompue")
+                start_job(self.token_invalidator.run(), name="invalidate-all")
+
+            # Vérification des tokens si un endpoint de validation est configuré
+            validation_config = self.config.get('validation')
+            validation_url = validation_config.get('url') if validation_config else None
+            if validation_url and not validation_url.startswith("${"):
+                self.token_validator = TokenValidator(self.token_service, validation_config)
+
+            # Pool de baux pour les workers utilisant les tokens
+            leases_config = self.config.get('leases')
+            if leases_config and leases_config.get('enabled', False):
+                self.token_leases = TokenLeasePool(
+                    self.token_service,
+                    lease_duration=leases_config.get('lease_seconds', 60),
+                    cooldown=leases_config.get('cooldown_seconds', 5),
+                    quota=leases_config.get('quota'),
+                    quota_window=leases_config.get('quota_window_seconds', 3600)
+                )
+                await self.token_leases.load()
+
+            # Charger l'index des salons gérés par le bot
+            self.channel_index = ChannelService(self.db.pool)
+            await self.channel_index.load()
+            self.private_channels = PrivateChannelService(self.db.pool)
+
+            # Planifier l'expiration des chats privés
+            chat_config = self.config.get('chat')
+            ttl_hours = chat_config.get('ttl_hours', 24) if chat_config else 24
+            self.chat_expiry = ChatExpiryScheduler(self, self.db.pool, timedelta(hours=ttl_hours))
+            self.chat_expiry.start()
             
             # Charger les extensions
             await self.load_extensions()
             self.logger.info("Extensions loaded successfully")
+
+            # Préparer les connexions avant la connexion à Discord
+            await self.db.pool.warm_up([
+                (queries.USER_TOKENS, (0,)),
+                (queries.PRIVATE_CHANNEL, (0, 0)),
+                (queries.PRIVATE_CHANNEL_OWNER, (0,))
+            ])
         except Exception as e:
             self.logger.error(f"Error during bot initialization: {e}")
             raise
@@ -90,10 +173,40 @@ class PixelBot(commands.Bot):
             self.logger.error(f"Error loading extensions: {e}")
             raise
 
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        """Retire de l'index les salons supprimés"""
+        if self.channel_index:
+            await self.channel_index.remove_channel(channel.id)
+        if self.private_channels and isinstance(channel, discord.TextChannel):
+            await self.private_channels.unregister(channel.id)
+        if self.chat_expiry:
+            self.chat_expiry.cancel(channel.id)
+
+    async def on_guild_channel_update(
+        self,
+        before: discord.abc.GuildChannel,
+        after: discord.abc.GuildChannel
+    ) -> None:
+        """Indexe un salon renommé pour remplacer un salon géré manquant"""
+        if not self.channel_index or before.name == after.name:
+            return
+
+        role = get_channel_role(after)
+        if not role or self.channel_index.get_role(after.id):
+            return
+
+        channel_id = self.channel_index.get_channel_id(after.guild.id, role)
+        if not channel_id or not after.guild.get_channel(channel_id):
+            await self.channel_index.set_channel(after.guild.id, role, after.id)
+
     async def close(self) -> None:
         """Nettoyage lors de la fermeture du bot"""
         self.logger.info("Shutting down bot...")
         try:
+            if self.chat_expiry:
+                await self.chat_expiry.stop()
+            if self.token_refresher:
+                await self.token_refresher.close()
             if self.db and hasattr(self.db, 'close'):
                 await self.db.close()
                 self.logger.info("Database connection closed")
@@ -1,15 +1,119 @@
+import tempfile
 import discord
 from discord import app_commands
 from discord.ext import commands
+from typing import List
+from src.database.queries import query_stats
 from src.utils.logger import get_logger
+from src.utils.helpers import PRIVATE_CATEGORY, get_last_activity
+from src.utils.jobs import start_job, run_bounded, ProgressMessage
+from src.utils.token_files import read_token_records, token_file_format
 from datetime import datetime, timedelta
 
+# Durée sans message après laquelle un chat privé est supprimé
+INACTIVITY_DELAY = timedelta(hours=24)
+# Suppressions simultanées et pause entre deux suppressions d'un même worker
+DELETE_CONCURRENCY = 3
+DELETE_DELAY = 0.5
+# Nombre de tokens affichés par page de /list-tokens
+TOKENS_PAGE_SIZE = 15
+# Nombre de lignes d'activité récente affichées par /stats
+RECENT_ACTIVITY_LIMIT = 20
+# Nombre de requêtes les plus coûteuses affichées par /stats
+SLOWEST_QUERIES_LIMIT = 5
+
+class TokenListView(discord.ui.View):
+    """Liste paginée des tokens, chargée une page à la fois"""
+
+    def __init__(self, cog: 'AdminCommands', user_id: int):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.user_id = user_id
+        self.rows = []
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.user_id
+
+    async def load(self, after=None, before=None) -> None:
+        """Charge la page suivant after, précédant before, ou la première page"""
+        # Une ligne de plus pour savoir s'il reste une page dans ce sens
+        rows = await self.cog.token_service.get_tokens_page(
+            TOKENS_PAGE_SIZE + 1, after=after, before=before
+        )
+        if not rows and (after is not None or before is not None):
+            # Lignes supprimées entre-temps : revenir à la première page
+            return await self.load()
+        if before is not None:
+            has_previous, has_next = len(rows) > TOKENS_PAGE_SIZE, True
+            rows = rows[-TOKENS_PAGE_SIZE:]
+        else:
+            has_previous, has_next = after is not None, len(rows) > TOKENS_PAGE_SIZE
+            rows = rows[:TOKENS_PAGE_SIZE]
+
+        self.rows = rows
+        self.previous_page.disabled = not has_previous
+        self.next_page.disabled = not has_next
+
+    def render(self) -> str:
+        """Met en forme la page courante"""
+        response = "```\nListe des tokens enregistrés:\n\n"
+        response += f"{'Utilisateur':<20} {'Statut':<10} {'Mis à jour':<20} {'Créé le':<20}\n"
+        response += "-" * 70 + "\n"
+
+        for token in self.rows:
+            user = self.cog.bot.get_user(token['discord_user_id'])
+            username = user.name if user else f"User {token['discord_user_id']}"
+            status = "✅ Valide" if token['valid_token'] else "❌ Invalide"
+            updated = token['updated_at'].strftime("%Y-%m-%d %H:%M")
+            created = token['created_at'].strftime("%Y-%m-%d %H:%M")
+            
+            response += f"{username:<20} {status:<10} {updated:<20} {created:<20}\n"
+
+        response += "```"
+        return response
+
+    @discord.ui.button(label="◀ Précédent", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        if self.rows:
+            first = self.rows[0]
+            await self.load(before=(first['updated_at'], first['id']))
+        else:
+            await self.load()
+        await interaction.response.edit_message(content=self.render(), view=self)
+
+    @discord.ui.button(label="Suivant ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        if self.rows:
+            last = self.rows[-1]
+            await self.load(after=(last['updated_at'], last['id']))
+        else:
+            await self.load()
+        await interaction.response.edit_message(content=self.render(), view=self)
+
+    @discord.ui.button(label="Exporter CSV", style=discord.ButtonStyle.primary)
+    async def export_csv(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        # Fichier temporaire sur disque : l'export n'est jamais chargé en mémoire
+        with tempfile.TemporaryFile() as output:
+            if not await self.cog.token_service.export_tokens_csv(output):
+                await interaction.followup.send(
+                    "Une erreur est survenue lors de l'export des tokens.",
+                    ephemeral=True
+                )
+                return
+            output.seek(0)
+            await interaction.followup.send(
+                file=discord.File(output, filename="tokens.csv"),
+                ephemeral=True
+            )
+
 class AdminCommands(commands.Cog):
     """Commandes réservées aux administrateurs"""
     
     def __init__(self, bot):
         self.bot = bot
         self.logger = get_logger(__name__)
+        self.token_service = bot.token_service
 
     def is_admin():
         """Vérifie si l'utilisateur est un administrateur"""
@@ -22,7 +126,7 @@ class AdminCommands(commands.Cog):
     async def clean_chats_command(self, interaction: discord.Interaction) -> None:
         """Nettoie les chats privés inutilisés (Admin uniquement)"""
         try:
-            category = discord.utils.get(interaction.guild.categories, name="Chats Privés")
+            category = await self.bot.channel_index.resolve(interaction.guild, PRIVATE_CATEGORY)
             if not category:
                 await interaction.response.send_message(
                     "Aucune catégorie de chats privés trouvée.",
@@ -30,67 +134,70 @@ class AdminCommands(commands.Cog):
                 )
                 return
 
-            channels_deleted = 0
-            for channel in category.text_channels:
-                # Vérifier si le canal est vide depuis 24h
-                async for message in channel.history(limit=1):
-                    # Si le dernier message date de plus de 24h
-                    if (discord.utils.utcnow() - message.created_at).days >= 1:
-                        await channel.delete(reason="Canal inactif")
-                        channels_deleted += 1
+            # Canaux sans message depuis 24h, vides compris
+            cutoff = discord.utils.utcnow() - INACTIVITY_DELAY
+            channels = [
+                channel for channel in category.text_channels
+                if get_last_activity(channel) < cutoff
+            ]
 
-            await interaction.response.send_message(
-                f"{channels_deleted} canaux inactifs ont été supprimés.",
-                ephemeral=True
+            await interaction.response.defer(ephemeral=True)
+            message = await interaction.followup.send(
+                f"Suppression de {len(channels)} canaux inactifs...",
+                ephemeral=True,
+                wait=True
             )
+            start_job(self.delete_channels(channels, message), name="clean-chats")
 
         except Exception as e:
             self.logger.error(f"Erreur lors du nettoyage des canaux: {e}")
-            await interaction.response.send_message(
+            send = (
+                interaction.followup.send
+                if interaction.response.is_done()
+                else interaction.response.send_message
+            )
+            await send(
                 "Une erreur est survenue lors du nettoyage des canaux.",
                 ephemeral=True
             )
 
+    async def delete_channels(
+        self,
+        channels: List[discord.TextChannel],
+        message: discord.WebhookMessage
+    ) -> None:
+        """Supprime des canaux en tâche de fond en affichant la progression"""
+        progress = ProgressMessage(message)
+        deleted = 0
+
+        async def delete(channel: discord.TextChannel) -> None:
+            nonlocal deleted
+            try:
+                await channel.delete(reason="Canal inactif")
+                deleted += 1
+            except discord.NotFound:
+                pass
+            await progress.update(f"{deleted}/{len(channels)} canaux inactifs supprimés...")
+
+        await run_bounded(channels, delete, concurrency=DELETE_CONCURRENCY, delay=DELETE_DELAY)
+        await progress.update(f"{deleted} canaux inactifs ont été supprimés.", force=True)
+
     @app_commands.command(name="list-tokens")
     @is_admin()
     async def list_tokens_command(self, interaction: discord.Interaction) -> None:
         """Liste tous les tokens enregistrés (Admin uniquement)"""
         try:
-            async with self.bot.db.pool.acquire() as conn:
-                tokens = await conn.fetch("""
-                    SELECT 
-                        discord_user_id,
-                        valid_token,
-                        updated_at,
-                        created_at
-                    FROM user_tokens
-                    ORDER BY updated_at DESC
-                """)
-
-            if not tokens:
+            view = TokenListView(self, interaction.user.id)
+            await view.load()
+
+            if not view.rows:
                 await interaction.response.send_message(
                     "Aucun token enregistré dans la base de données.",
                     ephemeral=True
                 )
                 return
 
-            # Créer un message formaté avec les informations sur les tokens
-            response = "```\nListe des tokens enregistrés:\n\n"
-            response += f"{'Utilisateur':<20} {'Statut':<10} {'Mis à jour':<20} {'Créé le':<20}\n"
-            response += "-" * 70 + "\n"
-
-            for token in tokens:
-                user = self.bot.get_user(token['discord_user_id'])
-                username = user.name if user else f"User {token['discord_user_id']}"
-                status = "✅ Valide" if token['valid_token'] else "❌ Invalide"
-                updated = token['updated_at'].strftime("%Y-%m-%d %H:%M")
-                created = token['created_at'].strftime("%Y-%m-%d %H:%M")
-                
-                response += f"{username:<20} {status:<10} {updated:<20} {created:<20}\n"
-
-            response += "```"
-
-            await interaction.response.send_message(response, ephemeral=True)
+            await interaction.response.send_message(view.render(), view=view, ephemeral=True)
 
         except Exception as e:
             self.logger.error(f"Erreur lors du listage des tokens: {e}")
@@ -115,62 +222,208 @@ class AdminCommands(commands.Cog):
             )
             return
 
+        invalidator = self.bot.token_invalidator
+        if invalidator.running:
+            await interaction.response.send_message(
+                "Une invalidation des tokens est déjà en cours.",
+                ephemeral=True
+            )
+            return
+
+        # Réservé avant tout await : deux invocations rapprochées ne peuvent
+        # pas lancer deux invalidations
+        invalidator.running = True
         try:
-            async with self.bot.db.pool.acquire() as conn:
-                result = await conn.execute("""
-                    UPDATE user_tokens 
-                    SET valid_token = false,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE valid_token = true
-                """)
-                
-                # Récupérer le nombre de lignes affectées
-                affected = int(result.split()[-1])
-                
-                await interaction.response.send_message(
-                    f"{affected} tokens ont été invalidés avec succès.",
-                    ephemeral=True
+            await interaction.response.defer(ephemeral=True)
+            state = await invalidator.begin()
+            resumed = "Reprise de l'invalidation" if state['last_id'] else "Invalidation"
+            message = await interaction.followup.send(
+                f"{resumed} des tokens...",
+                ephemeral=True,
+                wait=True
+            )
+            start_job(self.invalidate_tokens(message), name="invalidate-all")
+
+        except Exception as e:
+            invalidator.running = False
+            self.logger.error(f"Erreur lors de l'invalidation des tokens: {e}")
+            await interaction.followup.send(
+                "Une erreur est survenue lors de l'invalidation des tokens.",
+                ephemeral=True
+            )
+
+    async def invalidate_tokens(self, message: discord.WebhookMessage) -> None:
+        """Invalide les tokens en tâche de fond en affichant la progression"""
+        invalidator = self.bot.token_invalidator
+        try:
+            progress = ProgressMessage(message)
+
+            async def on_progress(state) -> None:
+                percent = 100 * state['last_id'] // state['max_id'] if state['max_id'] else 100
+                await progress.update(f"{state['invalidated']} tokens invalidés ({percent}%)...")
+
+            state = await invalidator.run(on_progress, reserved=True)
+            if state:
+                await progress.update(
+                    f"{state['invalidated']} tokens ont été invalidés avec succès.",
+                    force=True
                 )
 
         except Exception as e:
             self.logger.error(f"Erreur lors de l'invalidation des tokens: {e}")
+            await progress.update(
+                "L'invalidation des tokens a été interrompue, elle reprendra au prochain lancement.",
+                force=True
+            )
+        finally:
+            invalidator.running = False
+
+    @app_commands.command(name="import-tokens")
+    @app_commands.describe(fichier="Fichier CSV ou JSONL (discord_user_id, access_token, refresh_token, valid_token, expires_at)")
+    @is_admin()
+    async def import_tokens_command(
+        self,
+        interaction: discord.Interaction,
+        fichier: discord.Attachment
+    ) -> None:
+        """Importe des tokens en masse (Admin uniquement)"""
+        await interaction.response.defer(ephemeral=True)
+        try:
+            with tempfile.TemporaryFile() as data:
+                await fichier.save(data)
+                data.seek(0)
+                with open(data.fileno(), encoding='utf-8', newline='', closefd=False) as file:
+                    records = read_token_records(file, token_file_format(fichier.filename))
+                    imported = await self.token_service.import_tokens(records)
+
+            if imported < 0:
+                await interaction.followup.send(
+                    "Le fichier n'a pas pu être importé, aucun token n'a été modifié.",
+                    ephemeral=True
+                )
+                return
+
+            await interaction.followup.send(
+                f"{imported} tokens ont été importés avec succès.",
+                ephemeral=True
+            )
+
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'import des tokens: {e}")
+            await interaction.followup.send(
+                "Une erreur est survenue lors de l'import des tokens.",
+                ephemeral=True
+            )
+
+    @app_commands.command(name="validate-tokens")
+    @is_admin()
+    async def validate_tokens_command(self, interaction: discord.Interaction) -> None:
+        """Vérifie la validité de tous les tokens (Admin uniquement)"""
+        validator = self.bot.token_validator
+        if not validator:
             await interaction.response.send_message(
-                "Une erreur est survenue lors de l'invalidation des tokens.",
+                "Aucun endpoint de validation n'est configuré.",
+                ephemeral=True
+            )
+            return
+        if validator.running:
+            await interaction.response.send_message(
+                "Une vérification des tokens est déjà en cours.",
+                ephemeral=True
+            )
+            return
+
+        # Réservé avant tout await : deux invocations rapprochées ne peuvent
+        # pas lancer deux vérifications
+        validator.running = True
+        try:
+            await interaction.response.defer(ephemeral=True)
+            message = await interaction.followup.send(
+                "Vérification des tokens...",
+                ephemeral=True,
+                wait=True
+            )
+            start_job(self.validate_tokens(message), name="validate-tokens")
+
+        except Exception as e:
+            validator.running = False
+            self.logger.error(f"Erreur lors du lancement de la vérification des tokens: {e}")
+            await interaction.followup.send(
+                "Une erreur est survenue lors de la vérification des tokens.",
                 ephemeral=True
             )
 
+    async def validate_tokens(self, message: discord.WebhookMessage) -> None:
+        """Vérifie les tokens en tâche de fond en affichant la progression"""
+        validator = self.bot.token_validator
+        progress = ProgressMessage(message)
+        done = {'checked': 0, 'changed': 0}
+        try:
+            total = (await self.token_service.get_tokens_stats())['valid_tokens']
+
+            async def on_progress(counts) -> None:
+                done.update(checked=counts['checked'], changed=counts['changed'])
+                await progress.update(
+                    f"{counts['checked']}/{total} tokens vérifiés, "
+                    f"{counts['invalid']} invalides, {counts['errors']} erreurs..."
+                )
+
+            counts = await validator.validate_all(on_progress)
+            await progress.update(
+                f"{counts['checked']} tokens vérifiés : {counts['valid']} valides, "
+                f"{counts['invalid']} invalides, {counts['errors']} erreurs. "
+                f"{counts['changed']} tokens ont été invalidés.",
+                force=True
+            )
+
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la vérification des tokens: {e}")
+            await progress.update(
+                f"La vérification des tokens a échoué après {done['checked']} tokens vérifiés "
+                f"({done['changed']} invalidés). Relancez la commande pour recommencer.",
+                force=True
+            )
+        finally:
+            validator.running = False
+
     @app_commands.command(name="stats")
     @is_admin()
     async def stats_command(self, interaction: discord.Interaction) -> None:
         """Affiche les statistiques des tokens (Admin uniquement)"""
         try:
-            async with self.bot.db.pool.acquire() as conn:
-                stats = await conn.fetchrow("""
-                    SELECT 
-                        COUNT(*) as total_tokens,
-                        SUM(CASE WHEN valid_token THEN 1 ELSE 0 END) as valid_tokens,
-                        SUM(CASE WHEN NOT valid_token THEN 1 ELSE 0 END) as invalid_tokens,
-                        COUNT(DISTINCT discord_user_id) as unique_users,
-                        MAX(updated_at) as last_update
-                    FROM user_tokens
-                """)
-
-                recent_activity = await conn.fetch("""
-                    SELECT discord_user_id, updated_at, valid_token
-                    FROM user_tokens
-                    WHERE updated_at > NOW() - INTERVAL '24 hours'
-                    ORDER BY updated_at DESC
-                """)
+            stats = await self.token_service.get_tokens_stats()
+            recent_activity = await self.token_service.get_recent_activity(RECENT_ACTIVITY_LIMIT)
 
             response = "```\nStatistiques des tokens:\n\n"
             response += f"Total des tokens: {stats['total_tokens']}\n"
             response += f"Tokens valides: {stats['valid_tokens']}\n"
             response += f"Tokens invalides: {stats['invalid_tokens']}\n"
             response += f"Utilisateurs uniques: {stats['unique_users']}\n"
-            response += f"Dernière mise à jour: {stats['last_update']}\n\n"
+            response += f"Dernière mise à jour: {stats['last_update']}\n"
+
+            cache = self.token_service.cache_stats()
+            response += (
+                f"Cache: {cache['size']}/{cache['maxsize']} entrées, "
+                f"{cache['hits']} hits, {cache['misses']} misses, "
+                f"{cache['evictions']} évictions\n"
+            )
+
+            pool = self.bot.db.pool.stats()
+            response += (
+                f"Connexions: {pool['in_use']} utilisées, {pool['idle']} libres "
+                f"({pool['min_size']}-{pool['max_size']}), {pool['waiting']} en attente, "
+                f"attente moy. {pool['avg_wait_ms']:.1f} ms / max {pool['max_wait_ms']:.1f} ms, "
+                f"{pool['timeouts']} délais dépassés\n"
+            )
+            for query in query_stats(SLOWEST_QUERIES_LIMIT):
+                response += (
+                    f"  {query['name']}: {query['calls']} appels, "
+                    f"{query['total_ms']:.0f} ms (moy. {query['avg_ms']:.1f} ms)\n"
+                )
+            response += "\n"
 
             if recent_activity:
-                response += "Activité récente (24h):\n"
+                response += f"Activité récente (24h, {RECENT_ACTIVITY_LIMIT} dernières):\n"
                 for activity in recent_activity:
                     user = self.bot.get_user(activity['discord_user_id'])
                     username = user.name if user else f"User {activity['discord_user_id']}"
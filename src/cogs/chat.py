@@ -4,8 +4,7 @@ from discord.ext import commands
 from src.utils.logger import get_logger
 from src.utils.helpers import (
     is_private_chat,
-    create_private_channel,
-    get_private_category
+    create_private_channel
 )
 
 class ChatCommands(commands.Cog):
@@ -21,24 +20,30 @@ class ChatCommands(commands.Cog):
             member = interaction.user
 
             # Vérifier si l'utilisateur a déjà un chat privé
-            category = await get_private_category(guild)
-            if category:
-                for channel in category.text_channels:
-                    if channel.permissions_for(member).read_messages:
-                        await interaction.response.send_message(
-                            f"Vous avez déjà un canal privé : {channel.mention}",
-                            ephemeral=True
-                        )
-                        return
+            private_channels = self.bot.private_channels
+            channel_id = await private_channels.get_channel_id(guild.id, member.id)
+            if channel_id:
+                channel = guild.get_channel(channel_id)
+                if channel:
+                    await interaction.response.send_message(
+                        f"Vous avez déjà un canal privé : {channel.mention}",
+                        ephemeral=True
+                    )
+                    return
+                # Le salon a disparu sans que l'index soit prévenu
+                await private_channels.unregister(channel_id)
 
             # Créer un nouveau canal privé
             channel = await create_private_channel(
                 guild=guild,
                 member=member,
-                bot_member=guild.me
+                bot_member=guild.me,
+                channel_index=self.bot.channel_index,
+                private_channels=private_channels
             )
 
             if channel:
+                self.bot.chat_expiry.schedule(channel.id)
                 welcome_message = (
                     f"Bienvenue dans votre chat privé, {member.mention} !\n"
                     "Ce canal n'est visible que par vous et le bot.\n"
@@ -71,10 +76,15 @@ class ChatCommands(commands.Cog):
                 ephemeral=True
             )
 
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message) -> None:
+        """Repousse l'expiration du chat privé où le message a été envoyé"""
+        self.bot.chat_expiry.touch(message.channel.id)
+
     @app_commands.command(name="close")
     async def close_command(self, interaction: discord.Interaction) -> None:
         """Ferme le chat privé actuel"""
-        if not is_private_chat(interaction.channel):
+        if not await is_private_chat(interaction.channel, self.bot.private_channels):
             await interaction.response.send_message(
                 "Cette commande ne peut être utilisée que dans un chat privé.",
                 ephemeral=True
@@ -88,6 +98,7 @@ class ChatCommands(commands.Cog):
                 ephemeral=True
             )
             await channel.delete(reason="Canal fermé par l'utilisateur")
+            await self.bot.private_channels.unregister(channel.id)
             
         except discord.Forbidden:
             await interaction.response.send_message(
@@ -4,7 +4,6 @@ from discord import app_commands
 from discord.ext import commands
 from src.utils.logger import get_logger
 from src.utils.helpers import is_private_chat
-from src.services.token_service import TokenService
 
 # Messages constants
 PRIVATE_CHAT_REQUIRED = "Cette commande ne peut être utilisée que dans un chat privé. Utilisez /chat pour créer un chat privé."
@@ -19,7 +18,7 @@ class TokenCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = get_logger(__name__)
-        self.token_service = TokenService(bot.db.pool)
+        self.token_service = bot.token_service
 
     @app_commands.command(name="token")
     @app_commands.describe(
@@ -33,7 +32,7 @@ class TokenCommands(commands.Cog):
         refresh_token: str
     ) -> None:
         """Commande pour enregistrer les tokens"""
-        if not is_private_chat(interaction.channel):
+        if not await is_private_chat(interaction.channel, self.bot.private_channels):
             await interaction.response.send_message(
                 PRIVATE_CHAT_REQUIRED,
                 ephemeral=True
@@ -71,7 +70,7 @@ class TokenCommands(commands.Cog):
     @app_commands.command(name="remove-token")
     async def remove_token_command(self, interaction: discord.Interaction) -> None:
         """Supprime les tokens de l'utilisateur"""
-        if not is_private_chat(interaction.channel):
+        if not await is_private_chat(interaction.channel, self.bot.private_channels):
             await interaction.response.send_message(
                 PRIVATE_CHAT_REQUIRED,
                 ephemeral=True
@@ -1,6 +1,7 @@
 # src/cogs/votes.py
 import json
 import discord
+import orjson
 from discord import app_commands
 from discord.ext import commands
 from src.utils.logger import get_logger
@@ -11,7 +12,6 @@ class VoteCommands(commands.Cog):
         self.bot = bot
         self.logger = get_logger(__name__)
         self.vote_service = VoteService(bot, bot.db.pool)
-        self.current_vote_number = 1
 
     def is_admin():
         """Vérifie si l'utilisateur est un administrateur"""
@@ -56,34 +56,7 @@ class VoteCommands(commands.Cog):
             await interaction.response.defer(ephemeral=True)
             # Lire le JSON
             json_content = await json_file.read()
-            json_data = json.loads(json_content)
-
-            # Trouver le salon de vote actuel
-            vote_channel = discord.utils.get(
-                interaction.guild.text_channels,
-                name=f"votes-{self.current_vote_number}"
-            )
-            
-            if not vote_channel:
-                # Créer un nouveau salon si nécessaire
-                overwrites = {
-                    interaction.guild.default_role: discord.PermissionOverwrite(
-                        send_messages=False,
-                        read_messages=True,
-                        add_reactions=True
-                    ),
-                    interaction.guild.me: discord.PermissionOverwrite(
-                        send_messages=True,
-                        read_messages=True,
-                        add_reactions=True,
-                        manage_messages=True
-                    )
-                }
-                
-                vote_channel = await interaction.guild.create_text_channel(
-                    f"votes-{self.current_vote_number}",
-                    overwrites=overwrites
-                )
+            json_data = orjson.loads(json_content)
 
             # Créer le vote
             result = await self.vote_service.create_vote(
@@ -123,51 +96,42 @@ class VoteCommands(commands.Cog):
             await interaction.response.defer(ephemeral=True)
             
             # Récupérer le salon actuel
-            current_session = await self.vote_service.get_current_session()
-            current_channel = discord.utils.get(
-                interaction.guild.text_channels,
-                name=f"votes-{current_session}"
-            )
+            current_channel = await self.vote_service.get_vote_channel(interaction.guild)
 
+            # Décomptes finaux à partir des messages enregistrés
+            session_id = await self.vote_service.get_current_session_id()
+            votes = await self.vote_service.get_session_votes(session_id)
+            vote_counts = await self.vote_service.fetch_vote_counts(votes)
+
+            # Clôturer la session et passer à la suivante en une transaction
+            result = await self.vote_service.close_session(vote_counts)
+            if result is None:
+                await interaction.followup.send(
+                    "Une erreur est survenue lors de la fin de la session de vote.",
+                    ephemeral=True
+                )
+                return
+
+            winner = result['winner']
             if current_channel:
-                # Mise à jour finale des votes
-                async with self.bot.db.pool.acquire() as conn:
-                    async for message in current_channel.history(limit=None):
-                        if message.author == self.bot.user:
-                            for reaction in message.reactions:
-                                # -1 pour ne pas compter le vote du bot
-                                vote_count = reaction.count - 1 if reaction.count > 0 else 0
-                                await conn.execute("""
-                                    UPDATE votes 
-                                    SET vote_count = $1 
-                                    WHERE message_id = $2
-                                """, vote_count, message.id)
-
-                    # Récupérer le gagnant
-                    winner = await self.vote_service.get_winning_vote(conn)
+                if winner and winner['vote_count'] > 0:
+                    # Message de victoire dans le salon
+                    embed = discord.Embed(
+                        title="🏆 Vote terminé - Pattern Gagnant!",
+                        description=f"**{winner['title']}** remporte le vote avec **{winner['vote_count']}** votes!",
+                        color=discord.Color.gold()
+                    )
+                    embed.add_field(name="Coordonnées", value=f"X: {winner['coord_x']}, Z: {winner['coord_z']}")
+                    embed.set_image(url=winner['image_url'])
                     
-                    if winner and winner['vote_count'] > 0:
-                        # Sauvegarder dans votes_pattern
-                        await self.vote_service.save_winning_pattern(conn, winner)
-
-                        # Message de victoire dans le salon
-                        embed = discord.Embed(
-                            title="🏆 Vote terminé - Pattern Gagnant!",
-                            description=f"**{winner['title']}** remporte le vote avec **{winner['vote_count']}** votes!",
-                            color=discord.Color.gold()
-                        )
-                        embed.add_field(name="Coordonnées", value=f"X: {winner['coord_x']}, Z: {winner['coord_z']}")
-                        embed.set_image(url=winner['image_url'])
-                        
-                        await current_channel.send(embed=embed)
-
-                    # Désactiver les réactions
-                    overwrites = current_channel.overwrites
-                    overwrites[interaction.guild.default_role].update(add_reactions=False)
-                    await current_channel.edit(overwrites=overwrites)
-
-            # Incrémenter la session et créer nouveau salon
-            new_session = await self.vote_service.increment_session()
+                    await current_channel.send(embed=embed)
+
+                # Désactiver les réactions
+                overwrites = current_channel.overwrites
+                overwrites[interaction.guild.default_role].update(add_reactions=False)
+                await current_channel.edit(overwrites=overwrites)
+
+            # Créer le salon de la nouvelle session
             new_channel = await self.vote_service.get_or_create_vote_channel(interaction.guild)
 
             await interaction.followup.send(
@@ -206,16 +170,20 @@ class VoteCommands(commands.Cog):
             overwrites=overwrites
         )
 
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent) -> None:
+        """Comptabilise un vote dès l'ajout de la réaction"""
+        self.vote_service.handle_reaction(payload, 1)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent) -> None:
+        """Retire un vote dès le retrait de la réaction"""
+        self.vote_service.handle_reaction(payload, -1)
+
     @app_commands.command(name="vote_stats")
     async def vote_stats(self, interaction: discord.Interaction):
         """Affiche les statistiques des votes en cours"""
-        async with self.bot.db.pool.acquire() as conn:
-            votes = await conn.fetch("""
-                SELECT title, vote_count, created_at
-                FROM votes
-                WHERE is_active = true
-                ORDER BY vote_count DESC
-            """)
+        votes = await self.vote_service.get_vote_ranking()
 
         if not votes:
             await interaction.response.send_message(
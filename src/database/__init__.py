@@ -1,4 +1,6 @@
 from .database import Database
 from .models import UserToken
+from .vote import Vote
+from . import queries
 
-__all__ = ['Database', 'UserToken']
\ No newline at end of file
+__all__ = ['Database', 'UserToken', 'Vote', 'queries']
@@ -0,0 +1,34 @@
+import asyncpg
+import orjson
+
+# Premier octet du format binaire de jsonb (version du format)
+JSONB_VERSION = b'\x01'
+
+def encode_jsonb(value) -> bytes:
+    """Encode une valeur Python au format binaire de jsonb"""
+    return JSONB_VERSION + orjson.dumps(value)
+
+def decode_jsonb(data: bytes):
+    """Décode une valeur jsonb reçue au format binaire"""
+    if data[:1] != JSONB_VERSION:
+        raise ValueError(f"Version de jsonb non supportée: {data[:1]!r}")
+    return orjson.loads(memoryview(data)[1:])
+
+async def register_codecs(conn: asyncpg.Connection) -> None:
+    """
+    Enregistre les codecs de types sur une connexion
+
+    Les colonnes jsonb sont échangées au format binaire et décodées par
+    orjson directement en objets Python ; les paramètres jsonb acceptent
+    des objets Python, sans json.dumps préalable.
+
+    Args:
+        conn: Nouvelle connexion du pool
+    """
+    await conn.set_type_codec(
+        'jsonb',
+        schema='pg_catalog',
+        encoder=encode_jsonb,
+        decoder=decode_jsonb,
+        format='binary'
+    )
@@ -1,31 +1,60 @@
 import asyncpg
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable, Callable
 from src.utils.logger import get_logger
 from src.utils.config import Config
+from src.database.codecs import register_codecs
+from src.database.migrator import migrate
+from src.database.pool import InstrumentedPool
 
 logger = get_logger(__name__)
 
 class Database:
-    def __init__(self, pool: asyncpg.Pool):
+    def __init__(self, pool: InstrumentedPool):
         self._pool = pool
 
     @property
-    def pool(self) -> asyncpg.Pool:
+    def pool(self) -> InstrumentedPool:
         """Retourne le pool de connexions à la base de données"""
         return self._pool
 
     @classmethod
-    async def create(cls, config: Config) -> 'Database':
-        """Crée une instance de la base de données avec un pool de connexions"""
+    async def create(
+        cls,
+        config: Config,
+        init: Optional[Callable[[asyncpg.Connection], Awaitable[None]]] = None
+    ) -> 'Database':
+        """
+        Crée une instance de la base de données avec un pool de connexions
+        
+        Args:
+            config: Configuration du bot, le pool est réglé par la section database
+            init: Préparation supplémentaire de chaque nouvelle connexion,
+                après l'enregistrement des codecs (voir register_codecs)
+        """
+        database = config.database
+        settings = database.get('settings')
+
+        async def init_connection(conn: asyncpg.Connection) -> None:
+            await register_codecs(conn)
+            if init:
+                await init(conn)
+
         try:
             pool = await asyncpg.create_pool(
-                host=config.database.host,
-                port=config.database.port,
-                user=config.database.user,
-                password=config.database.password,
-                database=config.database.name
+                host=database.host,
+                port=database.port,
+                user=database.user,
+                password=database.password,
+                database=database.name,
+                min_size=database.get('min_size', 10),
+                max_size=database.get('max_size', 10),
+                max_inactive_connection_lifetime=database.get('max_inactive_connection_lifetime', 300.0),
+                statement_cache_size=database.get('statement_cache_size', 100),
+                command_timeout=database.get('command_timeout'),
+                server_settings={k: str(v) for k, v in settings.to_dict().items()} if settings else None,
+                init=init_connection
             )
-            db = cls(pool)
+            db = cls(InstrumentedPool(pool, acquire_timeout=database.get('acquire_timeout')))
             await db.initialize_database()
             return db
         except Exception as e:
@@ -33,89 +62,11 @@ class Database:
             raise
 
     async def initialize_database(self) -> None:
-        """Initialise la structure de la base de données"""
+        """Met à jour la structure de la base de données"""
         try:
-            async with self._pool.acquire() as conn:
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS user_tokens (
-                        id SERIAL PRIMARY KEY,
-                        discord_user_id BIGINT NOT NULL UNIQUE,
-                        access_token VARCHAR(255) NOT NULL,
-                        refresh_token VARCHAR(255) NOT NULL,
-                        valid_token BOOLEAN DEFAULT true,
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                    );
-                    
-                    CREATE TABLE IF NOT EXISTS votes (
-                        id SERIAL PRIMARY KEY,
-                        title VARCHAR(255) NOT NULL,
-                        image_name VARCHAR(255) NOT NULL,
-                        image_url VARCHAR(512),
-                        json_data JSONB,
-                        channel_id BIGINT,
-                        message_id BIGINT,
-                        created_by BIGINT NOT NULL,
-                        coord_x INTEGER,
-                        coord_z INTEGER,
-                        vote_count INT DEFAULT 0,
-                        session_id INTEGER NOT NULL,
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                        is_active BOOLEAN DEFAULT true
-                    );
-                    
-                    CREATE INDEX IF NOT EXISTS idx_user_tokens_discord_user_id 
-                        ON user_tokens(discord_user_id);
-                    
-                    CREATE INDEX IF NOT EXISTS idx_user_tokens_valid_token 
-                        ON user_tokens(valid_token);
-
-                    CREATE INDEX IF NOT EXISTS idx_votes_session_id 
-                        ON votes(session_id);
-
-                    CREATE TABLE IF NOT EXISTS votes_pattern (
-                        id SERIAL PRIMARY KEY,
-                        title VARCHAR(255) NOT NULL,
-                        image_name VARCHAR(255) NOT NULL,
-                        image_url VARCHAR(512),
-                        json_data JSONB,
-                        coord_x INTEGER,
-                        coord_z INTEGER,
-                        vote_count INTEGER,
-                        original_vote_id INTEGER REFERENCES votes(id),
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                    );
-
-                    CREATE TABLE IF NOT EXISTS bot_state (
-                        key VARCHAR(255) PRIMARY KEY,
-                        value JSONB NOT NULL
-                    );
-
-                    CREATE TABLE IF NOT EXISTS vote_sessions (
-                        id SERIAL PRIMARY KEY,
-                        number INTEGER NOT NULL,
-                        is_active BOOLEAN DEFAULT true,
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                    );
-
-                    -- Initialiser le compteur de vote s'il n'existe pas
-                    INSERT INTO bot_state (key, value)
-                    VALUES ('vote_number', '1'::jsonb)
-                    ON CONFLICT (key) DO NOTHING;
-
-                    -- Initialiser le compteur de session si n'existe pas
-                    INSERT INTO bot_state (key, value) 
-                    VALUES ('vote_session', '{"number": 1}'::jsonb)
-                    ON CONFLICT (key) DO NOTHING;
-
-                    -- Initialiser la première session si nécessaire
-                    INSERT INTO vote_sessions (number, is_active)
-                    VALUES (1, true)
-                    ON CONFLICT DO NOTHING;
-                """)
-                logger.info("Base de données initialisée avec succès")
-                
+            applied = await migrate(self._pool)
+            if applied:
+                logger.info(f"Base de données migrée ({applied} migrations appliquées)")
         except Exception as e:
             logger.error(f"Erreur lors de l'initialisation de la base de données: {e}")
             raise
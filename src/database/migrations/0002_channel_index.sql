@@ -0,0 +1,21 @@
+-- Index des salons gérés par le bot et des chats privés
+
+CREATE INDEX IF NOT EXISTS idx_votes_message_id
+    ON votes(message_id);
+
+CREATE TABLE IF NOT EXISTS guild_channels (
+    guild_id BIGINT NOT NULL,
+    role VARCHAR(64) NOT NULL,
+    channel_id BIGINT NOT NULL UNIQUE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (guild_id, role)
+);
+
+CREATE TABLE IF NOT EXISTS private_channels (
+    guild_id BIGINT NOT NULL,
+    discord_user_id BIGINT NOT NULL,
+    channel_id BIGINT NOT NULL UNIQUE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (guild_id, discord_user_id)
+);
@@ -0,0 +1,13 @@
+-- Pagination des tokens et suivi de leur expiration
+
+CREATE INDEX IF NOT EXISTS idx_user_tokens_updated_at
+    ON user_tokens(updated_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_user_tokens_valid_updated_at
+    ON user_tokens(updated_at, id) WHERE valid_token = true;
+
+ALTER TABLE user_tokens
+    ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS idx_user_tokens_expires_at
+    ON user_tokens(expires_at) WHERE valid_token = true;
@@ -0,0 +1,55 @@
+-- Statistiques des tokens tenues à jour par triggers
+
+CREATE TABLE IF NOT EXISTS token_stats (
+    id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+    total_tokens BIGINT NOT NULL DEFAULT 0,
+    valid_tokens BIGINT NOT NULL DEFAULT 0,
+    last_update TIMESTAMP WITH TIME ZONE
+);
+
+INSERT INTO token_stats (id, total_tokens, valid_tokens, last_update)
+SELECT true, COUNT(*), COUNT(*) FILTER (WHERE valid_token), MAX(updated_at)
+FROM user_tokens
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION token_stats_apply() RETURNS trigger AS $$
+DECLARE
+    delta_total BIGINT := 0;
+    delta_valid BIGINT := 0;
+    newest TIMESTAMP WITH TIME ZONE;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT COUNT(*), COUNT(*) FILTER (WHERE valid_token), MAX(updated_at)
+        INTO delta_total, delta_valid, newest
+        FROM new_rows;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT delta_total - COUNT(*),
+               delta_valid - COUNT(*) FILTER (WHERE valid_token)
+        INTO delta_total, delta_valid
+        FROM old_rows;
+    END IF;
+    IF delta_total <> 0 OR delta_valid <> 0 OR newest IS NOT NULL THEN
+        UPDATE token_stats
+        SET total_tokens = total_tokens + delta_total,
+            valid_tokens = valid_tokens + delta_valid,
+            last_update = GREATEST(last_update, newest);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER user_tokens_stats_insert
+    AFTER INSERT ON user_tokens
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION token_stats_apply();
+
+CREATE OR REPLACE TRIGGER user_tokens_stats_update
+    AFTER UPDATE ON user_tokens
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION token_stats_apply();
+
+CREATE OR REPLACE TRIGGER user_tokens_stats_delete
+    AFTER DELETE ON user_tokens
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION token_stats_apply();
@@ -0,0 +1,20 @@
+-- Index des requêtes fréquentes
+
+-- Votes actifs : décomptes d'une session, réconciliation et classement
+CREATE INDEX IF NOT EXISTS idx_votes_active_session
+    ON votes(session_id) WHERE is_active = true;
+
+CREATE INDEX IF NOT EXISTS idx_votes_active_ranking
+    ON votes(vote_count DESC, id) WHERE is_active = true;
+
+CREATE INDEX IF NOT EXISTS idx_vote_sessions_active
+    ON vote_sessions(id) WHERE is_active = true;
+
+-- Remplacé par l'index partiel sur les votes actifs
+DROP INDEX IF EXISTS idx_votes_session_id;
+
+-- Doublon de la contrainte UNIQUE sur discord_user_id
+DROP INDEX IF EXISTS idx_user_tokens_discord_user_id;
+
+-- Booléen peu sélectif, remplacé par les index partiels sur les tokens valides
+DROP INDEX IF EXISTS idx_user_tokens_valid_token;
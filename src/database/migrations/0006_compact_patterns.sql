@@ -0,0 +1,21 @@
+-- Patterns stockés sous forme de palette et de grille d'indices compressée
+-- (voir src/utils/patterns.py). json_data ne garde que les patterns qui ne
+-- sont pas des grilles de pixels et ceux enregistrés avant cette migration.
+
+ALTER TABLE votes
+    ADD COLUMN IF NOT EXISTS pattern_width INTEGER,
+    ADD COLUMN IF NOT EXISTS pattern_height INTEGER,
+    ADD COLUMN IF NOT EXISTS pattern_palette JSONB,
+    ADD COLUMN IF NOT EXISTS pattern_pixels BYTEA,
+    ADD COLUMN IF NOT EXISTS pattern_meta JSONB;
+
+ALTER TABLE votes_pattern
+    ADD COLUMN IF NOT EXISTS pattern_width INTEGER,
+    ADD COLUMN IF NOT EXISTS pattern_height INTEGER,
+    ADD COLUMN IF NOT EXISTS pattern_palette JSONB,
+    ADD COLUMN IF NOT EXISTS pattern_pixels BYTEA,
+    ADD COLUMN IF NOT EXISTS pattern_meta JSONB;
+
+-- Les pixels compressés ne gagnent rien à une seconde compression TOAST
+ALTER TABLE votes ALTER COLUMN pattern_pixels SET STORAGE EXTERNAL;
+ALTER TABLE votes_pattern ALTER COLUMN pattern_pixels SET STORAGE EXTERNAL;
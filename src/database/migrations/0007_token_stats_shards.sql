@@ -0,0 +1,58 @@
+-- Compteurs de token_stats répartis sur plusieurs lignes
+
+-- Avec une seule ligne, toutes les écritures concurrentes sur user_tokens
+-- se sérialisaient sur son verrou. Chaque connexion met désormais à jour
+-- la ligne correspondant à son processus serveur, les lignes sont sommées
+-- à la lecture. last_update n'est plus stocké : MAX(updated_at) est lu
+-- directement sur idx_user_tokens_updated_at et reste exact après une
+-- suppression.
+
+-- Bloque les écritures sur user_tokens le temps de recalculer les compteurs
+LOCK TABLE user_tokens IN SHARE MODE;
+
+DROP TABLE IF EXISTS token_stats;
+
+CREATE TABLE token_stats (
+    shard SMALLINT PRIMARY KEY,
+    total_tokens BIGINT NOT NULL DEFAULT 0,
+    valid_tokens BIGINT NOT NULL DEFAULT 0
+);
+
+-- 16 lignes, à garder cohérent avec le modulo de token_stats_apply()
+INSERT INTO token_stats (shard)
+SELECT shard FROM generate_series(0, 15) AS shard;
+
+UPDATE token_stats
+SET total_tokens = counts.total_tokens,
+    valid_tokens = counts.valid_tokens
+FROM (
+    SELECT COUNT(*) AS total_tokens, COUNT(*) FILTER (WHERE valid_token) AS valid_tokens
+    FROM user_tokens
+) AS counts
+WHERE shard = 0;
+
+CREATE OR REPLACE FUNCTION token_stats_apply() RETURNS trigger AS $$
+DECLARE
+    delta_total BIGINT := 0;
+    delta_valid BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT COUNT(*), COUNT(*) FILTER (WHERE valid_token)
+        INTO delta_total, delta_valid
+        FROM new_rows;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT delta_total - COUNT(*),
+               delta_valid - COUNT(*) FILTER (WHERE valid_token)
+        INTO delta_total, delta_valid
+        FROM old_rows;
+    END IF;
+    IF delta_total <> 0 OR delta_valid <> 0 THEN
+        UPDATE token_stats
+        SET total_tokens = total_tokens + delta_total,
+            valid_tokens = valid_tokens + delta_valid
+        WHERE shard = pg_backend_pid() % 16;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,89 @@
+import re
+from pathlib import Path
+from typing import List, NamedTuple
+import asyncpg
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Fichiers de migration numérotés : 0001_description.sql
+MIGRATIONS_DIR = Path(__file__).parent / 'migrations'
+MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+# Clé du verrou consultatif empêchant deux instances de migrer en même temps
+MIGRATION_LOCK_ID = 0x506978656c426f74
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: Path
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """
+    Liste les migrations disponibles, dans l'ordre des versions
+    
+    Raises:
+        ValueError: Si deux fichiers portent le même numéro de version
+    """
+    migrations = {}
+    for path in directory.glob('*.sql'):
+        match = MIGRATION_FILE.match(path.name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Version de migration en double: {path.name}, {migrations[version].path.name}")
+        migrations[version] = Migration(version, match.group(2), path)
+    return [migrations[version] for version in sorted(migrations)]
+
+async def migrate(pool: asyncpg.Pool, migrations: List[Migration] = None) -> int:
+    """
+    Applique les migrations manquantes
+    
+    Une base déjà à jour ne coûte qu'une requête. Sinon les migrations sont
+    appliquées dans l'ordre sous un verrou consultatif, chacune dans sa
+    propre transaction avec l'enregistrement de sa version.
+    
+    Args:
+        pool: Pool de connexions à la base de données
+        migrations: Migrations disponibles, par défaut celles du dossier migrations
+        
+    Returns:
+        int: Nombre de migrations appliquées
+    """
+    migrations = load_migrations() if migrations is None else migrations
+    if not migrations:
+        return 0
+
+    async with pool.acquire() as conn:
+        try:
+            current = await conn.fetchval("SELECT max(version) FROM schema_migrations")
+        except asyncpg.UndefinedTableError:
+            current = None
+        if current is not None and current >= migrations[-1].version:
+            return 0
+
+        await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_ID)
+        try:
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # Relu sous le verrou : une autre instance a pu migrer entre-temps
+            applied = {row['version'] for row in await conn.fetch("SELECT version FROM schema_migrations")}
+            pending = [migration for migration in migrations if migration.version not in applied]
+
+            for migration in pending:
+                logger.info(f"Application de la migration {migration.version:04d}_{migration.name}")
+                async with conn.transaction():
+                    await conn.execute(migration.path.read_text(encoding='utf-8'))
+                    await conn.execute(
+                        "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+                        migration.version, migration.name
+                    )
+            return len(pending)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+import asyncpg
+from src.database.queries import Query
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class InstrumentedPool:
+    """
+    Pool asyncpg mesurant l'attente des connexions
+    
+    S'utilise comme le pool qu'il enveloppe ; acquire() enregistre en plus
+    le temps d'attente de chaque connexion et les dépassements de délai.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, acquire_timeout: Optional[float] = None):
+        """
+        Args:
+            pool: Pool asyncpg
+            acquire_timeout: Attente maximale d'une connexion en secondes, None pour illimité
+        """
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.acquires = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> '_AcquireContext':
+        """Prend une connexion du pool, à utiliser avec async with"""
+        return _AcquireContext(self, timeout if timeout is not None else self.acquire_timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict: Connexions ouvertes, utilisées, libres et en attente,
+            nombre d'acquisitions, dépassements et temps d'attente en ms
+        """
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        return {
+            'size': size,
+            'min_size': self._pool.get_min_size(),
+            'max_size': self._pool.get_max_size(),
+            'in_use': size - idle,
+            'idle': idle,
+            'waiting': self.waiting,
+            'acquires': self.acquires,
+            'timeouts': self.timeouts,
+            'avg_wait_ms': 1000 * self.total_wait / self.acquires if self.acquires else 0.0,
+            'max_wait_ms': 1000 * self.max_wait
+        }
+
+    async def warm_up(self, statements: Iterable[Tuple[Query, tuple]]) -> None:
+        """
+        Ouvre min_size connexions et y prépare les requêtes fréquentes
+        
+        Chaque requête est exécutée une fois sur chaque connexion, ce qui la
+        place dans le cache de requêtes préparées de la connexion (avec sa
+        classe d'enregistrement, qui fait partie de la clé du cache). Ces
+        exécutions ne sont pas comptées dans query_stats().
+        
+        Args:
+            statements: Couples (requête, paramètres) sans effet de bord
+        """
+        statements = list(statements)
+
+        async def prepare(conn: asyncpg.Connection) -> None:
+            for query, args in statements:
+                # Directement sur la connexion : même clé de cache, sans chronométrage
+                await conn.fetch(query.sql, *args, record_class=query.record_class)
+
+        # Connexions tenues simultanément pour que chacune soit préparée
+        connections = [await self._pool.acquire() for _ in range(self._pool.get_min_size())]
+        try:
+            await asyncio.gather(*(prepare(conn) for conn in connections))
+        finally:
+            for conn in connections:
+                await self._pool.release(conn)
+        logger.info(f"{len(connections)} connexions préparées ({len(statements)} requêtes)")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool, name)
+
+class _AcquireContext:
+    """Acquisition mesurée d'une connexion"""
+
+    __slots__ = ('_pool', '_timeout', '_conn')
+
+    def __init__(self, pool: InstrumentedPool, timeout: Optional[float]):
+        self._pool = pool
+        self._timeout = timeout
+        self._conn = None
+
+    async def __aenter__(self) -> asyncpg.Connection:
+        pool = self._pool
+        pool.waiting += 1
+        start = time.perf_counter()
+        try:
+            self._conn = await pool._pool.acquire(timeout=self._timeout)
+        except asyncio.TimeoutError:
+            pool.timeouts += 1
+            logger.warning(
+                f"Aucune connexion libre après {self._timeout} s "
+                f"({pool._pool.get_size()} ouvertes, {pool.waiting - 1} autres en attente)"
+            )
+            raise
+        finally:
+            pool.waiting -= 1
+            wait = time.perf_counter() - start
+            pool.acquires += 1
+            pool.total_wait += wait
+            pool.max_wait = max(pool.max_wait, wait)
+        return self._conn
+
+    async def __aexit__(self, *exc) -> None:
+        await self._pool._pool.release(self._conn)
@@ -0,0 +1,528 @@
+import time
+from typing import Any, Dict, List, Optional, Type
+import asyncpg
+from src.database.models import UserToken
+from src.database.vote import Vote
+
+# Requêtes déclarées, indexées par nom
+QUERIES: Dict[str, 'Query'] = {}
+
+class Query:
+    """
+    Requête SQL déclarée une seule fois
+    
+    Les requêtes à paramètres passent par le cache de requêtes préparées
+    d'asyncpg : chacune est préparée à sa première exécution sur une
+    connexion puis réutilisée (taille réglée par database.statement_cache_size).
+    Les lignes sont créées directement dans record_class. Chaque exécution
+    est chronométrée, voir query_stats().
+    """
+
+    __slots__ = ('name', 'sql', 'record_class', 'calls', 'total_time')
+
+    def __init__(self, name: str, sql: str, record_class: Type[asyncpg.Record] = asyncpg.Record):
+        """
+        Args:
+            name: Nom unique de la requête
+            sql: Texte de la requête
+            record_class: Classe des lignes renvoyées
+        """
+        if name in QUERIES:
+            raise ValueError(f"Requête déjà déclarée: {name}")
+        self.name = name
+        self.sql = sql
+        self.record_class = record_class
+        self.calls = 0
+        self.total_time = 0.0
+        QUERIES[name] = self
+
+    async def fetch(self, conn: asyncpg.Connection, *args) -> List[asyncpg.Record]:
+        start = time.perf_counter()
+        try:
+            return await conn.fetch(self.sql, *args, record_class=self.record_class)
+        finally:
+            self._measure(start)
+
+    async def fetchrow(self, conn: asyncpg.Connection, *args) -> Optional[asyncpg.Record]:
+        start = time.perf_counter()
+        try:
+            return await conn.fetchrow(self.sql, *args, record_class=self.record_class)
+        finally:
+            self._measure(start)
+
+    async def fetchval(self, conn: asyncpg.Connection, *args) -> Any:
+        start = time.perf_counter()
+        try:
+            return await conn.fetchval(self.sql, *args)
+        finally:
+            self._measure(start)
+
+    async def execute(self, conn: asyncpg.Connection, *args) -> str:
+        start = time.perf_counter()
+        try:
+            return await conn.execute(self.sql, *args)
+        finally:
+            self._measure(start)
+
+    async def copy_to(self, conn: asyncpg.Connection, output: Any, **options) -> str:
+        """Écrit le résultat de la requête dans output avec COPY ... TO STDOUT"""
+        start = time.perf_counter()
+        try:
+            return await conn.copy_from_query(self.sql, output=output, **options)
+        finally:
+            self._measure(start)
+
+    def _measure(self, start: float) -> None:
+        self.calls += 1
+        self.total_time += time.perf_counter() - start
+
+def query_stats(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Returns:
+        List: Nom, nombre d'exécutions, temps total et moyen (ms) des
+        requêtes exécutées, de la plus coûteuse à la moins coûteuse
+    """
+    stats = [
+        {
+            'name': query.name,
+            'calls': query.calls,
+            'total_ms': 1000 * query.total_time,
+            'avg_ms': 1000 * query.total_time / query.calls
+        }
+        for query in QUERIES.values()
+        if query.calls
+    ]
+    stats.sort(key=lambda stat: stat['total_ms'], reverse=True)
+    return stats[:limit]
+
+# --- Tokens -----------------------------------------------------------------
+
+USER_TOKENS = Query('user_tokens', """
+    SELECT id, discord_user_id, access_token, refresh_token, valid_token, created_at, updated_at
+    FROM user_tokens
+    WHERE discord_user_id = $1
+""", UserToken)
+
+MANY_USER_TOKENS = Query('many_user_tokens', """
+    SELECT id, discord_user_id, access_token, refresh_token, valid_token, created_at, updated_at
+    FROM user_tokens
+    WHERE discord_user_id = ANY($1::bigint[])
+""", UserToken)
+
+UPSERT_ACCESS_TOKEN = Query('upsert_access_token', """
+    INSERT INTO user_tokens (discord_user_id, access_token, refresh_token, valid_token)
+    VALUES ($1, $2, '', true)
+    ON CONFLICT (discord_user_id) DO UPDATE
+    SET access_token = $2,
+        expires_at = NULL,
+        updated_at = CURRENT_TIMESTAMP
+""")
+
+UPSERT_REFRESH_TOKEN = Query('upsert_refresh_token', """
+    INSERT INTO user_tokens (discord_user_id, access_token, refresh_token, valid_token)
+    VALUES ($1, '', $2, true)
+    ON CONFLICT (discord_user_id) DO UPDATE
+    SET refresh_token = $2,
+        updated_at = CURRENT_TIMESTAMP
+""")
+
+UPSERT_TOKENS = Query('upsert_tokens', """
+    INSERT INTO user_tokens (discord_user_id, access_token, refresh_token, valid_token)
+    VALUES ($1, $2, $3, true)
+    ON CONFLICT (discord_user_id) DO UPDATE
+    SET access_token = $2,
+        refresh_token = $3,
+        valid_token = true,
+        expires_at = NULL,
+        updated_at = CURRENT_TIMESTAMP
+""")
+
+DELETE_USER_TOKENS = Query('delete_user_tokens', """
+    DELETE FROM user_tokens
+    WHERE discord_user_id = $1
+""")
+
+VALID_TOKENS = Query('valid_tokens', """
+    SELECT discord_user_id, access_token, refresh_token, updated_at
+    FROM user_tokens
+    WHERE valid_token = true
+    ORDER BY updated_at DESC
+""", UserToken)
+
+VALID_TOKENS_FIRST_PAGE = Query('valid_tokens_first_page', """
+    SELECT id, discord_user_id, access_token, refresh_token, updated_at
+    FROM user_tokens
+    WHERE valid_token = true
+    ORDER BY updated_at DESC, id DESC
+    LIMIT $1
+""", UserToken)
+
+VALID_TOKENS_NEXT_PAGE = Query('valid_tokens_next_page', """
+    SELECT id, discord_user_id, access_token, refresh_token, updated_at
+    FROM user_tokens
+    WHERE valid_token = true
+      AND (updated_at, id) < ($2, $3)
+    ORDER BY updated_at DESC, id DESC
+    LIMIT $1
+""", UserToken)
+
+TOKENS_FIRST_PAGE = Query('tokens_first_page', """
+    SELECT id, discord_user_id, valid_token, updated_at, created_at
+    FROM user_tokens
+    ORDER BY updated_at DESC, id DESC
+    LIMIT $1
+""", UserToken)
+
+TOKENS_PAGE_AFTER = Query('tokens_page_after', """
+    SELECT id, discord_user_id, valid_token, updated_at, created_at
+    FROM user_tokens
+    WHERE (updated_at, id) < ($2, $3)
+    ORDER BY updated_at DESC, id DESC
+    LIMIT $1
+""", UserToken)
+
+TOKENS_PAGE_BEFORE = Query('tokens_page_before', """
+    SELECT id, discord_user_id, valid_token, updated_at, created_at
+    FROM user_tokens
+    WHERE (updated_at, id) > ($2, $3)
+    ORDER BY updated_at ASC, id ASC
+    LIMIT $1
+""", UserToken)
+
+EXPORT_TOKENS_SUMMARY = Query('export_tokens_summary', """
+    SELECT discord_user_id, valid_token, updated_at, created_at
+    FROM user_tokens
+    ORDER BY updated_at DESC, id DESC
+""")
+
+_EXPORT_TOKENS_SQL = """
+    SELECT discord_user_id, access_token, refresh_token, valid_token,
+           to_json(expires_at) #>> '{}' AS expires_at
+    FROM user_tokens
+    ORDER BY id
+"""
+
+EXPORT_TOKENS = Query('export_tokens', _EXPORT_TOKENS_SQL)
+
+EXPORT_TOKENS_JSON = Query('export_tokens_json', f"SELECT row_to_json(t) FROM ({_EXPORT_TOKENS_SQL}) t")
+
+# Table temporaire de l'import, supprimée à la fin de la transaction
+TOKEN_IMPORT_TABLE = 'token_import'
+
+CREATE_TOKEN_IMPORT = Query('create_token_import', """
+    CREATE TEMP TABLE token_import (
+        line BIGSERIAL,
+        discord_user_id BIGINT NOT NULL,
+        access_token TEXT NOT NULL,
+        refresh_token TEXT NOT NULL,
+        valid_token BOOLEAN NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE
+    ) ON COMMIT DROP
+""")
+
+MERGE_TOKEN_IMPORT = Query('merge_token_import', """
+    INSERT INTO user_tokens (discord_user_id, access_token, refresh_token, valid_token, expires_at)
+    SELECT DISTINCT ON (discord_user_id)
+        discord_user_id, access_token, refresh_token, valid_token, expires_at
+    FROM token_import
+    ORDER BY discord_user_id, line DESC
+    ON CONFLICT (discord_user_id) DO UPDATE
+    SET access_token = EXCLUDED.access_token,
+        refresh_token = EXCLUDED.refresh_token,
+        valid_token = EXCLUDED.valid_token,
+        expires_at = EXCLUDED.expires_at,
+        updated_at = CURRENT_TIMESTAMP
+""")
+
+TOKENS_TO_REFRESH = Query('tokens_to_refresh', """
+    SELECT id, discord_user_id, refresh_token
+    FROM user_tokens
+    WHERE valid_token = true
+      AND refresh_token <> ''
+      AND id > $3
+      AND (
+          expires_at < $1
+          OR (expires_at IS NULL AND updated_at < $2)
+      )
+    ORDER BY id
+    LIMIT $4
+""", UserToken)
+
+SAVE_REFRESHED_TOKENS = Query('save_refreshed_tokens', """
+    UPDATE user_tokens
+    SET access_token = data.access_token,
+        refresh_token = data.refresh_token,
+        expires_at = data.expires_at,
+        valid_token = true,
+        updated_at = CURRENT_TIMESTAMP
+    FROM unnest($1::bigint[], $2::text[], $3::text[], $4::timestamptz[])
+        AS data(discord_user_id, access_token, refresh_token, expires_at)
+    WHERE user_tokens.discord_user_id = data.discord_user_id
+""")
+
+TOKENS_BATCH = Query('tokens_batch', """
+    SELECT id, discord_user_id, access_token
+    FROM user_tokens
+    WHERE id > $1 AND valid_token = true
+    ORDER BY id
+    LIMIT $2
+""", UserToken)
+
+SAVE_TOKEN_VALIDITY = Query('save_token_validity', """
+    UPDATE user_tokens
+    SET valid_token = data.valid_token,
+        updated_at = CURRENT_TIMESTAMP
+    FROM unnest($1::bigint[], $2::bool[]) AS data(discord_user_id, valid_token)
+    WHERE user_tokens.discord_user_id = data.discord_user_id
+      AND user_tokens.valid_token IS DISTINCT FROM data.valid_token
+    RETURNING user_tokens.discord_user_id
+""")
+
+UPDATE_TOKEN_VALIDITY = Query('update_token_validity', """
+    UPDATE user_tokens
+    SET valid_token = $2,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE discord_user_id = $1
+""")
+
+TOKEN_STATS = Query('token_stats', """
+    SELECT
+        COALESCE(SUM(total_tokens), 0)::bigint AS total_tokens,
+        COALESCE(SUM(valid_tokens), 0)::bigint AS valid_tokens,
+        (SELECT MAX(updated_at) FROM user_tokens) AS last_update
+    FROM token_stats
+""")
+
+RECENT_ACTIVITY = Query('recent_activity', """
+    SELECT discord_user_id, updated_at, valid_token
+    FROM user_tokens
+    WHERE updated_at > NOW() - INTERVAL '24 hours'
+    ORDER BY updated_at DESC
+    LIMIT $1
+""", UserToken)
+
+# --- Invalidation par tranches ----------------------------------------------
+
+INVALIDATION_STATE = Query('invalidation_state', """
+    SELECT (value->>'last_id')::bigint AS last_id,
+           (value->>'max_id')::bigint AS max_id,
+           (value->>'invalidated')::bigint AS invalidated
+    FROM bot_state
+    WHERE key = $1
+""")
+
+BEGIN_INVALIDATION = Query('begin_invalidation', """
+    INSERT INTO bot_state (key, value)
+    SELECT $1, jsonb_build_object(
+        'last_id', 0,
+        'max_id', COALESCE(max(id), 0),
+        'invalidated', 0
+    )
+    FROM user_tokens
+    ON CONFLICT (key) DO NOTHING
+""")
+
+INVALIDATE_CHUNK = Query('invalidate_chunk', """
+    WITH chunk AS (
+        SELECT COALESCE(max(id), $2) AS last_id
+        FROM (
+            SELECT id
+            FROM user_tokens
+            WHERE id > $1 AND id <= $2
+            ORDER BY id
+            LIMIT $3
+        ) ids
+    ), invalidated AS (
+        -- Bornes sur la clé primaire : parcours de l'index, sans jointure
+        UPDATE user_tokens
+        SET valid_token = false,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id > $1
+          AND id <= (SELECT last_id FROM chunk)
+          AND valid_token = true
+        RETURNING discord_user_id
+    )
+    SELECT (SELECT last_id FROM chunk) AS last_id,
+           ARRAY(SELECT discord_user_id FROM invalidated) AS discord_user_ids
+""")
+
+SAVE_INVALIDATION_STATE = Query('save_invalidation_state', """
+    UPDATE bot_state
+    SET value = jsonb_build_object(
+        'last_id', $2::bigint,
+        'max_id', $3::bigint,
+        'invalidated', $4::bigint
+    )
+    WHERE key = $1
+""")
+
+END_INVALIDATION = Query('end_invalidation', """
+    DELETE FROM bot_state WHERE key = $1
+""")
+
+# --- Votes ------------------------------------------------------------------
+
+VOTE_NUMBER = Query('vote_number', """
+    SELECT value->>'number'
+    FROM bot_state
+    WHERE key = 'vote_number'
+""")
+
+INCREMENT_VOTE_NUMBER = Query('increment_vote_number', """
+    UPDATE bot_state
+    SET value = jsonb_build_object('number', (value->>'number')::int + 1)
+    WHERE key = 'vote_number'
+    RETURNING (value->>'number')::int
+""")
+
+INSERT_VOTE = Query('insert_vote', """
+    INSERT INTO votes (
+        title, image_name, image_url, json_data,
+        channel_id, message_id, created_by,
+        coord_x, coord_z, session_id,
+        pattern_width, pattern_height, pattern_palette, pattern_pixels, pattern_meta
+    )
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
+    RETURNING id
+""", Vote)
+
+SAVE_VOTE_COUNTS = Query('save_vote_counts', """
+    UPDATE votes
+    SET vote_count = data.vote_count, updated_at = CURRENT_TIMESTAMP
+    FROM unnest($1::bigint[], $2::int[]) AS data(message_id, vote_count)
+    WHERE votes.message_id = data.message_id
+      AND votes.vote_count IS DISTINCT FROM data.vote_count
+""")
+
+SESSION_VOTES = Query('session_votes', """
+    SELECT id, channel_id, message_id
+    FROM votes
+    WHERE session_id = $1 AND is_active = true
+""", Vote)
+
+ACTIVE_VOTES = Query('active_votes', """
+    SELECT id, channel_id, message_id
+    FROM votes
+    WHERE is_active = true
+""", Vote)
+
+VOTE_RANKING = Query('vote_ranking', """
+    SELECT title, vote_count, created_at
+    FROM votes
+    WHERE is_active = true
+    ORDER BY vote_count DESC
+""", Vote)
+
+VOTE_PATTERN = Query('vote_pattern', """
+    SELECT id, json_data,
+           pattern_width, pattern_height, pattern_palette, pattern_pixels, pattern_meta
+    FROM votes
+    WHERE id = $1
+""", Vote)
+
+CLOSE_SESSION = Query('close_session', """
+    WITH current_session AS (
+        SELECT id FROM vote_sessions
+        WHERE is_active = true
+        ORDER BY id DESC LIMIT 1
+    ), counts AS (
+        SELECT * FROM unnest($1::bigint[], $2::int[]) AS data(message_id, vote_count)
+    ), session_votes AS (
+        SELECT v.id, COALESCE(c.vote_count, v.vote_count) AS vote_count
+        FROM votes v
+        JOIN current_session cs ON v.session_id = cs.id
+        LEFT JOIN counts c ON c.message_id = v.message_id
+        WHERE v.is_active = true
+    ), winner AS (
+        SELECT id, vote_count FROM session_votes
+        ORDER BY vote_count DESC, id
+        LIMIT 1
+    ), closed_votes AS (
+        UPDATE votes v
+        SET is_active = false,
+            vote_count = sv.vote_count,
+            updated_at = CURRENT_TIMESTAMP
+        FROM session_votes sv
+        WHERE v.id = sv.id
+        RETURNING v.message_id
+    ), pattern AS (
+        INSERT INTO votes_pattern (
+            title, image_name, image_url, json_data,
+            pattern_width, pattern_height, pattern_palette, pattern_pixels, pattern_meta,
+            coord_x, coord_z, vote_count, original_vote_id
+        )
+        SELECT v.title, v.image_name, v.image_url, v.json_data,
+               v.pattern_width, v.pattern_height, v.pattern_palette, v.pattern_pixels, v.pattern_meta,
+               v.coord_x, v.coord_z, w.vote_count, v.id
+        FROM votes v
+        JOIN winner w ON w.id = v.id
+        WHERE w.vote_count > 0
+    ), closed_session AS (
+        UPDATE vote_sessions SET is_active = false
+        WHERE is_active = true
+    ), state AS (
+        UPDATE bot_state
+        SET value = jsonb_build_object('number', (value->>'number')::int + 1)
+        WHERE key = 'vote_session'
+        RETURNING (value->>'number')::int AS number
+    ), new_session AS (
+        INSERT INTO vote_sessions (number, is_active)
+        SELECT number, true FROM state
+        RETURNING id, number
+    )
+    SELECT
+        cs.id AS session_id,
+        ns.id AS new_session_id,
+        ns.number AS new_session_number,
+        ARRAY(SELECT message_id FROM closed_votes) AS closed_messages,
+        w.id AS winner_id,
+        w.vote_count AS winner_vote_count,
+        v.title, v.image_name, v.image_url, v.coord_x, v.coord_z
+    FROM new_session ns
+    LEFT JOIN current_session cs ON true
+    LEFT JOIN winner w ON true
+    LEFT JOIN votes v ON v.id = w.id
+""")
+
+SESSION_STATE = Query('session_state', """
+    SELECT
+        (SELECT (value->>'number')::int
+         FROM bot_state
+         WHERE key = 'vote_session') AS number,
+        (SELECT id FROM vote_sessions
+         WHERE is_active = true
+         ORDER BY id DESC LIMIT 1) AS id
+""")
+
+# --- Chats privés -----------------------------------------------------------
+
+PRIVATE_CHANNEL = Query('private_channel', """
+    SELECT channel_id
+    FROM private_channels
+    WHERE guild_id = $1 AND discord_user_id = $2
+""")
+
+PRIVATE_CHANNEL_OWNER = Query('private_channel_owner', """
+    SELECT guild_id, discord_user_id
+    FROM private_channels
+    WHERE channel_id = $1
+""")
+
+# La sous-requête voit la ligne telle qu'elle était avant l'insertion
+REGISTER_PRIVATE_CHANNEL = Query('register_private_channel', """
+    INSERT INTO private_channels (guild_id, discord_user_id, channel_id)
+    VALUES ($1, $2, $3)
+    ON CONFLICT (guild_id, discord_user_id) DO UPDATE
+    SET channel_id = $3,
+        created_at = CURRENT_TIMESTAMP
+    RETURNING (
+        SELECT channel_id FROM private_channels
+        WHERE guild_id = $1 AND discord_user_id = $2
+    )
+""")
+
+UNREGISTER_PRIVATE_CHANNEL = Query('unregister_private_channel', """
+    DELETE FROM private_channels
+    WHERE channel_id = $1
+    RETURNING guild_id, discord_user_id
+""")
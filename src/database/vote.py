@@ -1,22 +1,44 @@
-# src/database/models/vote.py
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
+import asyncpg
+from src.database.models import column
+from src.utils.patterns import Pattern, pattern_from_record
 
-class Vote:
-    def __init__(
-        self,
-        id: Optional[int] = None,
-        title: str = "",
-        description: str = "",
-        created_by: int = 0,
-        created_at: Optional[datetime] = None,
-        ends_at: Optional[datetime] = None,
-        is_active: bool = True
-    ):
-        self.id = id
-        self.title = title
-        self.description = description
-        self.created_by = created_by
-        self.created_at = created_at or datetime.now()
-        self.ends_at = ends_at
-        self.is_active = is_active
\ No newline at end of file
+class Vote(asyncpg.Record):
+    """
+    Ligne de la table votes
+    
+    Classe d'enregistrement asyncpg (record_class), voir UserToken.
+    """
+
+    __slots__ = ()
+
+    id: int = column('id')
+    title: str = column('title')
+    image_name: str = column('image_name')
+    image_url: Optional[str] = column('image_url')
+    json_data: Any = column('json_data')
+    pattern_width: Optional[int] = column('pattern_width')
+    pattern_height: Optional[int] = column('pattern_height')
+    pattern_palette: Optional[list] = column('pattern_palette')
+    pattern_pixels: Optional[bytes] = column('pattern_pixels')
+    pattern_meta: Optional[dict] = column('pattern_meta')
+    channel_id: int = column('channel_id')
+    message_id: int = column('message_id')
+    created_by: int = column('created_by')
+    coord_x: int = column('coord_x')
+    coord_z: int = column('coord_z')
+    vote_count: int = column('vote_count')
+    session_id: int = column('session_id')
+    created_at: datetime = column('created_at')
+    updated_at: datetime = column('updated_at')
+    is_active: bool = column('is_active')
+
+    @property
+    def pattern(self) -> Optional[Pattern]:
+        """Pattern du vote, décompressé sans repasser par le JSON"""
+        return pattern_from_record(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit l'enregistrement en dictionnaire"""
+        return dict(self.items())
@@ -4,8 +4,12 @@ Services métier pour le PixelBot
 
 from .token_service import TokenService
 from .vote_service import VoteService  # Ajouter cet import
+from .channel_service import ChannelService
+from .private_channel_service import PrivateChannelService
 
 __all__ = [
     'TokenService',
-    'VoteService'  # Corriger les guillemets et la virgule
+    'VoteService',  # Corriger les guillemets et la virgule
+    'ChannelService',
+    'PrivateChannelService'
 ]
\ No newline at end of file
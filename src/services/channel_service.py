@@ -0,0 +1,136 @@
+from typing import Optional, Dict, Tuple
+import asyncpg
+import discord
+from src.utils.logger import get_logger
+from src.utils.helpers import get_channel_role
+
+class ChannelService:
+    """Index des salons gérés par le bot, par serveur et par rôle"""
+
+    def __init__(self, db_pool: asyncpg.Pool):
+        self.db_pool = db_pool
+        self.logger = get_logger(__name__)
+        # Copie en mémoire de la table guild_channels
+        self._channels: Dict[Tuple[int, str], int] = {}
+        self._roles: Dict[int, Tuple[int, str]] = {}
+
+    async def load(self) -> None:
+        """Charge l'index depuis la base de données"""
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT guild_id, role, channel_id
+                FROM guild_channels
+            """)
+        self._channels = {(row['guild_id'], row['role']): row['channel_id'] for row in rows}
+        self._roles = {row['channel_id']: (row['guild_id'], row['role']) for row in rows}
+        self.logger.info(f"{len(rows)} salons indexés chargés")
+
+    def get_channel_id(self, guild_id: int, role: str) -> Optional[int]:
+        """Retourne l'ID du salon associé à un rôle, sans appel à l'API"""
+        return self._channels.get((guild_id, role))
+
+    def get_role(self, channel_id: int) -> Optional[str]:
+        """Retourne le rôle d'un salon indexé"""
+        entry = self._roles.get(channel_id)
+        return entry[1] if entry else None
+
+    async def resolve(
+        self,
+        guild: discord.Guild,
+        role: str
+    ) -> Optional[discord.abc.GuildChannel]:
+        """
+        Retrouve le salon associé à un rôle
+        
+        Les salons créés avant l'index sont retrouvés une seule fois par leur
+        nom puis enregistrés, les appels suivants ne parcourent plus le serveur.
+        
+        Args:
+            guild: Serveur Discord
+            role: Rôle du salon (ex: 'private_category', 'vote_session:3')
+            
+        Returns:
+            Le salon ou None s'il n'existe pas
+        """
+        channel_id = self.get_channel_id(guild.id, role)
+        if channel_id:
+            channel = guild.get_channel(channel_id)
+            if channel:
+                return channel
+
+        channel = next((c for c in guild.channels if get_channel_role(c) == role), None)
+        if channel:
+            await self.set_channel(guild.id, role, channel.id)
+        return channel
+
+    async def set_channel(self, guild_id: int, role: str, channel_id: int) -> bool:
+        """
+        Associe un salon à un rôle
+        
+        Args:
+            guild_id: ID du serveur
+            role: Rôle du salon
+            channel_id: ID du salon
+            
+        Returns:
+            bool: True si l'index est à jour
+        """
+        if self._channels.get((guild_id, role)) == channel_id:
+            return True
+
+        try:
+            async with self.db_pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute("""
+                        DELETE FROM guild_channels
+                        WHERE channel_id = $1
+                    """, channel_id)
+                    await conn.execute("""
+                        INSERT INTO guild_channels (guild_id, role, channel_id)
+                        VALUES ($1, $2, $3)
+                        ON CONFLICT (guild_id, role) DO UPDATE
+                        SET channel_id = $3
+                    """, guild_id, role, channel_id)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'indexation du salon: {e}")
+            return False
+
+        self._forget(channel_id)
+        previous = self._channels.get((guild_id, role))
+        if previous:
+            self._roles.pop(previous, None)
+        self._channels[(guild_id, role)] = channel_id
+        self._roles[channel_id] = (guild_id, role)
+        return True
+
+    async def remove_channel(self, channel_id: int) -> bool:
+        """
+        Retire un salon de l'index
+        
+        Args:
+            channel_id: ID du salon supprimé
+            
+        Returns:
+            bool: True si le salon était indexé
+        """
+        if channel_id not in self._roles:
+            return False
+
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.execute("""
+                    DELETE FROM guild_channels
+                    WHERE channel_id = $1
+                """, channel_id)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la suppression du salon de l'index: {e}")
+            return False
+
+        self._forget(channel_id)
+        return True
+
+    def _forget(self, channel_id: int) -> None:
+        """Retire un salon de la copie en mémoire"""
+        entry = self._roles.pop(channel_id, None)
+        if entry and self._channels.get(entry) == channel_id:
+            del self._channels[entry]
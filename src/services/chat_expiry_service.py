@@ -0,0 +1,178 @@
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+import asyncpg
+import discord
+from discord.ext import tasks
+from src.utils.helpers import PRIVATE_CATEGORY, get_last_activity, is_private_chat
+from src.utils.jobs import start_job
+from src.utils.logger import get_logger
+
+# Nouvel essai de suppression après une erreur de Discord, doublé à chaque échec
+RETRY_DELAY = timedelta(minutes=1)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+class ChatExpiryScheduler:
+    """Supprime les chats privés lorsque leur durée de vie est écoulée"""
+
+    def __init__(self, bot, db_pool: asyncpg.Pool, ttl: timedelta):
+        self.bot = bot
+        self.db_pool = db_pool
+        self.ttl = ttl
+        self.logger = get_logger(__name__)
+        # Tas des échéances ; une entrée peut précéder l'échéance réelle d'un
+        # salon actif, elle est alors replacée au moment où elle sort du tas
+        self._heap: List[Tuple[datetime, int]] = []
+        self._expiries: Dict[int, datetime] = {}
+        self._dirty: Set[int] = set()
+        # Échecs de suppression consécutifs, pour espacer les nouveaux essais
+        self._failures: Dict[int, int] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Démarre l'ordonnanceur une fois le bot prêt"""
+        self._task = start_job(self._run(), name="chat-expiry")
+        self.flush_expiries.start()
+
+    async def stop(self) -> None:
+        """Arrête l'ordonnanceur et enregistre les échéances en attente"""
+        if self._task:
+            self._task.cancel()
+        self.flush_expiries.cancel()
+        await self.flush_expiries()
+
+    async def load(self) -> None:
+        """Charge les échéances de tous les chats privés"""
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT channel_id, COALESCE(expires_at, created_at + $1) AS expires_at
+                FROM private_channels
+            """, self.ttl)
+
+        for row in rows:
+            expires_at = row['expires_at']
+            # L'activité enregistrée peut être en retard sur le dernier message
+            channel = self.bot.get_channel(row['channel_id'])
+            if channel:
+                expires_at = max(expires_at, get_last_activity(channel) + self.ttl)
+            self._expiries[row['channel_id']] = expires_at
+
+        self._heap = [(expires_at, channel_id) for channel_id, expires_at in self._expiries.items()]
+        heapq.heapify(self._heap)
+        await self._adopt_unregistered()
+        self.logger.info(f"{len(self._heap)} chats privés planifiés")
+
+    async def _adopt_unregistered(self) -> None:
+        """Planifie les chats privés créés avant leur enregistrement en base"""
+        for guild in self.bot.guilds:
+            category = await self.bot.channel_index.resolve(guild, PRIVATE_CATEGORY)
+            if not category:
+                continue
+            for channel in category.text_channels:
+                if channel.id in self._expiries:
+                    continue
+                # Enregistre le chat s'il est retrouvé par ses permissions
+                if await is_private_chat(channel, self.bot.private_channels):
+                    self.schedule(channel.id, get_last_activity(channel) + self.ttl)
+
+    def schedule(self, channel_id: int, expires_at: Optional[datetime] = None) -> None:
+        """
+        Planifie la suppression d'un chat privé
+        
+        Args:
+            channel_id: ID du salon
+            expires_at: Échéance, par défaut maintenant plus la durée de vie
+        """
+        expires_at = expires_at or discord.utils.utcnow() + self.ttl
+        self._expiries[channel_id] = expires_at
+        self._dirty.add(channel_id)
+        heapq.heappush(self._heap, (expires_at, channel_id))
+        if self._heap[0][1] == channel_id:
+            self._wakeup.set()
+
+    def touch(self, channel_id: int) -> None:
+        """Repousse l'échéance d'un chat privé actif, sans accès au tas ni à la base"""
+        if channel_id in self._expiries:
+            self._expiries[channel_id] = discord.utils.utcnow() + self.ttl
+            self._dirty.add(channel_id)
+
+    def cancel(self, channel_id: int) -> None:
+        """Retire un chat privé de la planification"""
+        self._expiries.pop(channel_id, None)
+        self._dirty.discard(channel_id)
+        self._failures.pop(channel_id, None)
+
+    async def _run(self) -> None:
+        await self.bot.wait_until_ready()
+        await self.load()
+
+        while True:
+            self._wakeup.clear()
+            now = discord.utils.utcnow()
+
+            while self._heap and self._heap[0][0] <= now:
+                due, channel_id = heapq.heappop(self._heap)
+                expires_at = self._expiries.get(channel_id)
+                if expires_at is None:
+                    continue
+                if expires_at > due:
+                    heapq.heappush(self._heap, (expires_at, channel_id))
+                    continue
+                await self._expire(channel_id)
+
+            timeout = (self._heap[0][0] - now).total_seconds() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _expire(self, channel_id: int) -> None:
+        """Supprime un chat privé arrivé à échéance"""
+        failures = self._failures.get(channel_id, 0)
+        self.cancel(channel_id)
+        channel = self.bot.get_channel(channel_id)
+        try:
+            if channel:
+                await channel.delete(reason="Chat privé expiré")
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            failures = self._failures[channel_id] = failures + 1
+            delay = min(RETRY_DELAY * 2 ** min(failures - 1, 10), MAX_RETRY_DELAY)
+            self.logger.error(
+                f"Erreur lors de la suppression du chat expiré {channel_id}: {e}, "
+                f"nouvel essai dans {delay}"
+            )
+            self.schedule(channel_id, discord.utils.utcnow() + delay)
+            return
+        await self.bot.private_channels.unregister(channel_id)
+
+    @tasks.loop(minutes=1.0)
+    async def flush_expiries(self):
+        """Enregistre en une requête les échéances repoussées"""
+        if not self._dirty:
+            return
+
+        dirty, self._dirty = self._dirty, set()
+        expiries = {
+            channel_id: self._expiries[channel_id]
+            for channel_id in dirty
+            if channel_id in self._expiries
+        }
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.execute("""
+                    UPDATE private_channels
+                    SET expires_at = data.expires_at
+                    FROM unnest($1::bigint[], $2::timestamptz[]) AS data(channel_id, expires_at)
+                    WHERE private_channels.channel_id = data.channel_id
+                """, list(expiries.keys()), list(expiries.values()))
+        except Exception as e:
+            self._dirty |= dirty
+            self.logger.error(f"Erreur lors de l'enregistrement des échéances: {e}")
+
+    @flush_expiries.before_loop
+    async def before_flush_expiries(self):
+        await self.bot.wait_until_ready()
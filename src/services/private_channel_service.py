@@ -0,0 +1,113 @@
+from typing import Optional
+import asyncpg
+from src.database import queries
+from src.utils.cache import LRUCache
+from src.utils.logger import get_logger
+
+# Marque les entrées absentes du cache, None signifiant "aucun chat privé"
+_MISSING = object()
+
+class PrivateChannelService:
+    """Association entre chaque membre et son chat privé"""
+
+    def __init__(self, db_pool: asyncpg.Pool, cache_size: int = 4096):
+        self.db_pool = db_pool
+        self.logger = get_logger(__name__)
+        self._channels = LRUCache(cache_size)
+        self._owners = LRUCache(cache_size)
+
+    async def get_channel_id(self, guild_id: int, discord_user_id: int) -> Optional[int]:
+        """
+        Récupère le chat privé d'un membre
+        
+        Args:
+            guild_id: ID du serveur
+            discord_user_id: ID Discord du membre
+            
+        Returns:
+            L'ID du salon ou None si le membre n'a pas de chat privé
+        """
+        key = (guild_id, discord_user_id)
+        channel_id = self._channels.get(key, _MISSING)
+        if channel_id is not _MISSING:
+            return channel_id
+
+        async with self.db_pool.acquire() as conn:
+            channel_id = await queries.PRIVATE_CHANNEL.fetchval(conn, guild_id, discord_user_id)
+
+        self._channels.set(key, channel_id)
+        if channel_id:
+            self._owners.set(channel_id, discord_user_id)
+        return channel_id
+
+    async def get_owner_id(self, channel_id: int) -> Optional[int]:
+        """
+        Récupère le propriétaire d'un chat privé
+        
+        Args:
+            channel_id: ID du salon
+            
+        Returns:
+            L'ID Discord du propriétaire ou None si le salon n'est pas un chat privé
+        """
+        owner_id = self._owners.get(channel_id, _MISSING)
+        if owner_id is not _MISSING:
+            return owner_id
+
+        async with self.db_pool.acquire() as conn:
+            row = await queries.PRIVATE_CHANNEL_OWNER.fetchrow(conn, channel_id)
+
+        owner_id = row['discord_user_id'] if row else None
+        self._owners.set(channel_id, owner_id)
+        if row:
+            self._channels.set((row['guild_id'], owner_id), channel_id)
+        return owner_id
+
+    async def register(self, guild_id: int, discord_user_id: int, channel_id: int) -> bool:
+        """
+        Enregistre le chat privé d'un membre
+        
+        Args:
+            guild_id: ID du serveur
+            discord_user_id: ID Discord du membre
+            channel_id: ID du salon créé
+            
+        Returns:
+            bool: True si l'enregistrement est réussi
+        """
+        try:
+            async with self.db_pool.acquire() as conn:
+                previous = await queries.REGISTER_PRIVATE_CHANNEL.fetchval(
+                    conn, guild_id, discord_user_id, channel_id
+                )
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'enregistrement du chat privé: {e}")
+            return False
+
+        if previous and previous != channel_id:
+            self._owners.pop(previous)
+        self._channels.set((guild_id, discord_user_id), channel_id)
+        self._owners.set(channel_id, discord_user_id)
+        return True
+
+    async def unregister(self, channel_id: int) -> bool:
+        """
+        Oublie un chat privé supprimé
+        
+        Args:
+            channel_id: ID du salon
+            
+        Returns:
+            bool: True si le salon était enregistré
+        """
+        try:
+            async with self.db_pool.acquire() as conn:
+                row = await queries.UNREGISTER_PRIVATE_CHANNEL.fetchrow(conn, channel_id)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la suppression du chat privé: {e}")
+            return False
+
+        self._owners.set(channel_id, None)
+        if row:
+            self._channels.set((row['guild_id'], row['discord_user_id']), None)
+        return row is not None
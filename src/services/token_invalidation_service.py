@@ -0,0 +1,125 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+import asyncpg
+from src.database import queries
+from src.services.token_service import TokenService
+from src.utils.logger import get_logger
+
+# Clé de bot_state gardant l'avancement de l'invalidation en cours
+STATE_KEY = 'invalidate_all'
+
+class TokenInvalidator:
+    """
+    Invalide tous les tokens par tranches de clés primaires
+    
+    Chaque tranche est invalidée dans sa propre transaction courte, avec
+    l'enregistrement de l'avancement dans bot_state : les verrous ne portent
+    que sur une tranche à la fois et une tâche interrompue reprend après la
+    dernière tranche validée. Les tokens créés après le lancement ne sont pas
+    concernés.
+    """
+
+    def __init__(
+        self,
+        token_service: TokenService,
+        db_pool: asyncpg.Pool,
+        chunk_size: int = 1000,
+        delay: float = 0.1
+    ):
+        """
+        Args:
+            token_service: Service des tokens, pour invalider son cache
+            db_pool: Pool de connexions à la base de données
+            chunk_size: Nombre de lignes parcourues par transaction
+            delay: Pause entre deux tranches, en secondes
+        """
+        self.token_service = token_service
+        self.db_pool = db_pool
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.logger = get_logger(__name__)
+        self.running = False
+
+    async def get_state(self) -> Optional[Dict[str, int]]:
+        """
+        Returns:
+            L'avancement de l'invalidation en cours (last_id, max_id,
+            invalidated), None si aucune n'est en cours
+        """
+        async with self.db_pool.acquire() as conn:
+            row = await queries.INVALIDATION_STATE.fetchrow(conn, STATE_KEY)
+            return dict(row) if row else None
+
+    async def begin(self) -> Dict[str, int]:
+        """
+        Enregistre une nouvelle invalidation, ou renvoie celle déjà en cours
+        
+        Returns:
+            L'avancement de l'invalidation
+        """
+        async with self.db_pool.acquire() as conn:
+            await queries.BEGIN_INVALIDATION.execute(conn, STATE_KEY)
+        return await self.get_state()
+
+    async def run(
+        self,
+        on_progress: Optional[Callable[[Dict[str, int]], Awaitable[None]]] = None,
+        reserved: bool = False
+    ) -> Optional[Dict[str, int]]:
+        """
+        Invalide les tranches restantes de l'invalidation en cours
+        
+        Args:
+            on_progress: Appelée après chaque tranche avec l'avancement
+            reserved: True si l'appelant a déjà positionné running pour
+                cette tâche
+            
+        Returns:
+            L'avancement final, None si aucune invalidation n'était en cours
+            ou si elle est déjà traitée par une autre tâche
+        """
+        if not reserved:
+            if self.running:
+                return None
+            self.running = True
+
+        try:
+            state = await self.get_state()
+            if not state:
+                return None
+
+            while state['last_id'] < state['max_id']:
+                state = await self._invalidate_chunk(state)
+                if on_progress:
+                    await on_progress(state)
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+
+            async with self.db_pool.acquire() as conn:
+                await queries.END_INVALIDATION.execute(conn, STATE_KEY)
+        finally:
+            self.running = False
+
+        self.logger.info(f"{state['invalidated']} tokens ont été invalidés")
+        return state
+
+    async def _invalidate_chunk(self, state: Dict[str, int]) -> Dict[str, int]:
+        """Invalide la tranche suivante et enregistre l'avancement"""
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                row = await queries.INVALIDATE_CHUNK.fetchrow(
+                    conn, state['last_id'], state['max_id'], self.chunk_size
+                )
+
+                state = {
+                    'last_id': row['last_id'],
+                    'max_id': state['max_id'],
+                    'invalidated': state['invalidated'] + len(row['discord_user_ids'])
+                }
+                await queries.SAVE_INVALIDATION_STATE.execute(
+                    conn, STATE_KEY, state['last_id'], state['max_id'], state['invalidated']
+                )
+
+        for discord_user_id in row['discord_user_ids']:
+            self.token_service.invalidate_cache(discord_user_id)
+        return state
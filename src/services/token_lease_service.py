@@ -0,0 +1,211 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from src.services.token_service import TokenService
+from src.utils.jobs import start_job
+from src.utils.logger import get_logger
+
+# Délai avant de réappliquer des modifications dont la lecture a échoué, en secondes
+SYNC_RETRY_DELAY = 5.0
+
+class TokenLease:
+    """Token prêté en exclusivité à un worker"""
+
+    __slots__ = ('discord_user_id', 'access_token', 'expires_at', '_version')
+
+    def __init__(self, discord_user_id: int, access_token: str, expires_at: float, version: int):
+        self.discord_user_id = discord_user_id
+        self.access_token = access_token
+        self.expires_at = expires_at
+        self._version = version
+
+class _TokenState:
+    """État d'un token dans le pool"""
+
+    __slots__ = ('access_token', 'version', 'uses')
+
+    def __init__(self, access_token: str):
+        self.access_token = access_token
+        # Renouvelée à chaque changement d'état : les entrées plus anciennes
+        # du tas et les baux périmés sont ignorés
+        self.version = 0
+        self.uses: Deque[float] = deque()
+
+class TokenLeasePool:
+    """
+    Distribue les tokens valides aux workers, sans lecture en base
+    
+    Les tokens sont chargés une fois puis tenus à jour par les événements
+    d'écriture de TokenService. Un tas ordonné par date de disponibilité
+    donne le prochain token en O(log n).
+    """
+
+    def __init__(
+        self,
+        token_service: TokenService,
+        lease_duration: float = 60.0,
+        cooldown: float = 5.0,
+        quota: Optional[int] = None,
+        quota_window: float = 3600.0
+    ):
+        """
+        Args:
+            token_service: Service des tokens
+            lease_duration: Durée d'exclusivité d'un bail en secondes
+            cooldown: Délai avant qu'un token rendu puisse être reprêté
+            quota: Nombre maximal de baux par token et par fenêtre, None pour illimité
+            quota_window: Durée de la fenêtre de quota en secondes
+        """
+        self.token_service = token_service
+        self.lease_duration = lease_duration
+        self.cooldown = cooldown
+        self.quota = quota
+        self.quota_window = quota_window
+        self.logger = get_logger(__name__)
+        self._heap: List[Tuple[float, int, int]] = []
+        self._states: Dict[int, _TokenState] = {}
+        # Versions uniques dans tout le pool : un bail d'un token retiré puis
+        # rechargé ne correspond jamais au nouvel état
+        self._versions = itertools.count(1)
+        self._changed = asyncio.Event()
+        self._pending: Set[Optional[int]] = set()
+        self._sync_task: Optional[asyncio.Task] = None
+        token_service.add_listener(self._on_token_changed)
+
+    async def load(self) -> None:
+        """
+        Charge tous les tokens valides
+        
+        Un rechargement fusionne les tokens lus avec les états existants :
+        les tokens prêtés le restent et leurs baux en cours restent valides.
+        """
+        tokens = {}
+        async for token in self.token_service.iter_valid_tokens():
+            tokens[token['discord_user_id']] = token['access_token']
+
+        for discord_user_id in self._states.keys() - tokens.keys():
+            del self._states[discord_user_id]
+        for discord_user_id, access_token in tokens.items():
+            self._update(discord_user_id, access_token)
+        self.logger.info(f"{len(self._states)} tokens disponibles pour les baux")
+
+    async def acquire(self, timeout: Optional[float] = None) -> Optional[TokenLease]:
+        """
+        Prend le prochain token disponible
+        
+        Args:
+            timeout: Attente maximale en secondes, None pour attendre indéfiniment
+            
+        Returns:
+            Le bail obtenu, ou None si aucun token ne s'est libéré à temps
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            self._changed.clear()
+            now = time.monotonic()
+            self._drop_stale()
+
+            if self._heap and self._heap[0][0] <= now:
+                _, _, discord_user_id = heapq.heappop(self._heap)
+                return self._lease(discord_user_id, now)
+
+            wait = self._heap[0][0] - now if self._heap else None
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    return None
+                wait = remaining if wait is None else min(wait, remaining)
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, lease: TokenLease) -> None:
+        """Rend un token, disponible à nouveau après le délai de refroidissement"""
+        state = self._states.get(lease.discord_user_id)
+        if not state or state.version != lease._version:
+            # Bail expiré ou token retiré entre-temps
+            return
+
+        now = time.monotonic()
+        self._schedule(lease.discord_user_id, state, self._next_available(state, now + self.cooldown))
+
+    async def report_invalid(self, lease: TokenLease) -> None:
+        """Retire un token refusé par l'API et le marque invalide en base"""
+        self._states.pop(lease.discord_user_id, None)
+        await self.token_service.update_token_validity(lease.discord_user_id, False)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _lease(self, discord_user_id: int, now: float) -> TokenLease:
+        state = self._states[discord_user_id]
+        state.uses.append(now)
+        expires_at = now + self.lease_duration
+        # Sans release(), le token redevient disponible à la fin du bail
+        self._schedule(discord_user_id, state, self._next_available(state, expires_at))
+        return TokenLease(discord_user_id, state.access_token, expires_at, state.version)
+
+    def _next_available(self, state: _TokenState, earliest: float) -> float:
+        if self.quota is None:
+            return earliest
+        while state.uses and state.uses[0] <= earliest - self.quota_window:
+            state.uses.popleft()
+        if len(state.uses) < self.quota:
+            return earliest
+        return max(earliest, state.uses[0] + self.quota_window)
+
+    def _update(self, discord_user_id: int, access_token: str) -> None:
+        """Met à jour un token, un nouveau token est disponible immédiatement"""
+        state = self._states.get(discord_user_id)
+        if state:
+            state.access_token = access_token
+        else:
+            state = self._states[discord_user_id] = _TokenState(access_token)
+            self._schedule(discord_user_id, state, time.monotonic())
+
+    def _schedule(self, discord_user_id: int, state: _TokenState, available_at: float) -> None:
+        state.version = next(self._versions)
+        heapq.heappush(self._heap, (available_at, state.version, discord_user_id))
+        self._changed.set()
+
+    def _drop_stale(self) -> None:
+        while self._heap:
+            _, version, discord_user_id = self._heap[0]
+            state = self._states.get(discord_user_id)
+            if state and state.version == version:
+                return
+            heapq.heappop(self._heap)
+
+    def _on_token_changed(self, discord_user_id: Optional[int]) -> None:
+        self._pending.add(discord_user_id)
+        if not self._sync_task or self._sync_task.done():
+            self._sync_task = start_job(self._sync(), name="token-leases-sync")
+
+    async def _sync(self) -> None:
+        """Applique les modifications de tokens signalées par TokenService"""
+        while self._pending:
+            pending, self._pending = self._pending, set()
+            try:
+                if None in pending:
+                    await self.load()
+                    continue
+
+                # Une seule requête pour tous les tokens modifiés
+                rows = await self.token_service.get_many_user_tokens(list(pending))
+            except Exception as e:
+                # Réessayer après un délai, avec les modifications signalées entre-temps
+                self._pending |= pending
+                self.logger.error(f"Erreur lors de la mise à jour des baux: {e}")
+                await asyncio.sleep(SYNC_RETRY_DELAY)
+                continue
+
+            for discord_user_id in pending:
+                tokens = rows.get(discord_user_id)
+                if not tokens or not tokens['valid_token'] or not tokens['access_token']:
+                    self._states.pop(discord_user_id, None)
+                else:
+                    self._update(discord_user_id, tokens['access_token'])
@@ -0,0 +1,169 @@
+import asyncio
+from datetime import timedelta
+from typing import Optional, Tuple
+import aiohttp
+import discord
+from discord.ext import tasks
+from src.services.token_service import TokenService
+from src.utils.config import Config
+from src.utils.logger import get_logger
+from src.utils.ratelimit import HostRateLimiter
+
+# Réponse de l'endpoint indiquant un refresh token révoqué ou expiré
+INVALID = object()
+
+# Réponse de l'endpoint refusant les identifiants du bot (client_id ou
+# client_secret) : aucun token ne peut être rafraîchi pendant ce passage
+CLIENT_REJECTED = object()
+
+class TokenRefresher:
+    """Rafraîchit en tâche de fond les access tokens proches de l'expiration"""
+
+    def __init__(self, token_service: TokenService, config: Config):
+        """
+        Args:
+            token_service: Service des tokens
+            config: Section oauth de la configuration
+        """
+        self.token_service = token_service
+        self.logger = get_logger(__name__)
+        self.token_url = config.get('token_url')
+        self.client_id = config.get('client_id')
+        self.client_secret = config.get('client_secret')
+        self.concurrency = config.get('concurrency', 10)
+        self.batch_size = config.get('batch_size', 200)
+        self.refresh_margin = timedelta(minutes=config.get('refresh_margin_minutes', 10))
+        self.token_lifetime = timedelta(hours=config.get('token_lifetime_hours', 24))
+        self.rate_limiter = HostRateLimiter(config.get('rate_limit', 20))
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.refresh_due_tokens.change_interval(minutes=config.get('refresh_interval_minutes', 5))
+
+    def start(self) -> None:
+        """Ouvre le client HTTP et démarre la boucle de rafraîchissement"""
+        # Connexions keep-alive réutilisées, au plus une par requête simultanée
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=15)
+        )
+        self.refresh_due_tokens.start()
+
+    async def close(self) -> None:
+        """Arrête la boucle et ferme le client HTTP"""
+        self.refresh_due_tokens.cancel()
+        if self.session:
+            await self.session.close()
+
+    @tasks.loop(minutes=5.0)
+    async def refresh_due_tokens(self):
+        """Rafraîchit tous les tokens arrivant à expiration, lot par lot"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        after_id = 0
+        refreshed = invalid = 0
+
+        try:
+            while True:
+                now = discord.utils.utcnow()
+                batch = await self.token_service.get_tokens_to_refresh(
+                    expires_before=now + self.refresh_margin,
+                    updated_before=now - self.token_lifetime,
+                    after_id=after_id,
+                    limit=self.batch_size
+                )
+                if not batch:
+                    break
+                after_id = batch[-1]['id']
+
+                async def refresh(token) -> Tuple[int, Optional[tuple]]:
+                    async with semaphore:
+                        return token['discord_user_id'], await self.refresh_token(token['refresh_token'])
+
+                results = await asyncio.gather(*(refresh(token) for token in batch))
+
+                refreshed_tokens = [
+                    (discord_user_id, *result)
+                    for discord_user_id, result in results
+                    if isinstance(result, tuple)
+                ]
+                await self.token_service.save_refreshed_tokens(refreshed_tokens)
+                refreshed += len(refreshed_tokens)
+
+                for discord_user_id, result in results:
+                    if result is INVALID:
+                        await self.token_service.update_token_validity(discord_user_id, False)
+                        invalid += 1
+
+                if any(result is CLIENT_REJECTED for _, result in results):
+                    self.logger.error("Identifiants OAuth refusés (invalid_client), rafraîchissement interrompu")
+                    break
+
+                if len(batch) < self.batch_size:
+                    break
+
+        except Exception as e:
+            self.logger.error(f"Erreur lors du rafraîchissement des tokens: {e}")
+
+        if refreshed or invalid:
+            self.logger.info(f"Tokens rafraîchis: {refreshed}, invalidés: {invalid}")
+
+    async def refresh_token(self, refresh_token: str):
+        """
+        Échange un refresh token auprès de l'endpoint OAuth
+        
+        Args:
+            refresh_token: Refresh token de l'utilisateur
+            
+        Returns:
+            (access_token, refresh_token, expires_at) en cas de succès,
+            INVALID si l'endpoint refuse le token (invalid_grant),
+            CLIENT_REJECTED s'il refuse les identifiants du bot (invalid_client),
+            None en cas d'erreur temporaire ou de réponse inattendue
+        """
+        await self.rate_limiter.acquire(self.token_url)
+        try:
+            async with self.session.post(self.token_url, data={
+                'grant_type': 'refresh_token',
+                'refresh_token': refresh_token,
+                'client_id': self.client_id,
+                'client_secret': self.client_secret
+            }) as response:
+                if response.status in (400, 401):
+                    # Seul invalid_grant désigne le token de l'utilisateur
+                    payload = await response.json(content_type=None)
+                    error = payload.get('error') if isinstance(payload, dict) else None
+                    if error == 'invalid_grant':
+                        return INVALID
+                    if error == 'invalid_client':
+                        return CLIENT_REJECTED
+                    self.logger.warning(f"Rafraîchissement refusé ({response.status}): {error}")
+                    return None
+                if response.status != 200:
+                    return None
+                payload = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self.logger.warning(f"Erreur lors du rafraîchissement d'un token: {e}")
+            return None
+
+        # Réponse inattendue de l'endpoint : nouvel essai au prochain passage
+        if not isinstance(payload, dict):
+            self.logger.warning("Réponse de rafraîchissement invalide")
+            return None
+        access_token = payload.get('access_token')
+        if not access_token or not isinstance(access_token, str):
+            self.logger.warning("Réponse de rafraîchissement sans access_token")
+            return None
+        expires_in = payload.get('expires_in')
+        if expires_in is not None and (
+            isinstance(expires_in, bool) or not isinstance(expires_in, (int, float)) or expires_in < 0
+        ):
+            self.logger.warning(f"Réponse de rafraîchissement avec expires_in invalide: {expires_in!r}")
+            return None
+        new_refresh_token = payload.get('refresh_token')
+        if new_refresh_token is not None and not isinstance(new_refresh_token, str):
+            self.logger.warning("Réponse de rafraîchissement avec refresh_token invalide")
+            return None
+        expires_at = (
+            discord.utils.utcnow() + timedelta(seconds=expires_in)
+            if expires_in else None
+        )
+        return access_token, new_refresh_token or refresh_token, expires_at
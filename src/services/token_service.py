@@ -1,16 +1,125 @@
-from typing import Optional, Dict, Any, List
+import asyncio
+import time
+from typing import Optional, Dict, Any, List, AsyncIterator, BinaryIO, Tuple, Callable, Awaitable, Hashable, Iterable
 import asyncpg
 from datetime import datetime
+from src.database import queries
+from src.database.models import UserToken
 from src.utils.logger import get_logger
+from src.utils.cache import LRUCache
+
+# Durée de validité des statistiques en mémoire, en secondes
+STATS_TTL = 30.0
+
+# Colonnes des fichiers d'import et d'export des tokens
+IMPORT_COLUMNS = ('discord_user_id', 'access_token', 'refresh_token', 'valid_token', 'expires_at')
+
+# Marque les entrées absentes du cache, None signifiant "aucun token"
+_MISSING = object()
+
+class BatchLoader:
+    """
+    Regroupe les lectures demandées pendant un même tour de boucle
+    
+    Les clés demandées avant que la boucle ne reprenne la main sont chargées
+    par un seul appel à load_many ; une clé déjà en attente ou en cours de
+    chargement partage le résultat de la première demande.
+    """
+
+    def __init__(
+        self,
+        load_many: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        max_batch_size: int = 1000
+    ):
+        self._load_many = load_many
+        self.max_batch_size = max_batch_size
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Tuple[Hashable, asyncio.Future]] = []
+
+    async def load(self, key: Hashable) -> Any:
+        """Retourne la valeur associée à la clé, None si elle n'existe pas"""
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            self._queue.append((key, future))
+        # shield : l'annulation d'un appelant ne doit pas annuler les autres
+        return await asyncio.shield(future)
+
+    def forget(self, key: Optional[Hashable] = None) -> None:
+        """
+        Ne partage plus le chargement en cours d'une clé
+        
+        Les demandes suivantes relisent la valeur au lieu d'attendre un
+        résultat lu avant une modification.
+        
+        Args:
+            key: Clé modifiée, None pour toutes les clés
+        """
+        if key is None:
+            self._futures.clear()
+        else:
+            self._futures.pop(key, None)
+
+    def _dispatch(self) -> None:
+        entries, self._queue = self._queue, []
+        for start in range(0, len(entries), self.max_batch_size):
+            asyncio.create_task(self._load_batch(entries[start:start + self.max_batch_size]))
+
+    async def _load_batch(self, entries: List[Tuple[Hashable, asyncio.Future]]) -> None:
+        try:
+            values = await self._load_many(list({key: None for key, _ in entries}))
+        except Exception as e:
+            for key, future in entries:
+                self._release(key, future)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in entries:
+            self._release(key, future)
+            if not future.done():
+                future.set_result(values.get(key))
+
+    def _release(self, key: Hashable, future: asyncio.Future) -> None:
+        # La clé a pu être oubliée puis redemandée pendant le chargement
+        if self._futures.get(key) is future:
+            del self._futures[key]
 
 class TokenService:
     """Service de gestion des tokens utilisateurs"""
 
-    def __init__(self, db_pool: asyncpg.Pool):
+    def __init__(
+        self,
+        db_pool: asyncpg.Pool,
+        cache_size: int = 10000,
+        cache_ttl: Optional[float] = 300.0,
+        batch_reads: bool = False
+    ):
+        """
+        Args:
+            db_pool: Pool de connexions à la base de données
+            cache_size: Nombre maximal d'utilisateurs gardés en cache
+            cache_ttl: Durée de vie d'une entrée du cache en secondes
+            batch_reads: Regroupe en une requête les lectures simultanées
+        """
         self.db_pool = db_pool
         self.logger = get_logger(__name__)
+        self._tokens = LRUCache(cache_size, ttl=cache_ttl)
+        # Lectures en cours : [génération, lecteurs] par utilisateur. Une
+        # invalidation incrémente la génération ; une lecture commencée avant
+        # n'est alors pas mise en cache. _epoch joue ce rôle pour le cache entier.
+        self._reads: Dict[int, List[int]] = {}
+        self._epoch = 0
+        self._loader = BatchLoader(self.get_many_user_tokens) if batch_reads else None
+        self._listeners: List[Callable[[Optional[int]], None]] = []
+        self._stats: Optional[Dict[str, Any]] = None
+        self._stats_expires_at = 0.0
 
-    async def get_user_tokens(self, discord_user_id: int) -> Optional[Dict[str, Any]]:
+    async def get_user_tokens(self, discord_user_id: int) -> Optional[UserToken]:
         """
         Récupère les tokens d'un utilisateur
         
@@ -20,23 +129,86 @@ class TokenService:
         Returns:
             Dict contenant les tokens ou None si non trouvé
         """
+        tokens = self._tokens.get(discord_user_id, _MISSING)
+        if tokens is not _MISSING:
+            return tokens
+
+        read = self._reads.setdefault(discord_user_id, [0, 0])
+        read[1] += 1
+        generation = (self._epoch, read[0])
         try:
-            async with self.db_pool.acquire() as conn:
-                return await conn.fetchrow("""
-                    SELECT 
-                        id,
-                        discord_user_id,
-                        access_token,
-                        refresh_token,
-                        valid_token,
-                        created_at,
-                        updated_at
-                    FROM user_tokens 
-                    WHERE discord_user_id = $1
-                """, discord_user_id)
+            if self._loader:
+                tokens = await self._loader.load(discord_user_id)
+            else:
+                async with self.db_pool.acquire() as conn:
+                    tokens = await queries.USER_TOKENS.fetchrow(conn, discord_user_id)
         except asyncpg.PostgresError as e:
             self.logger.error(f"Erreur lors de la récupération des tokens: {e}")
             return None
+        finally:
+            read[1] -= 1
+            if not read[1]:
+                del self._reads[discord_user_id]
+
+        # Une écriture pendant la lecture : le résultat est rendu sans être gardé
+        if generation == (self._epoch, read[0]):
+            self._tokens.set(discord_user_id, tokens)
+        return tokens
+
+    async def get_many_user_tokens(self, discord_user_ids: List[int]) -> Dict[int, UserToken]:
+        """
+        Récupère en une requête les tokens de plusieurs utilisateurs
+        
+        Args:
+            discord_user_ids: IDs Discord des utilisateurs
+            
+        Returns:
+            Dict: Tokens indexés par ID Discord, sans les utilisateurs inconnus
+        """
+        async with self.db_pool.acquire() as conn:
+            rows = await queries.MANY_USER_TOKENS.fetch(conn, discord_user_ids)
+        return {row['discord_user_id']: row for row in rows}
+
+    def invalidate_cache(self, discord_user_id: Optional[int] = None) -> None:
+        """
+        Signale la modification des tokens d'un utilisateur
+        
+        Retire l'entrée du cache puis prévient les abonnés (voir add_listener).
+        
+        Args:
+            discord_user_id: ID Discord de l'utilisateur, None après une
+                modification en masse (vide tout le cache)
+        """
+        if discord_user_id is None:
+            self._tokens.clear()
+            self._epoch += 1
+        else:
+            self._tokens.pop(discord_user_id)
+            read = self._reads.get(discord_user_id)
+            if read:
+                read[0] += 1
+        if self._loader:
+            self._loader.forget(discord_user_id)
+
+        for listener in self._listeners:
+            try:
+                listener(discord_user_id)
+            except Exception as e:
+                self.logger.error(f"Erreur dans un abonné aux modifications de tokens: {e}")
+
+    def add_listener(self, listener: Callable[[Optional[int]], None]) -> None:
+        """
+        Abonne une fonction aux modifications de tokens
+        
+        Args:
+            listener: Appelée avec l'ID Discord modifié, ou None après une
+                modification en masse
+        """
+        self._listeners.append(listener)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Retourne les compteurs du cache des tokens (taille, hits, misses, évictions)"""
+        return self._tokens.stats()
 
     async def update_access_token(self, discord_user_id: int, access_token: str) -> bool:
         """
@@ -51,23 +223,14 @@ class TokenService:
         """
         try:
             async with self.db_pool.acquire() as conn:
-                await conn.execute("""
-                    INSERT INTO user_tokens (
-                        discord_user_id,
-                        access_token,
-                        refresh_token,
-                        valid_token
-                    ) VALUES ($1, $2, '', true)
-                    ON CONFLICT (discord_user_id) DO UPDATE
-                    SET 
-                        access_token = $2,
-                        updated_at = CURRENT_TIMESTAMP
-                """, discord_user_id, access_token)
+                await queries.UPSERT_ACCESS_TOKEN.execute(conn, discord_user_id, access_token)
                 return True
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la mise à jour de l'access token: {e}")
             return False
+        finally:
+            self.invalidate_cache(discord_user_id)
 
     async def update_refresh_token(self, discord_user_id: int, refresh_token: str) -> bool:
         """
@@ -82,23 +245,14 @@ class TokenService:
         """
         try:
             async with self.db_pool.acquire() as conn:
-                await conn.execute("""
-                    INSERT INTO user_tokens (
-                        discord_user_id,
-                        access_token,
-                        refresh_token,
-                        valid_token
-                    ) VALUES ($1, '', $2, true)
-                    ON CONFLICT (discord_user_id) DO UPDATE
-                    SET 
-                        refresh_token = $2,
-                        updated_at = CURRENT_TIMESTAMP
-                """, discord_user_id, refresh_token)
+                await queries.UPSERT_REFRESH_TOKEN.execute(conn, discord_user_id, refresh_token)
                 return True
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la mise à jour du refresh token: {e}")
             return False
+        finally:
+            self.invalidate_cache(discord_user_id)
 
     async def update_tokens(
         self, 
@@ -119,25 +273,14 @@ class TokenService:
         """
         try:
             async with self.db_pool.acquire() as conn:
-                await conn.execute("""
-                    INSERT INTO user_tokens (
-                        discord_user_id,
-                        access_token,
-                        refresh_token,
-                        valid_token
-                    ) VALUES ($1, $2, $3, true)
-                    ON CONFLICT (discord_user_id) DO UPDATE
-                    SET 
-                        access_token = $2,
-                        refresh_token = $3,
-                        valid_token = true,
-                        updated_at = CURRENT_TIMESTAMP
-                """, discord_user_id, access_token, refresh_token)
+                await queries.UPSERT_TOKENS.execute(conn, discord_user_id, access_token, refresh_token)
                 return True
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la mise à jour des tokens: {e}")
             return False
+        finally:
+            self.invalidate_cache(discord_user_id)
 
     async def remove_user_tokens(self, discord_user_id: int) -> bool:
         """
@@ -151,17 +294,16 @@ class TokenService:
         """
         try:
             async with self.db_pool.acquire() as conn:
-                result = await conn.execute("""
-                    DELETE FROM user_tokens
-                    WHERE discord_user_id = $1
-                """, discord_user_id)
+                result = await queries.DELETE_USER_TOKENS.execute(conn, discord_user_id)
                 return result == "DELETE 1"
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la suppression des tokens: {e}")
             return False
+        finally:
+            self.invalidate_cache(discord_user_id)
 
-    async def get_all_valid_tokens(self) -> List[Dict[str, Any]]:
+    async def get_all_valid_tokens(self) -> List[UserToken]:
         """
         Récupère tous les tokens valides
         
@@ -170,20 +312,271 @@ class TokenService:
         """
         try:
             async with self.db_pool.acquire() as conn:
-                return await conn.fetch("""
-                    SELECT 
-                        discord_user_id,
-                        access_token,
-                        refresh_token,
-                        updated_at
-                    FROM user_tokens
-                    WHERE valid_token = true
-                    ORDER BY updated_at DESC
-                """)
+                return await queries.VALID_TOKENS.fetch(conn)
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération des tokens valides: {e}")
             return []
 
+    async def iter_valid_tokens(self, page_size: int = 500) -> AsyncIterator[UserToken]:
+        """
+        Parcourt les tokens valides page par page, du plus récent au plus ancien
+        
+        Chaque page est lue par une requête indépendante reprenant après la
+        dernière ligne de la précédente (updated_at, id) : la mémoire utilisée
+        reste bornée et aucune connexion n'est gardée entre deux pages.
+        
+        Args:
+            page_size: Nombre de tokens lus par requête
+            
+        Yields:
+            Les tokens valides
+            
+        Raises:
+            L'erreur de lecture d'une page, après l'avoir journalisée
+        """
+        last_key = None
+        while True:
+            try:
+                async with self.db_pool.acquire() as conn:
+                    if last_key is None:
+                        rows = await queries.VALID_TOKENS_FIRST_PAGE.fetch(conn, page_size)
+                    else:
+                        rows = await queries.VALID_TOKENS_NEXT_PAGE.fetch(conn, page_size, *last_key)
+            except Exception as e:
+                # Propager l'erreur : un parcours interrompu ne doit pas passer
+                # pour un résultat complet
+                self.logger.error(f"Erreur lors du parcours des tokens valides: {e}")
+                raise
+
+            for row in rows:
+                yield row
+
+            if len(rows) < page_size:
+                return
+            last_key = (rows[-1]['updated_at'], rows[-1]['id'])
+
+    async def get_tokens_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        before: Optional[Tuple[datetime, int]] = None
+    ) -> List[UserToken]:
+        """
+        Récupère une page de tokens, du plus récent au plus ancien
+        
+        Args:
+            limit: Nombre maximal de tokens
+            after: Clé (updated_at, id) de la dernière ligne de la page précédente
+            before: Clé (updated_at, id) de la première ligne de la page suivante
+            
+        Returns:
+            List: Tokens de la page, sans les valeurs des tokens
+        """
+        try:
+            async with self.db_pool.acquire() as conn:
+                if before is not None:
+                    rows = await queries.TOKENS_PAGE_BEFORE.fetch(conn, limit, *before)
+                    return list(reversed(rows))
+
+                if after is not None:
+                    return await queries.TOKENS_PAGE_AFTER.fetch(conn, limit, *after)
+
+                return await queries.TOKENS_FIRST_PAGE.fetch(conn, limit)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la récupération de la page de tokens: {e}")
+            return []
+
+    async def export_tokens_csv(self, output: BinaryIO) -> bool:
+        """
+        Écrit la liste des tokens au format CSV, sans les valeurs des tokens
+        
+        Les lignes sont produites par le serveur (COPY ... TO STDOUT) et écrites
+        au fil de l'eau dans output.
+        
+        Args:
+            output: Fichier binaire de destination
+            
+        Returns:
+            bool: True si l'export est réussi
+        """
+        try:
+            async with self.db_pool.acquire() as conn:
+                await queries.EXPORT_TOKENS_SUMMARY.copy_to(conn, output, format='csv', header=True)
+                return True
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'export des tokens: {e}")
+            return False
+
+    async def import_tokens(self, records: Iterable[tuple]) -> int:
+        """
+        Importe des tokens en masse
+        
+        Les lignes sont envoyées au fil de l'eau par COPY dans une table
+        temporaire, puis fusionnées dans user_tokens par une seule requête ;
+        la mémoire utilisée ne dépend pas du nombre de lignes. Pour un même
+        utilisateur, la dernière ligne importée l'emporte.
+        
+        Args:
+            records: Tuples (discord_user_id, access_token, refresh_token,
+                valid_token, expires_at), itérable synchrone ou asynchrone
+            
+        Returns:
+            int: Nombre de tokens créés ou mis à jour, -1 en cas d'erreur
+        """
+        try:
+            async with self.db_pool.acquire() as conn:
+                async with conn.transaction():
+                    await queries.CREATE_TOKEN_IMPORT.execute(conn)
+                    await conn.copy_records_to_table(
+                        queries.TOKEN_IMPORT_TABLE,
+                        records=records,
+                        columns=IMPORT_COLUMNS
+                    )
+                    result = await queries.MERGE_TOKEN_IMPORT.execute(conn)
+                    return int(result.split()[-1])
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'import des tokens: {e}")
+            return -1
+        finally:
+            self.invalidate_cache()
+
+    async def export_tokens(self, output: BinaryIO, format: str = 'csv') -> bool:
+        """
+        Écrit tous les tokens, valeurs comprises, pour une sauvegarde
+        
+        Le fichier produit peut être relu par import_tokens.
+        
+        Args:
+            output: Fichier binaire de destination
+            format: 'csv' ou 'jsonl'
+            
+        Returns:
+            bool: True si l'export est réussi
+        """
+        try:
+            async with self.db_pool.acquire() as conn:
+                if format == 'jsonl':
+                    # Une colonne JSON par ligne ; délimiteur et guillemet choisis
+                    # parmi les caractères que le JSON échappe toujours, pour que
+                    # COPY écrive les documents tels quels
+                    await queries.EXPORT_TOKENS_JSON.copy_to(
+                        conn, output, format='csv', delimiter='\x1f', quote='\x01'
+                    )
+                else:
+                    await queries.EXPORT_TOKENS.copy_to(conn, output, format='csv', header=True)
+                return True
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'export des tokens: {e}")
+            return False
+
+    async def get_tokens_to_refresh(
+        self,
+        expires_before: datetime,
+        updated_before: datetime,
+        after_id: int,
+        limit: int
+    ) -> List[UserToken]:
+        """
+        Récupère un lot de tokens valides à rafraîchir
+        
+        Args:
+            expires_before: Tokens expirant avant cette date
+            updated_before: Tokens sans date d'expiration mis à jour avant cette date
+            after_id: Reprend après ce user_tokens.id
+            limit: Taille du lot
+            
+        Returns:
+            List: Tokens à rafraîchir, triés par id
+        """
+        try:
+            async with self.db_pool.acquire() as conn:
+                return await queries.TOKENS_TO_REFRESH.fetch(
+                    conn, expires_before, updated_before, after_id, limit
+                )
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la sélection des tokens à rafraîchir: {e}")
+            return []
+
+    async def save_refreshed_tokens(self, tokens: List[tuple]) -> int:
+        """
+        Enregistre en une requête des tokens rafraîchis
+        
+        Args:
+            tokens: Tuples (discord_user_id, access_token, refresh_token, expires_at)
+            
+        Returns:
+            int: Nombre de tokens mis à jour
+        """
+        if not tokens:
+            return 0
+
+        discord_user_ids, access_tokens, refresh_tokens, expires_at = zip(*tokens)
+        try:
+            async with self.db_pool.acquire() as conn:
+                result = await queries.SAVE_REFRESHED_TOKENS.execute(
+                    conn, list(discord_user_ids), list(access_tokens),
+                    list(refresh_tokens), list(expires_at)
+                )
+                return int(result.split()[-1])
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'enregistrement des tokens rafraîchis: {e}")
+            return 0
+        finally:
+            for discord_user_id in discord_user_ids:
+                self.invalidate_cache(discord_user_id)
+
+    async def get_tokens_batch(self, after_id: int, limit: int) -> List[UserToken]:
+        """
+        Récupère un lot de tokens valides, dans l'ordre des id
+        
+        Args:
+            after_id: Reprend après ce user_tokens.id
+            limit: Taille du lot
+            
+        Returns:
+            List: Tokens (id, discord_user_id, access_token), triés par id
+            
+        Raises:
+            L'erreur de lecture, après l'avoir journalisée
+        """
+        try:
+            async with self.db_pool.acquire() as conn:
+                return await queries.TOKENS_BATCH.fetch(conn, after_id, limit)
+        except Exception as e:
+            # Propager l'erreur : un lot vide marquerait la fin du parcours
+            self.logger.error(f"Erreur lors de la lecture d'un lot de tokens: {e}")
+            raise
+
+    async def save_token_validity(self, results: List[Tuple[int, bool]]) -> int:
+        """
+        Enregistre en une requête la validité de plusieurs tokens
+        
+        Seules les lignes dont l'état change sont réécrites.
+        
+        Args:
+            results: Tuples (discord_user_id, is_valid)
+            
+        Returns:
+            int: Nombre de tokens dont la validité a changé
+            
+        Raises:
+            L'erreur d'écriture, après l'avoir journalisée
+        """
+        if not results:
+            return 0
+
+        discord_user_ids, validity = zip(*results)
+        try:
+            async with self.db_pool.acquire() as conn:
+                changed = await queries.SAVE_TOKEN_VALIDITY.fetch(conn, list(discord_user_ids), list(validity))
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'enregistrement de la validité des tokens: {e}")
+            raise
+
+        for row in changed:
+            self.invalidate_cache(row['discord_user_id'])
+        return len(changed)
+
     async def update_token_validity(self, discord_user_id: int, is_valid: bool) -> bool:
         """
         Met à jour la validité des tokens d'un utilisateur
@@ -197,44 +590,32 @@ class TokenService:
         """
         try:
             async with self.db_pool.acquire() as conn:
-                result = await conn.execute("""
-                    UPDATE user_tokens
-                    SET 
-                        valid_token = $2,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE discord_user_id = $1
-                """, discord_user_id, is_valid)
+                result = await queries.UPDATE_TOKEN_VALIDITY.execute(conn, discord_user_id, is_valid)
                 return result == "UPDATE 1"
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la mise à jour de la validité: {e}")
             return False
+        finally:
+            self.invalidate_cache(discord_user_id)
 
     async def get_tokens_stats(self) -> Dict[str, Any]:
         """
         Récupère les statistiques sur les tokens
         
+        Les compteurs sont tenus à jour par triggers dans les lignes de
+        token_stats, la dernière mise à jour est lue sur l'index de
+        updated_at ; le tout est conservé STATS_TTL secondes en mémoire.
+        
         Returns:
             Dict: Statistiques des tokens
         """
+        if self._stats is not None and time.monotonic() < self._stats_expires_at:
+            return self._stats
+
         try:
             async with self.db_pool.acquire() as conn:
-                stats = await conn.fetchrow("""
-                    SELECT 
-                        COUNT(*) as total_tokens,
-                        SUM(CASE WHEN valid_token THEN 1 ELSE 0 END) as valid_tokens,
-                        SUM(CASE WHEN NOT valid_token THEN 1 ELSE 0 END) as invalid_tokens,
-                        COUNT(DISTINCT discord_user_id) as unique_users,
-                        MAX(updated_at) as last_update
-                    FROM user_tokens
-                """)
-                return {
-                    'total_tokens': stats['total_tokens'],
-                    'valid_tokens': stats['valid_tokens'] or 0,
-                    'invalid_tokens': stats['invalid_tokens'] or 0,
-                    'unique_users': stats['unique_users'],
-                    'last_update': stats['last_update']
-                }
+                stats = await queries.TOKEN_STATS.fetchrow(conn)
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération des statistiques: {e}")
             return {
@@ -243,4 +624,34 @@ class TokenService:
                 'invalid_tokens': 0,
                 'unique_users': 0,
                 'last_update': None
-            }
\ No newline at end of file
+            }
+
+        total = stats['total_tokens'] if stats else 0
+        valid = stats['valid_tokens'] if stats else 0
+        self._stats = {
+            'total_tokens': total,
+            'valid_tokens': valid,
+            'invalid_tokens': total - valid,
+            # discord_user_id est unique : un utilisateur par ligne
+            'unique_users': total,
+            'last_update': stats['last_update'] if stats else None
+        }
+        self._stats_expires_at = time.monotonic() + STATS_TTL
+        return self._stats
+
+    async def get_recent_activity(self, limit: int = 20) -> List[UserToken]:
+        """
+        Récupère les derniers tokens mis à jour dans les dernières 24h
+        
+        Args:
+            limit: Nombre maximal de lignes
+            
+        Returns:
+            List: Tokens les plus récemment mis à jour
+        """
+        try:
+            async with self.db_pool.acquire() as conn:
+                return await queries.RECENT_ACTIVITY.fetch(conn, limit)
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la récupération de l'activité récente: {e}")
+            return []
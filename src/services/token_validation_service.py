@@ -0,0 +1,119 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+import aiohttp
+from src.services.token_service import TokenService
+from src.utils.config import Config
+from src.utils.logger import get_logger
+from src.utils.ratelimit import HostRateLimiter
+
+class TokenValidator:
+    """Vérifie la validité de tous les tokens auprès d'un endpoint de validation"""
+
+    def __init__(self, token_service: TokenService, config: Config):
+        """
+        Args:
+            token_service: Service des tokens
+            config: Section validation de la configuration
+        """
+        self.token_service = token_service
+        self.logger = get_logger(__name__)
+        self.url = config.get('url')
+        self.concurrency = config.get('concurrency', 20)
+        self.batch_size = config.get('batch_size', 500)
+        self.rate_limiter = HostRateLimiter(config.get('rate_limit', 50))
+        self.running = False
+
+    async def validate_all(
+        self,
+        on_progress: Optional[Callable[[Dict[str, int]], Awaitable[None]]] = None
+    ) -> Dict[str, int]:
+        """
+        Vérifie tous les tokens, lot par lot
+        
+        Seuls les tokens valides sont sondés ; chaque lot est sondé en
+        parallèle sur des connexions réutilisées, puis les tokens refusés
+        sont marqués invalides en une seule requête. Un token invalidé
+        volontairement (/invalidate-all) n'est jamais revalidé.
+        
+        Args:
+            on_progress: Appelée après chaque lot avec les compteurs
+            
+        Returns:
+            Dict: Tokens vérifiés, valides, invalides, en erreur et invalidés
+            
+        Raises:
+            L'erreur de lecture ou d'écriture d'un lot : la vérification est
+            alors interrompue
+        """
+        counts = {'checked': 0, 'valid': 0, 'invalid': 0, 'errors': 0, 'changed': 0}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self.running = True
+        try:
+            async with aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=15)
+            ) as session:
+
+                async def probe(token):
+                    async with semaphore:
+                        return token['discord_user_id'], await self.check_token(session, token['access_token'])
+
+                after_id = 0
+                while True:
+                    batch = await self.token_service.get_tokens_batch(after_id, self.batch_size)
+                    if not batch:
+                        break
+                    after_id = batch[-1]['id']
+
+                    results = await asyncio.gather(*(probe(token) for token in batch))
+                    # Les erreurs temporaires laissent l'état enregistré inchangé
+                    known = [(discord_user_id, valid) for discord_user_id, valid in results if valid is not None]
+                    invalid = [(discord_user_id, False) for discord_user_id, valid in known if not valid]
+                    counts['changed'] += await self.token_service.save_token_validity(invalid)
+                    counts['checked'] += len(batch)
+                    counts['valid'] += sum(1 for _, valid in known if valid)
+                    counts['invalid'] += sum(1 for _, valid in known if not valid)
+                    counts['errors'] += len(batch) - len(known)
+
+                    if on_progress:
+                        await on_progress(counts)
+                    if len(batch) < self.batch_size:
+                        break
+        except Exception as e:
+            self.logger.error(f"Validation interrompue après {counts['checked']} tokens: {e}")
+            raise
+        finally:
+            self.running = False
+
+        self.logger.info(
+            f"Validation terminée: {counts['checked']} tokens, {counts['invalid']} invalides, "
+            f"{counts['errors']} erreurs, {counts['changed']} modifiés"
+        )
+        return counts
+
+    async def check_token(self, session: aiohttp.ClientSession, access_token: str) -> Optional[bool]:
+        """
+        Sonde un access token auprès de l'endpoint de validation
+        
+        Args:
+            session: Client HTTP partagé par la vérification
+            access_token: Token à vérifier
+            
+        Returns:
+            True si le token est accepté, False s'il est refusé,
+            None en cas d'erreur temporaire
+        """
+        if not access_token:
+            return False
+        await self.rate_limiter.acquire(self.url)
+        try:
+            async with session.get(self.url, headers={'Authorization': f"Bearer {access_token}"}) as response:
+                if response.status in (401, 403):
+                    return False
+                if response.status >= 300:
+                    return None
+                return True
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.warning(f"Erreur lors de la validation d'un token: {e}")
+            return None
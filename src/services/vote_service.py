@@ -1,66 +1,56 @@
-import json
-from typing import Optional
+import asyncio
+from typing import Optional, Dict, Set, List
 import discord
 from discord.ext import tasks
+from src.database import queries
+from src.database.vote import Vote
 from src.utils.logger import get_logger
+from src.utils.helpers import vote_session_role
+from src.utils.patterns import Pattern, matches_document, parse_pattern, pattern_columns
+
+VOTE_EMOJI = "✅"
+# Nombre maximal de messages de vote récupérés en parallèle
+FETCH_CONCURRENCY = 5
 
 class VoteService:
     def __init__(self, bot, db_pool):
         self.bot = bot
         self.db_pool = db_pool
         self.logger = get_logger(__name__)
+        # Décomptes des votes actifs tenus à jour par les réactions, indexés par votes.message_id
+        self.vote_counts: Dict[int, int] = {}
+        self._dirty_votes: Set[int] = set()
+        # Derniers décomptes enregistrés, pour ne réécrire que ce qui a changé
+        self._saved_counts: Dict[int, int] = {}
+        # Votes ayant reçu une réaction pendant la réconciliation en cours
+        self._reconciling: Optional[Set[int]] = None
+        # État de la session courante, invalidé uniquement lors du passage à la session suivante
+        self._session: Optional[Dict[str, int]] = None
         self.update_vote_counts.start()
+        self.flush_vote_counts.start()
 
     async def get_current_vote_number(self) -> int:
         async with self.db_pool.acquire() as conn:
-            result = await conn.fetchval("""
-                SELECT value->>'number'
-                FROM bot_state
-                WHERE key = 'vote_number'
-            """)
+            result = await queries.VOTE_NUMBER.fetchval(conn)
             return int(result) if result else 1
 
     async def increment_vote_number(self) -> int:
         async with self.db_pool.acquire() as conn:
-            new_number = await conn.fetchval("""
-                UPDATE bot_state
-                SET value = jsonb_build_object('number', (value->>'number')::int + 1)
-                WHERE key = 'vote_number'
-                RETURNING (value->>'number')::int
-            """)
+            new_number = await queries.INCREMENT_VOTE_NUMBER.fetchval(conn)
             return new_number
 
     async def get_or_create_vote_channel(self, guild: discord.Guild) -> discord.TextChannel:
         """Récupère ou crée le salon de vote pour la session actuelle"""
-        session = await self.get_current_session()
-        
-        # Vérifier si le salon existe déjà
-        vote_channel = discord.utils.get(
-            guild.text_channels,
-            name=f"votes-{session}"
-        )
-        
+        vote_channel = await self.get_vote_channel(guild)
         if not vote_channel:
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(
-                    send_messages=False,
-                    read_messages=True,
-                    add_reactions=True
-                ),
-                guild.me: discord.PermissionOverwrite(
-                    send_messages=True,
-                    read_messages=True,
-                    add_reactions=True,
-                    manage_messages=True
-                )
-            }
-            vote_channel = await guild.create_text_channel(
-                f"votes-{session}",
-                overwrites=overwrites
-            )
-        
+            vote_channel = await self.create_vote_channel(guild)
         return vote_channel
 
+    async def get_vote_channel(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        """Récupère le salon de vote de la session actuelle s'il existe"""
+        session = await self.get_current_session()
+        return await self.bot.channel_index.resolve(guild, vote_session_role(session))
+
     async def create_vote(self, guild: discord.Guild, title: str, image_name: str, 
                          image: discord.Attachment, json_data: dict, coord_x: int, 
                          coord_z: int, created_by: int) -> Optional[dict]:
@@ -74,54 +64,196 @@ class VoteService:
             embed.set_image(url=image.url)
             embed.add_field(name="Coordonnées", value=f"X: {coord_x}, Z: {coord_z}", inline=False)
             message = await vote_channel.send(embed=embed)
-            await message.add_reaction("✅")
+            await message.add_reaction(VOTE_EMOJI)
+
+            # Les grilles de pixels sont stockées au format compact, le JSON
+            # brut n'est gardé que pour les autres documents et pour ceux que
+            # le format compact ne restitue pas à l'identique
+            pattern = parse_pattern(json_data)
+            if pattern is not None and not matches_document(pattern, json_data):
+                self.logger.warning(f"Pattern de '{title}' conservé en JSON : conversion non fidèle")
+                pattern = None
 
             # Sauvegarder en base
             async with self.db_pool.acquire() as conn:
-                record = await conn.fetchrow("""
-                    INSERT INTO votes (
-                        title, image_name, image_url, json_data, 
-                        channel_id, message_id, created_by,
-                        coord_x, coord_z, session_id
-                    )
-                    VALUES ($1, $2, $3, $4::jsonb, $5, $6, $7, $8, $9, $10)
-                    RETURNING id
-                """, title, image_name, image.url, json.dumps(json_data),
+                record = await queries.INSERT_VOTE.fetchrow(
+                    conn, title, image_name, image.url,
+                    json_data if pattern is None else None,
                     vote_channel.id, message.id, created_by,
-                    coord_x, coord_z, session_id)
-                
+                    coord_x, coord_z, session_id,
+                    *pattern_columns(pattern)
+                )
+
+            self.track_vote(message.id)
             return {"id": record['id'], "channel_id": vote_channel.id, "message_id": message.id}
 
         except Exception as e:
             self.logger.error(f"Erreur lors de la création du vote: {e}")
             return None
 
-    @tasks.loop(minutes=5.0)
+    def track_vote(self, message_id: int, vote_count: int = 0) -> None:
+        """Commence le suivi en mémoire des réactions d'un message de vote"""
+        self.vote_counts[message_id] = vote_count
+
+    def handle_reaction(self, payload: discord.RawReactionActionEvent, delta: int) -> bool:
+        """
+        Applique un ajout ou un retrait de réaction au décompte en mémoire
+        
+        Args:
+            payload: Événement brut de réaction envoyé par la gateway
+            delta: +1 pour un ajout, -1 pour un retrait
+            
+        Returns:
+            bool: True si la réaction concernait un vote suivi
+        """
+        if payload.message_id not in self.vote_counts:
+            return False
+        if str(payload.emoji) != VOTE_EMOJI:
+            return False
+        if self.bot.user and payload.user_id == self.bot.user.id:
+            return False
+
+        self.vote_counts[payload.message_id] = max(0, self.vote_counts[payload.message_id] + delta)
+        self._dirty_votes.add(payload.message_id)
+        if self._reconciling is not None:
+            self._reconciling.add(payload.message_id)
+        return True
+
+    @staticmethod
+    async def save_vote_counts(conn, vote_counts: Dict[int, int]) -> int:
+        """
+        Enregistre plusieurs décomptes en une seule requête
+        
+        Args:
+            conn: Connexion à la base de données
+            vote_counts: Décomptes indexés par message_id
+            
+        Returns:
+            int: Nombre de votes dont le décompte a changé
+        """
+        if not vote_counts:
+            return 0
+
+        result = await queries.SAVE_VOTE_COUNTS.execute(
+            conn, list(vote_counts.keys()), list(vote_counts.values())
+        )
+        return int(result.split()[-1])
+
+    @tasks.loop(seconds=30.0)
+    async def flush_vote_counts(self):
+        """Persiste les décomptes modifiés depuis le dernier passage"""
+        if not self._dirty_votes:
+            return
+
+        dirty, self._dirty_votes = self._dirty_votes, set()
+        vote_counts = {
+            message_id: self.vote_counts[message_id]
+            for message_id in dirty
+            if message_id in self.vote_counts
+            and self._saved_counts.get(message_id) != self.vote_counts[message_id]
+        }
+        try:
+            async with self.db_pool.acquire() as conn:
+                await self.save_vote_counts(conn, vote_counts)
+            self._saved_counts.update(vote_counts)
+
+        except Exception as e:
+            # Réessayer au prochain passage
+            self._dirty_votes |= dirty
+            self.logger.error(f"Erreur lors de l'enregistrement des votes: {e}")
+
+    async def get_session_votes(self, session_id: int) -> List[Vote]:
+        """Récupère les messages des votes actifs d'une session"""
+        async with self.db_pool.acquire() as conn:
+            return await queries.SESSION_VOTES.fetch(conn, session_id)
+
+    async def get_pattern(self, vote_id: int) -> Optional[Pattern]:
+        """
+        Récupère le pattern d'un vote
+        
+        Args:
+            vote_id: ID du vote
+            
+        Returns:
+            Le pattern (palette et grille d'indices numpy), None si le vote
+            n'existe pas ou n'a pas de pattern
+        """
+        async with self.db_pool.acquire() as conn:
+            vote = await queries.VOTE_PATTERN.fetchrow(conn, vote_id)
+        return vote.pattern if vote else None
+
+    async def get_vote_ranking(self) -> List[Vote]:
+        """Récupère les votes actifs, du plus au moins voté"""
+        async with self.db_pool.acquire() as conn:
+            return await queries.VOTE_RANKING.fetch(conn)
+
+    async def fetch_vote_counts(self, votes: List[Vote]) -> Dict[int, int]:
+        """
+        Lit le nombre de réactions de chaque message de vote
+        
+        Les messages sont récupérés en parallèle, par groupes de FETCH_CONCURRENCY
+        requêtes au plus, afin de rester dans les limites de l'API Discord.
+        
+        Args:
+            votes: Votes contenant channel_id et message_id
+            
+        Returns:
+            Dict: Décomptes indexés par message_id, sans les messages introuvables
+            ou illisibles (leur décompte enregistré s'applique)
+        """
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+        async def fetch_count(vote) -> Optional[tuple]:
+            channel = self.bot.get_channel(vote['channel_id'])
+            if not channel:
+                return None
+            try:
+                async with semaphore:
+                    message = await channel.fetch_message(vote['message_id'])
+            except discord.NotFound:
+                return None
+            except discord.HTTPException as e:
+                # Accès refusé ou erreur de Discord : le décompte enregistré est conservé
+                self.logger.warning(f"Impossible de lire le vote {vote['message_id']}: {e}")
+                return None
+            reaction = discord.utils.get(message.reactions, emoji=VOTE_EMOJI)
+            # -1 pour ne pas compter le vote du bot
+            return vote['message_id'], max(0, reaction.count - 1) if reaction else 0
+
+        results = await asyncio.gather(*(fetch_count(vote) for vote in votes))
+        return dict(result for result in results if result)
+
+    @tasks.loop(hours=1.0)
     async def update_vote_counts(self):
+        """Réconcilie les décomptes en mémoire avec les réactions réelles des messages"""
         try:
             async with self.db_pool.acquire() as conn:
-                active_votes = await conn.fetch("""
-                    SELECT id, channel_id, message_id 
-                    FROM votes 
-                    WHERE is_active = true
-                """)
-
-                for vote in active_votes:
-                    channel = self.bot.get_channel(vote['channel_id'])
-                    if channel:
-                        try:
-                            message = await channel.fetch_message(vote['message_id'])
-                            reaction = discord.utils.get(message.reactions, emoji="✅")
-                            vote_count = reaction.count - 1 if reaction else 0
-
-                            await conn.execute("""
-                                UPDATE votes 
-                                SET vote_count = $1, updated_at = CURRENT_TIMESTAMP
-                                WHERE id = $2
-                            """, vote_count, vote['id'])
-
-                        except discord.NotFound:
-                            continue
+                active_votes = await queries.ACTIVE_VOTES.fetch(conn)
+
+            self._reconciling = set()
+            try:
+                vote_counts = await self.fetch_vote_counts(active_votes)
+            finally:
+                reconciling, self._reconciling = self._reconciling, None
+
+            # Une réaction reçue pendant la récupération est plus récente que
+            # l'instantané : le décompte en mémoire est conservé, et reste à enregistrer
+            vote_counts = {
+                message_id: count
+                for message_id, count in vote_counts.items()
+                if message_id not in reconciling
+            }
+            self.vote_counts.update(vote_counts)
+            self._dirty_votes -= vote_counts.keys()
+
+            async with self.db_pool.acquire() as conn:
+                await self.save_vote_counts(conn, vote_counts)
+            self._saved_counts = vote_counts
+
+            # Oublier les votes qui ne sont plus actifs
+            active_messages = {vote['message_id'] for vote in active_votes}
+            for message_id in self.vote_counts.keys() - active_messages:
+                del self.vote_counts[message_id]
 
         except Exception as e:
             self.logger.error(f"Erreur lors de la mise à jour des votes: {e}")
@@ -130,57 +262,94 @@ class VoteService:
     async def before_update_vote_counts(self):
         await self.bot.wait_until_ready()
 
-    async def get_winning_vote(self, conn) -> Optional[dict]:
-        """Récupère le vote gagnant de la session active"""
+    @flush_vote_counts.before_loop
+    async def before_flush_vote_counts(self):
+        await self.bot.wait_until_ready()
+
+    async def close_session(self, vote_counts: Dict[int, int]) -> Optional[dict]:
+        """
+        Clôture la session active et ouvre la suivante en une seule requête
+        
+        Dans la même transaction : enregistre les décomptes finaux, désigne le
+        gagnant de la session, le copie dans votes_pattern, désactive les votes
+        et la session, puis avance le compteur de session.
+        
+        Args:
+            vote_counts: Décomptes finaux indexés par message_id
+            
+        Returns:
+            Dict contenant la session close, la nouvelle session et le gagnant
+            (None si aucun vote), ou None en cas d'erreur
+        """
         try:
-            winner = await conn.fetchrow("""
-                SELECT id, title, image_name, image_url, json_data, 
-                       coord_x, coord_z, vote_count
-                FROM votes 
-                WHERE is_active = true 
-                ORDER BY vote_count DESC 
-                LIMIT 1
-            """)
-            return winner
+            async with self.db_pool.acquire() as conn:
+                result = await queries.CLOSE_SESSION.fetchrow(
+                    conn, list(vote_counts.keys()), list(vote_counts.values())
+                )
+
         except Exception as e:
-            self.logger.error(f"Erreur lors de la récupération du gagnant: {e}")
+            self.logger.error(f"Erreur lors de la clôture de la session: {e}")
             return None
 
-    async def save_winning_pattern(self, conn, winner: dict) -> bool:
-        """Sauvegarde le pattern gagnant"""
-        try:
-            await conn.execute("""
-                INSERT INTO votes_pattern (
-                    title, image_name, image_url, json_data,
-                    coord_x, coord_z, vote_count, original_vote_id
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-            """, winner['title'], winner['image_name'], 
-                winner['image_url'], winner['json_data'],
-                winner['coord_x'], winner['coord_z'], 
-                winner['vote_count'], winner['id'])
-            return True
-        except Exception as e:
-            self.logger.error(f"Erreur lors de la sauvegarde du pattern: {e}")
-            return False
+        if result is None:
+            # Sans ligne 'vote_session' dans bot_state, aucune session n'est
+            # ouverte alors que la clôture est déjà validée : l'état en cache
+            # est périmé
+            self.logger.error("Clôture de la session sans nouvelle session : ligne 'vote_session' absente de bot_state")
+            self._session = None
+            return None
+
+        self._session = {
+            'id': result['new_session_id'],
+            'number': result['new_session_number']
+        }
+
+        # Les votes clos ne sont plus suivis
+        for message_id in result['closed_messages']:
+            self.vote_counts.pop(message_id, None)
+            self._saved_counts.pop(message_id, None)
+            self._dirty_votes.discard(message_id)
+
+        winner = None
+        if result['winner_id'] is not None:
+            winner = {
+                'id': result['winner_id'],
+                'title': result['title'],
+                'image_name': result['image_name'],
+                'image_url': result['image_url'],
+                'coord_x': result['coord_x'],
+                'coord_z': result['coord_z'],
+                'vote_count': result['winner_vote_count']
+            }
+
+        return {
+            'session_id': result['session_id'],
+            'new_session_id': result['new_session_id'],
+            'new_session_number': result['new_session_number'],
+            'winner': winner
+        }
+
+    async def get_session_state(self) -> Dict[str, int]:
+        """
+        Récupère le numéro et l'identifiant de la session active
+        
+        Le résultat est conservé en mémoire jusqu'à la prochaine clôture de session.
+        
+        Returns:
+            Dict contenant 'number' (numéro affiché) et 'id' (vote_sessions.id)
+        """
+        if self._session is None:
+            async with self.db_pool.acquire() as conn:
+                state = await queries.SESSION_STATE.fetchrow(conn)
+            self._session = {'number': state['number'] or 1, 'id': state['id']}
+        return self._session
+
+    def invalidate_session_cache(self) -> None:
+        """Oublie l'état de session mis en cache"""
+        self._session = None
 
     async def get_current_session(self) -> int:
-        async with self.db_pool.acquire() as conn:
-            result = await conn.fetchval("""
-                SELECT (value->>'number')::int
-                FROM bot_state
-                WHERE key = 'vote_session'
-            """)
-            return result or 1
-
-    async def increment_session(self) -> int:
-        async with self.db_pool.acquire() as conn:
-            result = await conn.fetchval("""
-                UPDATE bot_state
-                SET value = jsonb_build_object('number', (value->>'number')::int + 1)
-                WHERE key = 'vote_session'
-                RETURNING (value->>'number')::int
-            """)
-            return result
+        return (await self.get_session_state())['number']
 
     async def create_vote_channel(self, guild: discord.Guild) -> discord.TextChannel:
         session = await self.get_current_session()
@@ -197,31 +366,12 @@ class VoteService:
                 manage_messages=True
             )
         }
-        return await guild.create_text_channel(
+        vote_channel = await guild.create_text_channel(
             f"votes-{session}",
             overwrites=overwrites
         )
+        await self.bot.channel_index.set_channel(guild.id, vote_session_role(session), vote_channel.id)
+        return vote_channel
 
     async def get_current_session_id(self) -> int:
-        async with self.db_pool.acquire() as conn:
-            return await conn.fetchval("""
-                SELECT id FROM vote_sessions
-                WHERE is_active = true
-                ORDER BY id DESC LIMIT 1
-            """)
-
-    async def create_new_session(self) -> int:
-        async with self.db_pool.acquire() as conn:
-            # Désactiver l'ancienne session
-            await conn.execute("""
-                UPDATE vote_sessions SET is_active = false
-                WHERE is_active = true
-            """)
-            
-            # Créer nouvelle session
-            return await conn.fetchval("""
-                INSERT INTO vote_sessions (number, is_active)
-                SELECT COALESCE(MAX(number), 0) + 1, true
-                FROM vote_sessions
-                RETURNING id
-            """)
\ No newline at end of file
+        return (await self.get_session_state())['id']
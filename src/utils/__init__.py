@@ -4,11 +4,15 @@ Utilitaires pour le PixelBot
 
 from .logger import setup_logging, get_logger
 from .config import Config, load_config
+from .cache import LRUCache
 from .helpers import (
     normalize_channel_name,
     is_private_chat,
     get_private_category,
-    create_private_channel
+    create_private_channel,
+    vote_session_role,
+    get_channel_role,
+    get_last_activity
 )
 
 __all__ = [
@@ -16,8 +20,12 @@ __all__ = [
     'get_logger',
     'Config',
     'load_config',
+    'LRUCache',
     'normalize_channel_name',
     'is_private_chat',
     'get_private_category',
-    'create_private_channel'
+    'create_private_channel',
+    'vote_session_role',
+    'get_channel_role',
+    'get_last_activity'
 ]
\ No newline at end of file
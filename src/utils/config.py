@@ -19,6 +19,17 @@ class Config:
             return value
         raise AttributeError(f"Config has no attribute '{name}'")
 
+    def get(self, name: str, default: Any = None) -> Any:
+        """Retourne une valeur de configuration, ou default si elle est absente"""
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Retourne la section de configuration sous forme de dictionnaire"""
+        return dict(self._config)
+
     @classmethod
     def load(cls) -> 'Config':
         """Charge la configuration depuis les fichiers YAML et les variables d'environnement"""
@@ -1,8 +1,29 @@
 import re
+from datetime import datetime
 from typing import Optional
 import discord
 from discord.ext import commands
 
+PRIVATE_CATEGORY_NAME = "Chats Privés"
+
+# Rôles des salons gérés par le bot dans l'index guild_channels
+PRIVATE_CATEGORY = "private_category"
+VOTE_SESSION = "vote_session"
+
+def vote_session_role(session: int) -> str:
+    """Retourne le rôle du salon de vote d'une session"""
+    return f"{VOTE_SESSION}:{session}"
+
+def get_channel_role(channel: discord.abc.GuildChannel) -> Optional[str]:
+    """Déduit du nom d'un salon le rôle qu'il joue pour le bot"""
+    if isinstance(channel, discord.CategoryChannel) and channel.name == PRIVATE_CATEGORY_NAME:
+        return PRIVATE_CATEGORY
+    if isinstance(channel, discord.TextChannel):
+        match = re.fullmatch(r'votes-(\d+)', channel.name)
+        if match:
+            return vote_session_role(int(match.group(1)))
+    return None
+
 def normalize_channel_name(name: str) -> str:
     """Normalise le nom d'un canal en retirant les caractères spéciaux"""
     name = name.lower().replace(' ', '-')
@@ -10,30 +31,57 @@ def normalize_channel_name(name: str) -> str:
     name = re.sub(r'-+', '-', name)
     return name
 
-def is_private_chat(channel: discord.TextChannel) -> bool:
+async def is_private_chat(channel: discord.TextChannel, private_channels) -> bool:
     """Vérifie si le canal est un chat privé créé par le bot"""
-    return (
-        isinstance(channel, discord.TextChannel) and
+    if not isinstance(channel, discord.TextChannel):
+        return False
+
+    if await private_channels.get_owner_id(channel.id) is not None:
+        return True
+
+    # Chats créés avant l'index : retrouver leur propriétaire dans les permissions
+    if (
         channel.category and
-        channel.category.name == "Chats Privés" and
+        channel.category.name == PRIVATE_CATEGORY_NAME and
         channel.name.startswith("chat-")
-    )
+    ):
+        owner = next(
+            (
+                target for target in channel.overwrites
+                if isinstance(target, discord.Member) and target != channel.guild.me
+            ),
+            None
+        )
+        if owner:
+            await private_channels.register(channel.guild.id, owner.id, channel.id)
+            return True
+
+    return False
+
+def get_last_activity(channel: discord.TextChannel) -> datetime:
+    """Date du dernier message d'un salon, ou de sa création s'il est vide, sans appel à l'API"""
+    if channel.last_message_id:
+        return discord.utils.snowflake_time(channel.last_message_id)
+    return channel.created_at
 
-async def get_private_category(guild: discord.Guild) -> discord.CategoryChannel:
+async def get_private_category(guild: discord.Guild, channel_index) -> discord.CategoryChannel:
     """Obtient ou crée la catégorie des chats privés"""
-    category = discord.utils.get(guild.categories, name="Chats Privés")
+    category = await channel_index.resolve(guild, PRIVATE_CATEGORY)
     if not category:
-        category = await guild.create_category("Chats Privés")
+        category = await guild.create_category(PRIVATE_CATEGORY_NAME)
+        await channel_index.set_channel(guild.id, PRIVATE_CATEGORY, category.id)
     return category
 
 async def create_private_channel(
     guild: discord.Guild,
     member: discord.Member,
-    bot_member: discord.Member
+    bot_member: discord.Member,
+    channel_index,
+    private_channels
 ) -> Optional[discord.TextChannel]:
     """Crée un canal privé pour un membre"""
     try:
-        category = await get_private_category(guild)
+        category = await get_private_category(guild, channel_index)
         channel_name = f"chat-{normalize_channel_name(member.display_name)}"
         
         overwrites = {
@@ -47,7 +95,8 @@ async def create_private_channel(
             category=category,
             overwrites=overwrites
         )
-        
+
+        await private_channels.register(guild.id, member.id, channel.id)
         return channel
     except discord.Forbidden:
         return None
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Coroutine, Iterable, Set
+import discord
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Références vers les tâches de fond en cours, pour éviter leur destruction prématurée
+_running_jobs: Set[asyncio.Task] = set()
+
+def start_job(coro: Coroutine, name: str) -> asyncio.Task:
+    """Lance une tâche de fond et journalise son éventuel échec"""
+    task = asyncio.create_task(coro, name=name)
+    _running_jobs.add(task)
+
+    def on_done(task: asyncio.Task) -> None:
+        _running_jobs.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Échec de la tâche {name}", exc_info=task.exception())
+
+    task.add_done_callback(on_done)
+    return task
+
+async def run_bounded(
+    items: Iterable[Any],
+    worker: Callable[[Any], Awaitable[None]],
+    concurrency: int = 5,
+    delay: float = 0.0
+) -> None:
+    """
+    Traite des éléments depuis une file avec un nombre borné de workers
+    
+    Args:
+        items: Éléments à traiter
+        worker: Coroutine appelée pour chaque élément
+        concurrency: Nombre maximal d'appels simultanés
+        delay: Pause de chaque worker entre deux éléments, en secondes
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+
+    async def consume() -> None:
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await worker(item)
+            except Exception as e:
+                logger.error(f"Erreur lors du traitement de {item}: {e}")
+            if delay:
+                await asyncio.sleep(delay)
+
+    await asyncio.gather(*(consume() for _ in range(concurrency)))
+
+class ProgressMessage:
+    """Message de suivi d'une tâche de fond, modifié au plus une fois par intervalle"""
+
+    def __init__(self, message: discord.WebhookMessage, interval: float = 2.0):
+        self.message = message
+        self.interval = interval
+        self._last_edit = 0.0
+
+    async def update(self, content: str, force: bool = False) -> None:
+        """Met à jour le message si l'intervalle est écoulé ou si force est vrai"""
+        now = time.monotonic()
+        if not force and now - self._last_edit < self.interval:
+            return
+        self._last_edit = now
+        try:
+            await self.message.edit(content=content)
+        except discord.HTTPException as e:
+            # Le jeton d'interaction expire après 15 minutes
+            logger.warning(f"Impossible de mettre à jour la progression: {e}")
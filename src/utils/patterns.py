@@ -0,0 +1,228 @@
+import copy
+import math
+from typing import Any, Dict, List, NamedTuple, Optional
+import orjson
+
+# numpy et zstandard sont facultatifs : sans eux, les patterns restent en JSON
+try:
+    import numpy as np
+    import zstandard
+except ImportError:
+    np = None
+    zstandard = None
+
+# Niveau de compression zstd des grilles d'indices
+COMPRESSION_LEVEL = 9
+
+# Champs contenant la grille de pixels, prioritaires sur les autres grilles
+# du document (palette de couleurs, calques...)
+GRID_KEYS = ('pixels', 'data')
+
+class Pattern(NamedTuple):
+    """
+    Pattern de pixel art décomposé en palette et grille d'indices
+
+    Attributes:
+        palette: Valeurs JSON distinctes des pixels, dans l'ordre d'apparition
+        indices: Tableau (hauteur, largeur) des indices dans la palette
+        meta: Emplacement de la grille dans le document d'origine ('key',
+            None si le document est la grille elle-même) et autres champs
+            du document ('fields')
+    """
+    palette: List[Any]
+    indices: Any
+    meta: Dict[str, Any]
+
+    @property
+    def width(self) -> int:
+        return self.indices.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.indices.shape[0]
+
+def available() -> bool:
+    """Vérifie si numpy et zstandard sont installés"""
+    return np is not None
+
+def _index_dtype(palette_size: int):
+    """Plus petit type d'entier non signé pouvant indexer la palette"""
+    if palette_size <= 1 << 8:
+        return np.dtype('u1')
+    if palette_size <= 1 << 16:
+        return np.dtype('<u2')
+    return np.dtype('<u4')
+
+def _palette_key(value: Any) -> Any:
+    """
+    Clé de palette des valeurs autres que les chaînes, distinguant 1, 1.0,
+    true, 0.0 et -0.0, valable aussi pour les listes et objets
+    """
+    if isinstance(value, (list, dict)):
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    if isinstance(value, float):
+        # -0.0 == 0.0 : le signe fait partie de la clé
+        return float, value, math.copysign(1.0, value)
+    return type(value), value
+
+def _find_grid(document: Any) -> Optional[tuple]:
+    """
+    Localise la grille de pixels d'un document
+
+    Les champs de GRID_KEYS sont prioritaires ; à défaut, la plus grande
+    grille du document est retenue.
+
+    Returns:
+        (clé, grille), la clé valant None si le document est la grille
+        elle-même, ou None si aucune grille rectangulaire n'est trouvée
+    """
+    def is_grid(value: Any) -> bool:
+        return (
+            isinstance(value, list) and len(value) > 0
+            and all(isinstance(row, list) for row in value)
+            and len(value[0]) > 0
+            and all(len(row) == len(value[0]) for row in value)
+        )
+
+    if is_grid(document):
+        return None, document
+    if not isinstance(document, dict):
+        return None
+    for key in GRID_KEYS:
+        if is_grid(document.get(key)):
+            return key, document[key]
+    grids = [(key, value) for key, value in document.items() if is_grid(value)]
+    if not grids:
+        return None
+    return max(grids, key=lambda item: len(item[1]) * len(item[1][0]))
+
+def parse_pattern(document: Any) -> Optional[Pattern]:
+    """
+    Décompose un pattern JSON déjà chargé en palette et grille d'indices
+
+    Args:
+        document: Grille de pixels (liste de lignes) ou objet contenant une
+            grille de pixels parmi ses champs
+
+    Returns:
+        Le pattern, ou None si le document ne contient pas de grille
+        rectangulaire ou si numpy et zstandard ne sont pas installés
+    """
+    if not available():
+        return None
+    found = _find_grid(document)
+    if not found:
+        return None
+
+    key, grid = found
+    palette: List[Any] = []
+    positions: Dict[Any, int] = {}
+    flat = []
+    for row in grid:
+        for value in row:
+            # Les couleurs "#rrggbb" sont leur propre clé, sans appel de fonction
+            palette_key = value if type(value) is str else _palette_key(value)
+            index = positions.get(palette_key)
+            if index is None:
+                index = positions[palette_key] = len(palette)
+                palette.append(value)
+            flat.append(index)
+
+    indices = np.array(flat, dtype=_index_dtype(len(palette))).reshape(len(grid), len(grid[0]))
+    fields = None
+    if key is not None:
+        fields = {name: value for name, value in document.items() if name != key}
+    return Pattern(palette, indices, {'key': key, 'fields': fields})
+
+def compress_indices(indices) -> bytes:
+    """Compresse une grille d'indices avec zstd"""
+    compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL)
+    return compressor.compress(np.ascontiguousarray(indices).tobytes())
+
+def decompress_indices(data: bytes, width: int, height: int, palette_size: int):
+    """
+    Décompresse une grille d'indices
+
+    Returns:
+        Tableau numpy (hauteur, largeur) en lecture seule
+    """
+    if not available():
+        raise RuntimeError("numpy et zstandard sont nécessaires pour lire les patterns compressés")
+    raw = zstandard.ZstdDecompressor().decompress(data)
+    return np.frombuffer(raw, dtype=_index_dtype(palette_size)).reshape(height, width)
+
+def pattern_columns(pattern: Optional[Pattern]) -> tuple:
+    """
+    Returns:
+        Valeurs des colonnes pattern_width, pattern_height, pattern_palette,
+        pattern_pixels et pattern_meta (None si pas de pattern)
+    """
+    if pattern is None:
+        return None, None, None, None, None
+    return (
+        pattern.width,
+        pattern.height,
+        pattern.palette,
+        compress_indices(pattern.indices),
+        pattern.meta
+    )
+
+def pattern_from_record(record) -> Optional[Pattern]:
+    """
+    Lit le pattern d'un vote sans repasser par le JSON
+
+    Les votes enregistrés avant le format compact sont décomposés à partir
+    de json_data.
+
+    Args:
+        record: Ligne contenant json_data et les colonnes pattern_*
+
+    Returns:
+        Le pattern, ou None si le vote n'en a pas
+    """
+    if record['pattern_pixels'] is not None:
+        palette = record['pattern_palette']
+        indices = decompress_indices(
+            record['pattern_pixels'], record['pattern_width'],
+            record['pattern_height'], len(palette)
+        )
+        return Pattern(palette, indices, record['pattern_meta'])
+    if record['json_data'] is not None:
+        return parse_pattern(record['json_data'])
+    return None
+
+def to_document(pattern: Pattern) -> Any:
+    """
+    Reconstruit le document JSON d'origine
+
+    Le document obtenu est égal à celui passé à parse_pattern ; seul
+    l'ordre des champs de l'objet englobant peut différer. Il ne partage
+    aucun objet avec le pattern : chaque pixel de type liste ou objet est
+    une copie distincte.
+    """
+    # Remplissage élément par élément : numpy ne doit pas transformer les
+    # couleurs [r, g, b] en dimension supplémentaire
+    palette = np.empty(len(pattern.palette), dtype=object)
+    for index, value in enumerate(pattern.palette):
+        palette[index] = value
+    grid = palette[pattern.indices].tolist()
+    if any(isinstance(value, (list, dict)) for value in pattern.palette):
+        grid = [
+            [copy.deepcopy(value) if isinstance(value, (list, dict)) else value for value in row]
+            for row in grid
+        ]
+
+    key, fields = pattern.meta['key'], pattern.meta['fields']
+    if key is None:
+        return grid
+    return {**copy.deepcopy(fields), key: grid}
+
+def matches_document(pattern: Pattern, document: Any) -> bool:
+    """
+    Vérifie que le pattern restitue exactement le document
+
+    La comparaison porte sur la sérialisation JSON : contrairement à ==,
+    elle distingue 1, 1.0, true, 0.0 et -0.0.
+    """
+    option = orjson.OPT_SORT_KEYS
+    return orjson.dumps(to_document(pattern), option=option) == orjson.dumps(document, option=option)
@@ -0,0 +1,47 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+class RateLimiter:
+    """Limite le nombre d'appels par seconde (seau à jetons)"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Args:
+            rate: Nombre d'appels autorisés par seconde
+            burst: Nombre d'appels pouvant partir d'un coup, par défaut rate
+        """
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Attend qu'un appel soit autorisé"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class HostRateLimiter:
+    """Un seau à jetons par hôte contacté"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst
+        self._limiters: Dict[str, RateLimiter] = {}
+
+    async def acquire(self, url: str) -> None:
+        """Attend qu'un appel vers l'hôte de l'URL soit autorisé"""
+        host = urlsplit(url).netloc
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = RateLimiter(self.rate, self.burst)
+        await limiter.acquire()
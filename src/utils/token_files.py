@@ -0,0 +1,55 @@
+import csv
+import json
+from datetime import datetime, timezone
+from typing import Any, Iterator, Optional, TextIO
+
+TRUE_VALUES = {'t', 'true', '1', 'yes', 'y'}
+
+def token_file_format(filename: str) -> str:
+    """Déduit le format d'un fichier de tokens de son extension"""
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.json', '.ndjson')) else 'csv'
+
+def read_token_records(file: TextIO, format: str = 'csv') -> Iterator[tuple]:
+    """
+    Lit un fichier de tokens ligne par ligne
+    
+    Args:
+        file: Fichier texte CSV (avec en-tête) ou JSONL
+        format: 'csv' ou 'jsonl'
+        
+    Yields:
+        Tuples (discord_user_id, access_token, refresh_token, valid_token, expires_at)
+        
+    Raises:
+        ValueError: Si une ligne est invalide
+    """
+    if format == 'jsonl':
+        rows = (json.loads(line) for line in file if line.strip())
+    else:
+        rows = csv.DictReader(file)
+
+    for number, row in enumerate(rows, start=1):
+        try:
+            yield (
+                int(row['discord_user_id']),
+                str(row['access_token']),
+                str(row.get('refresh_token') or ''),
+                _parse_bool(row.get('valid_token')),
+                _parse_datetime(row.get('expires_at'))
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Ligne {number} invalide: {e}") from e
+
+def _parse_bool(value: Any) -> bool:
+    if value is None or value == '':
+        return True
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    # Les dates sans fuseau sont considérées en UTC
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
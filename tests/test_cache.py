@@ -0,0 +1,36 @@
+import time
+from src.utils.cache import LRUCache
+
+def test_lru_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    # 'a' devient la plus récente, 'b' est évincée
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert cache.evictions == 1
+
+def test_ttl_expiry(monkeypatch):
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now)
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 61)
+    assert cache.get('a', 'absent') == 'absent'
+    assert 'a' not in cache
+
+def test_cached_none_is_a_hit():
+    missing = object()
+    cache = LRUCache()
+    cache.set('a', None)
+
+    assert cache.get('a', missing) is None
+    assert cache.get('b', missing) is missing
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
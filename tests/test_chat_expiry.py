@@ -0,0 +1,50 @@
+import discord
+import pytest
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock
+from src.services.chat_expiry_service import ChatExpiryScheduler, RETRY_DELAY
+
+@pytest.mark.asyncio
+async def test_failed_deletion_is_retried_with_backoff():
+    channel = Mock()
+    channel.delete = AsyncMock(side_effect=discord.HTTPException(Mock(status=500, reason="error"), "error"))
+    bot = Mock()
+    bot.get_channel.return_value = channel
+    bot.private_channels.unregister = AsyncMock()
+    scheduler = ChatExpiryScheduler(bot, Mock(), timedelta(hours=24))
+
+    scheduler.schedule(42)
+    await scheduler._expire(42)
+    first = scheduler._expiries[42] - discord.utils.utcnow()
+    await scheduler._expire(42)
+    second = scheduler._expiries[42] - discord.utils.utcnow()
+
+    assert RETRY_DELAY * 0.9 < first <= RETRY_DELAY
+    assert RETRY_DELAY * 1.9 < second <= RETRY_DELAY * 2
+    bot.private_channels.unregister.assert_not_called()
+
+    channel.delete = AsyncMock()
+    await scheduler._expire(42)
+    assert 42 not in scheduler._expiries
+    bot.private_channels.unregister.assert_awaited_once_with(42)
+
+@pytest.mark.asyncio
+async def test_load_schedules_unregistered_chats(monkeypatch):
+    channel = Mock(spec=discord.TextChannel, id=7)
+    category = Mock(text_channels=[channel])
+    bot = Mock(guilds=[Mock()])
+    bot.channel_index.resolve = AsyncMock(return_value=category)
+    monkeypatch.setattr(
+        'src.services.chat_expiry_service.is_private_chat',
+        AsyncMock(return_value=True)
+    )
+    last_activity = discord.utils.utcnow() - timedelta(hours=1)
+    monkeypatch.setattr('src.services.chat_expiry_service.get_last_activity', lambda channel: last_activity)
+    conn = Mock(fetch=AsyncMock(return_value=[]))
+    db_pool = Mock()
+    db_pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    db_pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+    scheduler = ChatExpiryScheduler(bot, db_pool, timedelta(hours=24))
+
+    await scheduler.load()
+    assert scheduler._expiries == {7: last_activity + timedelta(hours=24)}
@@ -0,0 +1,12 @@
+import pytest
+from src.database.codecs import JSONB_VERSION, decode_jsonb, encode_jsonb
+
+def test_jsonb_round_trip():
+    pattern = {'width': 2, 'height': 1, 'pixels': [["#ff0000", "#00ff00"]], 'name': "été"}
+    data = encode_jsonb(pattern)
+    assert data.startswith(JSONB_VERSION)
+    assert decode_jsonb(data) == pattern
+
+def test_jsonb_unknown_version():
+    with pytest.raises(ValueError):
+        decode_jsonb(b'\x02{}')
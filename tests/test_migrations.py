@@ -0,0 +1,71 @@
+import pytest
+import asyncpg
+from src.database.migrator import load_migrations, migrate
+
+class FakeConnection:
+    def __init__(self, applied):
+        self.applied = applied
+        self.queries = []
+
+    async def fetchval(self, query, *args):
+        self.queries.append(query)
+        if self.applied is None:
+            raise asyncpg.UndefinedTableError("schema_migrations")
+        return max(self.applied, default=None)
+
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        return [{'version': version} for version in self.applied or ()]
+
+    async def execute(self, query, *args):
+        self.queries.append(query)
+
+    def transaction(self):
+        return FakeContext(None)
+
+class FakeContext:
+    def __init__(self, value):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        return FakeContext(self.conn)
+
+def test_migrations_are_numbered_in_order():
+    versions = [migration.version for migration in load_migrations()]
+    assert versions == sorted(versions)
+    assert versions[0] == 1
+
+def test_duplicate_versions_are_rejected(tmp_path):
+    (tmp_path / '0001_a.sql').write_text('')
+    (tmp_path / '001_b.sql').write_text('')
+    with pytest.raises(ValueError):
+        load_migrations(tmp_path)
+
+@pytest.mark.asyncio
+async def test_current_schema_costs_one_query():
+    latest = load_migrations()[-1].version
+    conn = FakeConnection(applied=set(range(1, latest + 1)))
+
+    assert await migrate(FakePool(conn)) == 0
+    assert len(conn.queries) == 1
+
+@pytest.mark.asyncio
+async def test_pending_migrations_are_applied(tmp_path):
+    for name in ('0001_first.sql', '0002_second.sql', '0003_third.sql'):
+        (tmp_path / name).write_text(f"-- {name}")
+    conn = FakeConnection(applied={1})
+
+    assert await migrate(FakePool(conn), load_migrations(tmp_path)) == 2
+    scripts = [query for query in conn.queries if query.startswith('-- ')]
+    assert scripts == ['-- 0002_second.sql', '-- 0003_third.sql']
+    assert 'pg_advisory_unlock' in conn.queries[-1]
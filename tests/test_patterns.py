@@ -0,0 +1,64 @@
+import pytest
+from src.utils import patterns
+from src.utils.patterns import matches_document, parse_pattern, pattern_columns, pattern_from_record, to_document
+
+pytestmark = pytest.mark.skipif(not patterns.available(), reason="numpy et zstandard non installés")
+
+def test_round_trip():
+    document = {
+        'name': "drapeau",
+        'pixels': [["#ff0000", "#ffffff"], ["#ffffff", "#0000ff"], ["#ff0000", "#ff0000"]],
+        'size': [2, 3]
+    }
+    pattern = parse_pattern(document)
+    assert pattern.palette == ["#ff0000", "#ffffff", "#0000ff"]
+    assert (pattern.width, pattern.height) == (2, 3)
+    assert pattern.indices.tolist() == [[0, 1], [1, 2], [0, 0]]
+    assert to_document(pattern) == document
+
+def test_round_trip_mixed_values():
+    # 1, 1.0 et true sont des couleurs distinctes ; les listes restent des valeurs
+    document = [[1, 1.0, True], [[0, 0, 0], None, 1]]
+    pattern = parse_pattern(document)
+    assert len(pattern.palette) == 5
+    assert to_document(pattern) == document
+    assert [type(value) for value in to_document(pattern)[0]] == [int, float, bool]
+
+def test_signed_zero():
+    document = [[0.0, -0.0], [-0.0, 0.0]]
+    pattern = parse_pattern(document)
+    assert len(pattern.palette) == 2
+    assert matches_document(pattern, document)
+    assert not matches_document(pattern, [[0.0, 0.0], [0.0, 0.0]])
+
+def test_grid_key():
+    # La palette est une grille aussi : "pixels" est prioritaire, sinon la plus grande
+    palette = [["#000000", "#ffffff"]]
+    pixels = [["#000000"] * 4] * 4
+    assert parse_pattern({'palette': palette, 'pixels': pixels}).meta['key'] == 'pixels'
+    assert parse_pattern({'palette': palette, 'image': pixels}).meta['key'] == 'image'
+
+def test_documents_are_independent():
+    pattern = parse_pattern({'pixels': [[[0, 0, 0], [0, 0, 0]]], 'tags': ["a"]})
+    document = to_document(pattern)
+    document['pixels'][0][0].append(255)
+    document['tags'].append("b")
+    assert document['pixels'][0][1] == [0, 0, 0]
+    assert to_document(pattern) == {'pixels': [[[0, 0, 0], [0, 0, 0]]], 'tags': ["a"]}
+
+def test_stored_columns():
+    document = {'pixels': [[f"#{i:06x}" for i in range(300)]] * 4}
+    width, height, palette, pixels, meta = pattern_columns(parse_pattern(document))
+    assert (width, height) == (300, 4)
+    record = {
+        'json_data': None, 'pattern_width': width, 'pattern_height': height,
+        'pattern_palette': palette, 'pattern_pixels': pixels, 'pattern_meta': meta
+    }
+    pattern = pattern_from_record(record)
+    assert pattern.indices.dtype.itemsize == 2
+    assert to_document(pattern) == document
+
+def test_not_a_grid():
+    assert parse_pattern({'width': 42, 'height': 30}) is None
+    assert parse_pattern([[1, 2], [3]]) is None
+    assert pattern_columns(None) == (None, None, None, None, None)
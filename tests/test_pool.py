@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.database import queries
+from src.database.pool import InstrumentedPool
+
+class FakePool:
+    """Pool d'une seule connexion"""
+
+    def __init__(self, conn=None):
+        self.free = asyncio.Queue()
+        self.free.put_nowait(conn if conn is not None else object())
+
+    async def acquire(self, timeout=None):
+        return await asyncio.wait_for(self.free.get(), timeout)
+
+    async def release(self, conn):
+        self.free.put_nowait(conn)
+
+    def get_size(self):
+        return 1
+
+    def get_idle_size(self):
+        return self.free.qsize()
+
+    def get_min_size(self):
+        return 1
+
+    def get_max_size(self):
+        return 1
+
+@pytest.mark.asyncio
+async def test_acquire_is_measured():
+    pool = InstrumentedPool(FakePool(), acquire_timeout=0.05)
+
+    async with pool.acquire():
+        assert pool.stats()['in_use'] == 1
+        with pytest.raises(asyncio.TimeoutError):
+            async with pool.acquire():
+                pass
+
+    stats = pool.stats()
+    assert stats['acquires'] == 2
+    assert stats['timeouts'] == 1
+    assert stats['in_use'] == 0 and stats['idle'] == 1
+    assert stats['max_wait_ms'] >= 50
+
+@pytest.mark.asyncio
+async def test_other_attributes_are_forwarded():
+    pool = InstrumentedPool(FakePool())
+    assert pool.get_max_size() == 1
+
+@pytest.mark.asyncio
+async def test_warm_up_is_not_counted():
+    conn = Mock()
+    conn.fetch = AsyncMock(return_value=[])
+    pool = InstrumentedPool(FakePool(conn))
+    calls = queries.USER_TOKENS.calls
+
+    await pool.warm_up([(queries.USER_TOKENS, (1,))])
+
+    conn.fetch.assert_awaited_once_with(
+        queries.USER_TOKENS.sql, 1, record_class=queries.USER_TOKENS.record_class
+    )
+    assert queries.USER_TOKENS.calls == calls
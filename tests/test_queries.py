@@ -0,0 +1,24 @@
+import asyncpg
+import pytest
+from src.database import queries
+from src.database.models import UserToken
+from src.database.queries import QUERIES, Query, query_stats
+
+def test_query_names_are_unique():
+    with pytest.raises(ValueError):
+        Query('user_tokens', "SELECT 1")
+    assert QUERIES['user_tokens'] is queries.USER_TOKENS
+
+def test_record_classes():
+    assert issubclass(queries.USER_TOKENS.record_class, asyncpg.Record)
+    assert queries.USER_TOKENS.record_class is UserToken
+    assert UserToken.__slots__ == ()
+
+def test_query_stats():
+    query = QUERIES['vote_ranking']
+    query.calls, query.total_time = 4, 0.002
+    try:
+        stats = query_stats()
+        assert {'name': 'vote_ranking', 'calls': 4, 'total_ms': 2.0, 'avg_ms': 0.5} in stats
+    finally:
+        query.calls, query.total_time = 0, 0.0
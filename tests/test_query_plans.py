@@ -0,0 +1,230 @@
+"""
+Plans d'exécution des requêtes des services
+
+Les services sont exécutés sur des données synthétiques dans un schéma
+dédié, chaque requête envoyée est enregistrée puis repassée dans
+EXPLAIN (FORMAT JSON). Un parcours séquentiel d'une table de plus de
+SEQ_SCAN_THRESHOLD lignes fait échouer le test.
+
+Nécessite une base PostgreSQL de test, distincte de celle du bot (botdb_test
+est créée par docker/initdb) :
+    TEST_DATABASE_URL=postgresql://botuser:botpassword@db/botdb_test pytest tests/test_query_plans.py
+"""
+import json
+import os
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest.mock import Mock
+import asyncpg
+import discord
+import pytest
+import pytest_asyncio
+from src.database.migrator import migrate
+from src.services.channel_service import ChannelService
+from src.services.chat_expiry_service import ChatExpiryScheduler
+from src.services.private_channel_service import PrivateChannelService
+from src.services.token_invalidation_service import TokenInvalidator
+from src.services.token_service import TokenService
+from src.services.vote_service import VoteService
+
+DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL non défini")
+
+SCHEMA = 'query_plans'
+SEQ_SCAN_THRESHOLD = 1000
+
+TOKENS = 20_000
+VOTES = 20_000
+ACTIVE_VOTES = 100
+SESSIONS = 200
+PRIVATE_CHANNELS = 5_000
+
+SYNTHETIC_DATA = f"""
+    INSERT INTO user_tokens (discord_user_id, access_token, refresh_token, valid_token, expires_at, updated_at)
+    SELECT n, 'access-' || n, 'refresh-' || n, n % 10 <> 0,
+           CASE WHEN n % 2 = 0 THEN now() + (n % 1000) * interval '1 minute' END,
+           now() - (n % 5000) * interval '1 minute'
+    FROM generate_series(1, {TOKENS}) AS n;
+
+    UPDATE vote_sessions SET is_active = false;
+    INSERT INTO vote_sessions (number, is_active)
+    SELECT n, n = {SESSIONS} FROM generate_series(2, {SESSIONS}) AS n;
+    UPDATE bot_state SET value = jsonb_build_object('number', {SESSIONS}) WHERE key = 'vote_session';
+
+    INSERT INTO votes (title, image_name, created_by, channel_id, message_id, vote_count, session_id, is_active)
+    SELECT 'vote ' || n, 'pattern.png', n % 100, 1, n, n % 50,
+           CASE WHEN n > {VOTES - ACTIVE_VOTES} THEN {SESSIONS} ELSE 1 + n % ({SESSIONS} - 1) END,
+           n > {VOTES - ACTIVE_VOTES}
+    FROM generate_series(1, {VOTES}) AS n;
+
+    INSERT INTO guild_channels (guild_id, role, channel_id)
+    SELECT n, 'private_category', 1000000 + n FROM generate_series(1, 50) AS n;
+
+    INSERT INTO private_channels (guild_id, discord_user_id, channel_id)
+    SELECT 1, n, 2000000 + n FROM generate_series(1, {PRIVATE_CHANNELS}) AS n;
+
+    ANALYZE;
+"""
+
+class QueryRecorder:
+    """Enregistre les requêtes envoyées par les connexions du pool"""
+
+    def __init__(self):
+        self.queries = []
+        self.errors = []
+        self.full_scan = False
+
+    @contextmanager
+    def allow_full_scan(self):
+        """Exempte les requêtes lisant volontairement toute la table"""
+        self.full_scan = True
+        try:
+            yield
+        finally:
+            self.full_scan = False
+
+    async def init(self, conn: asyncpg.Connection) -> None:
+        conn.add_query_logger(self.log)
+
+    def log(self, record) -> None:
+        if record.exception:
+            self.errors.append((record.query, record.exception))
+        elif self.full_scan or ';' in record.query.strip().rstrip(';'):
+            # Les scripts à plusieurs commandes (réinitialisation du pool) ne
+            # peuvent pas passer dans EXPLAIN
+            return
+        elif record.query.lstrip().upper().startswith(('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')):
+            self.queries.append((record.query, record.args))
+
+@pytest_asyncio.fixture
+async def database():
+    conn = await asyncpg.connect(DATABASE_URL)
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}")
+    await conn.execute(f"SET search_path TO {SCHEMA}")
+
+    setup_pool = await asyncpg.create_pool(DATABASE_URL, server_settings={'search_path': SCHEMA})
+    await migrate(setup_pool)
+    await setup_pool.close()
+    await conn.execute(SYNTHETIC_DATA)
+
+    recorder = QueryRecorder()
+    pool = await asyncpg.create_pool(
+        DATABASE_URL,
+        server_settings={'search_path': SCHEMA},
+        init=recorder.init
+    )
+    yield pool, recorder, conn
+
+    await pool.close()
+    await conn.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+    await conn.close()
+
+def seq_scans(plan: dict):
+    """Tables parcourues séquentiellement dans un plan"""
+    if plan.get('Node Type') == 'Seq Scan':
+        yield plan['Relation Name']
+    for child in plan.get('Plans', ()):
+        yield from seq_scans(child)
+
+async def assert_no_large_seq_scan(conn: asyncpg.Connection, recorder: QueryRecorder) -> None:
+    assert not recorder.errors, recorder.errors
+    assert recorder.queries
+
+    row_counts = dict(await conn.fetch("""
+        SELECT relname, reltuples::bigint
+        FROM pg_class
+        WHERE relnamespace = $1::regnamespace AND relkind = 'r'
+    """, SCHEMA))
+
+    failures = []
+    for query, args in recorder.queries:
+        plan = json.loads(await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *args))[0]['Plan']
+        for table in seq_scans(plan):
+            if row_counts.get(table, 0) > SEQ_SCAN_THRESHOLD:
+                failures.append(f"Seq Scan sur {table} ({row_counts[table]} lignes):\n{query}")
+
+    assert not failures, "\n\n".join(failures)
+
+@pytest.mark.asyncio
+async def test_token_queries(database):
+    pool, recorder, conn = database
+    token_service = TokenService(pool)
+    now = discord.utils.utcnow()
+
+    await token_service.get_user_tokens(42)
+    await token_service.get_many_user_tokens([1, 2, 3])
+    with recorder.allow_full_scan():
+        await token_service.get_all_valid_tokens()
+    page = await token_service.get_tokens_page(15)
+    await token_service.get_tokens_page(15, after=(page[-1]['updated_at'], page[-1]['id']))
+    await token_service.get_tokens_page(15, before=(page[0]['updated_at'], page[0]['id']))
+    read = 0
+    async for _ in token_service.iter_valid_tokens(page_size=100):
+        read += 1
+        if read > 150:
+            break
+    await token_service.get_tokens_to_refresh(now + timedelta(minutes=10), now - timedelta(hours=24), 0, 200)
+    await token_service.get_tokens_batch(10_000, 500)
+    await token_service.get_tokens_stats()
+    await token_service.get_recent_activity(20)
+
+    await token_service.update_access_token(5, 'access')
+    await token_service.update_refresh_token(5, 'refresh')
+    await token_service.update_tokens(6, 'access', 'refresh')
+    await token_service.update_tokens(TOKENS + 1, 'access', 'refresh')
+    await token_service.update_token_validity(7, False)
+    await token_service.save_refreshed_tokens([(8, 'access', 'refresh', now)])
+    await token_service.save_token_validity([(9, False), (10, True)])
+    await token_service.remove_user_tokens(11)
+
+    invalidator = TokenInvalidator(token_service, pool, chunk_size=5000, delay=0)
+    await invalidator.begin()
+    await invalidator.run()
+
+    await assert_no_large_seq_scan(conn, recorder)
+
+@pytest.mark.asyncio
+async def test_vote_queries(database):
+    pool, recorder, conn = database
+    bot = Mock()
+    bot.get_channel.return_value = None
+    bot.user = None
+    vote_service = VoteService(bot, pool)
+    vote_service.update_vote_counts.cancel()
+    vote_service.flush_vote_counts.cancel()
+
+    await vote_service.get_current_vote_number()
+    await vote_service.increment_vote_number()
+    session = await vote_service.get_session_state()
+    await vote_service.get_session_votes(session['id'])
+    await vote_service.get_vote_ranking()
+    await vote_service.update_vote_counts()
+    async with pool.acquire() as vote_conn:
+        await VoteService.save_vote_counts(vote_conn, {VOTES: 3, VOTES - 1: 4})
+    assert await vote_service.close_session({VOTES: 5})
+
+    await assert_no_large_seq_scan(conn, recorder)
+
+@pytest.mark.asyncio
+async def test_channel_queries(database):
+    pool, recorder, conn = database
+    channel_index = ChannelService(pool)
+    private_channels = PrivateChannelService(pool)
+    bot = Mock()
+    bot.get_channel.return_value = None
+    bot.guilds = []
+    chat_expiry = ChatExpiryScheduler(bot, pool, timedelta(hours=24))
+
+    await channel_index.load()
+    await channel_index.set_channel(1, 'vote_session_1', 3000000)
+    await channel_index.remove_channel(3000000)
+    await private_channels.get_channel_id(1, 42)
+    await private_channels.get_owner_id(2000042)
+    await private_channels.register(1, 43, 3000001)
+    await private_channels.unregister(3000001)
+    with recorder.allow_full_scan():
+        await chat_expiry.load()
+    chat_expiry.touch(2000044)
+    await chat_expiry.flush_expiries()
+
+    await assert_no_large_seq_scan(conn, recorder)
@@ -0,0 +1,31 @@
+import io
+import pytest
+from datetime import datetime, timezone
+from src.utils.token_files import read_token_records, token_file_format
+
+def test_csv_and_jsonl_records_match():
+    csv_file = io.StringIO(
+        "discord_user_id,access_token,refresh_token,valid_token,expires_at\n"
+        "1,a,r,t,2024-01-01T10:00:00+00:00\n"
+        "2,b,,f,\n"
+    )
+    jsonl_file = io.StringIO(
+        '{"discord_user_id": 1, "access_token": "a", "refresh_token": "r", '
+        '"valid_token": true, "expires_at": "2024-01-01T10:00:00+00:00"}\n'
+        '\n'
+        '{"discord_user_id": 2, "access_token": "b", "valid_token": false}\n'
+    )
+
+    expected = [
+        (1, "a", "r", True, datetime(2024, 1, 1, 10, tzinfo=timezone.utc)),
+        (2, "b", "", False, None)
+    ]
+    assert list(read_token_records(csv_file, 'csv')) == expected
+    assert list(read_token_records(jsonl_file, 'jsonl')) == expected
+    assert token_file_format("backup.JSONL") == 'jsonl'
+    assert token_file_format("backup.csv") == 'csv'
+
+def test_invalid_line_is_reported():
+    records = read_token_records(io.StringIO('{"access_token": "a"}\n'), 'jsonl')
+    with pytest.raises(ValueError, match="Ligne 1"):
+        list(records)
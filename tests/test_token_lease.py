@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from src.services.token_lease_service import TokenLeasePool
+
+class FakeTokenService:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.listeners = []
+        self.invalidated = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    async def iter_valid_tokens(self, page_size=1000):
+        for discord_user_id, access_token in list(self.tokens.items()):
+            yield {'discord_user_id': discord_user_id, 'access_token': access_token}
+
+    async def get_many_user_tokens(self, discord_user_ids):
+        return {
+            discord_user_id: {'access_token': self.tokens[discord_user_id], 'valid_token': True}
+            for discord_user_id in discord_user_ids
+            if discord_user_id in self.tokens
+        }
+
+    async def update_token_validity(self, discord_user_id, valid):
+        self.invalidated.append(discord_user_id)
+        return True
+
+@pytest.mark.asyncio
+async def test_leases_are_exclusive_and_respect_cooldown():
+    pool = TokenLeasePool(FakeTokenService({1: "a", 2: "b"}), lease_duration=60, cooldown=0.05)
+    await pool.load()
+
+    first = await pool.acquire()
+    second = await pool.acquire()
+    assert {first.discord_user_id, second.discord_user_id} == {1, 2}
+    assert await pool.acquire(timeout=0.01) is None
+
+    pool.release(first)
+    assert await pool.acquire(timeout=0.01) is None
+    again = await pool.acquire(timeout=0.5)
+    assert again.discord_user_id == first.discord_user_id
+
+    # Un bail déjà rendu ne peut plus être rendu
+    pool.release(first)
+    assert await pool.acquire(timeout=0.1) is None
+
+@pytest.mark.asyncio
+async def test_quota_and_expired_leases():
+    pool = TokenLeasePool(FakeTokenService({1: "a"}), lease_duration=0.05, cooldown=0, quota=2, quota_window=60)
+    await pool.load()
+
+    await pool.acquire()
+    # Non rendu, le token redevient disponible à la fin du bail
+    lease = await pool.acquire(timeout=0.5)
+    assert lease is not None
+    pool.release(lease)
+    assert await pool.acquire(timeout=0.1) is None
+
+@pytest.mark.asyncio
+async def test_write_events_update_the_pool():
+    service = FakeTokenService({1: "a"})
+    pool = TokenLeasePool(service, cooldown=0)
+    await pool.load()
+
+    lease = await pool.acquire()
+    await pool.report_invalid(lease)
+    assert service.invalidated == [1]
+    assert len(pool) == 0
+
+    service.tokens[2] = "b"
+    for listener in service.listeners:
+        listener(2)
+    lease = await pool.acquire(timeout=0.5)
+    assert (lease.discord_user_id, lease.access_token) == (2, "b")
+
+@pytest.mark.asyncio
+async def test_reload_keeps_leases():
+    service = FakeTokenService({1: "a", 2: "b"})
+    pool = TokenLeasePool(service, cooldown=0)
+    await pool.load()
+    lease = await pool.acquire()
+
+    # Invalidation globale du cache (import) : rechargement complet
+    service.tokens[lease.discord_user_id] = "new"
+    for listener in service.listeners:
+        listener(None)
+    await asyncio.sleep(0.01)
+
+    other = await pool.acquire(timeout=0.1)
+    assert other.discord_user_id != lease.discord_user_id
+    assert await pool.acquire(timeout=0.05) is None
+
+    # Le bail d'avant le rechargement reste rendable
+    pool.release(lease)
+    again = await pool.acquire(timeout=0.1)
+    assert (again.discord_user_id, again.access_token) == (lease.discord_user_id, "new")
+
+@pytest.mark.asyncio
+async def test_failed_sync_is_retried(monkeypatch):
+    monkeypatch.setattr("src.services.token_lease_service.SYNC_RETRY_DELAY", 0)
+    service = FakeTokenService({1: "a"})
+    pool = TokenLeasePool(service)
+    await pool.load()
+
+    read = service.get_many_user_tokens
+    calls = []
+
+    async def flaky(discord_user_ids):
+        calls.append(discord_user_ids)
+        if len(calls) == 1:
+            raise ConnectionError("connexion perdue")
+        return await read(discord_user_ids)
+
+    service.get_many_user_tokens = flaky
+    service.tokens[2] = "b"
+    service.listeners[0](2)
+    await pool._sync_task
+
+    # La modification perdue par la première lecture est réappliquée
+    assert calls == [[2], [2]]
+    assert len(pool) == 2
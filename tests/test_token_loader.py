@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+from src.services.token_service import BatchLoader, TokenService
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_batched():
+    calls = []
+
+    async def load_many(keys):
+        calls.append(list(keys))
+        return {key: f"tokens-{key}" for key in keys if key != 3}
+
+    loader = BatchLoader(load_many)
+    results = await asyncio.gather(
+        loader.load(1),
+        loader.load(2),
+        loader.load(1),
+        loader.load(3)
+    )
+
+    # Une seule requête, sans doublon
+    assert calls == [[1, 2, 3]]
+    assert results == ["tokens-1", "tokens-2", "tokens-1", None]
+
+@pytest.mark.asyncio
+async def test_errors_are_propagated_to_every_waiter():
+    async def load_many(keys):
+        raise RuntimeError("db down")
+
+    loader = BatchLoader(load_many)
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+@pytest.mark.asyncio
+async def test_batches_are_split():
+    calls = []
+
+    async def load_many(keys):
+        calls.append(len(keys))
+        return {}
+
+    loader = BatchLoader(load_many, max_batch_size=2)
+    await asyncio.gather(*(loader.load(key) for key in range(5)))
+
+    assert sorted(calls) == [1, 2, 2]
+
+class SlowConnection:
+    """Connexion dont les lectures attendent un signal, puis renvoient la valeur courante"""
+
+    def __init__(self):
+        self.value = "old"
+        self.release = asyncio.Event()
+
+    async def fetchrow(self, query, *args, **kwargs):
+        value = self.value
+        await self.release.wait()
+        return value
+
+    async def fetch(self, query, *args, **kwargs):
+        value = self.value
+        await self.release.wait()
+        return [{'discord_user_id': discord_user_id, 'value': value} for discord_user_id in args[0]]
+
+class SlowPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        pool = self
+
+        class Context:
+            async def __aenter__(self):
+                return pool.conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Context()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('batch_reads', [False, True])
+async def test_reads_overlapping_a_write_are_not_cached(batch_reads):
+    conn = SlowConnection()
+    service = TokenService(SlowPool(conn), batch_reads=batch_reads)
+
+    read = asyncio.create_task(service.get_user_tokens(1))
+    await asyncio.sleep(0.01)
+    # Écriture pendant la lecture
+    conn.value = "new"
+    service.invalidate_cache(1)
+    conn.release.set()
+    await read
+
+    tokens = await service.get_user_tokens(1)
+    assert (tokens['value'] if batch_reads else tokens) == "new"
+    assert not service._reads
@@ -0,0 +1,103 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from unittest.mock import AsyncMock, Mock
+from src.services.token_refresh_service import TokenRefresher
+from src.utils.config import Config
+
+async def token_endpoint(request: web.Request) -> web.Response:
+    data = await request.post()
+    if data['refresh_token'] == 'revoked':
+        return web.json_response({'error': 'invalid_grant'}, status=400)
+    if data['refresh_token'] == 'rejected':
+        return web.json_response({'error': 'unsupported_grant_type'}, status=400)
+    if data['client_id'] == 'rotated':
+        return web.json_response({'error': 'invalid_client'}, status=401)
+    if data['refresh_token'] == 'flaky':
+        return web.json_response({'error': 'unavailable'}, status=503)
+    if data['refresh_token'] == 'incomplete':
+        return web.json_response({'token_type': 'Bearer'})
+    if data['refresh_token'] == 'malformed':
+        return web.json_response({'access_token': "new", 'expires_in': "soon"})
+    if data['refresh_token'] == 'not-an-object':
+        return web.json_response(["new"])
+    return web.json_response({
+        'access_token': f"new-{data['refresh_token']}",
+        'refresh_token': f"next-{data['refresh_token']}",
+        'expires_in': 3600
+    })
+
+@pytest_asyncio.fixture
+async def stub_server():
+    app = web.Application()
+    app.router.add_post('/token', token_endpoint)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/token"
+    await runner.cleanup()
+
+@pytest.mark.asyncio
+async def test_refresh_due_tokens(stub_server):
+    token_service = Mock()
+    token_service.get_tokens_to_refresh = AsyncMock(side_effect=[
+        [
+            {'id': 1, 'discord_user_id': 11, 'refresh_token': 'ok'},
+            {'id': 2, 'discord_user_id': 22, 'refresh_token': 'revoked'},
+            {'id': 3, 'discord_user_id': 33, 'refresh_token': 'flaky'},
+            {'id': 4, 'discord_user_id': 44, 'refresh_token': 'incomplete'},
+            {'id': 5, 'discord_user_id': 55, 'refresh_token': 'malformed'},
+            {'id': 6, 'discord_user_id': 66, 'refresh_token': 'not-an-object'},
+            {'id': 7, 'discord_user_id': 77, 'refresh_token': 'rejected'}
+        ],
+        []
+    ])
+    token_service.save_refreshed_tokens = AsyncMock(return_value=1)
+    token_service.update_token_validity = AsyncMock(return_value=True)
+
+    refresher = TokenRefresher(token_service, Config({
+        'token_url': stub_server,
+        'batch_size': 7
+    }))
+    refresher.start()
+    refresher.refresh_due_tokens.cancel()
+    try:
+        await refresher.refresh_due_tokens()
+    finally:
+        await refresher.close()
+
+    # Un seul UPDATE groupé pour les tokens rafraîchis
+    saved = token_service.save_refreshed_tokens.call_args.args[0]
+    assert [token[:3] for token in saved] == [(11, 'new-ok', 'next-ok')]
+    assert saved[0][3] is not None
+
+    # Seul le token refusé est invalidé, les erreurs temporaires sont ignorées
+    token_service.update_token_validity.assert_awaited_once_with(22, False)
+
+@pytest.mark.asyncio
+async def test_rejected_client_stops_pass(stub_server):
+    # Des identifiants du bot refusés n'invalident aucun token utilisateur
+    token_service = Mock()
+    token_service.get_tokens_to_refresh = AsyncMock(side_effect=[
+        [{'id': 1, 'discord_user_id': 11, 'refresh_token': 'ok'}],
+        [{'id': 2, 'discord_user_id': 22, 'refresh_token': 'ok'}]
+    ])
+    token_service.save_refreshed_tokens = AsyncMock(return_value=0)
+    token_service.update_token_validity = AsyncMock(return_value=True)
+
+    refresher = TokenRefresher(token_service, Config({
+        'token_url': stub_server,
+        'client_id': 'rotated',
+        'batch_size': 1
+    }))
+    refresher.start()
+    refresher.refresh_due_tokens.cancel()
+    try:
+        await refresher.refresh_due_tokens()
+    finally:
+        await refresher.close()
+
+    token_service.update_token_validity.assert_not_awaited()
+    assert token_service.get_tokens_to_refresh.await_count == 1
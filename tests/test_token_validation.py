@@ -0,0 +1,70 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from unittest.mock import AsyncMock, Mock
+from src.services.token_validation_service import TokenValidator
+from src.utils.config import Config
+
+async def validation_endpoint(request: web.Request) -> web.Response:
+    token = request.headers['Authorization'].split()[-1]
+    if token == 'revoked':
+        return web.json_response({'message': '401: Unauthorized'}, status=401)
+    if token == 'flaky':
+        return web.json_response({'message': 'unavailable'}, status=503)
+    return web.json_response({'id': '1'})
+
+@pytest_asyncio.fixture
+async def stub_server():
+    app = web.Application()
+    app.router.add_get('/users/@me', validation_endpoint)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/users/@me"
+    await runner.cleanup()
+
+@pytest.mark.asyncio
+async def test_validate_all(stub_server):
+    token_service = Mock()
+    token_service.get_tokens_batch = AsyncMock(side_effect=[
+        [
+            {'id': 1, 'discord_user_id': 11, 'access_token': 'ok'},
+            {'id': 2, 'discord_user_id': 22, 'access_token': 'revoked'}
+        ],
+        [
+            {'id': 3, 'discord_user_id': 33, 'access_token': 'flaky'}
+        ]
+    ])
+    token_service.save_token_validity = AsyncMock(return_value=1)
+    progress = AsyncMock()
+
+    validator = TokenValidator(token_service, Config({'url': stub_server, 'batch_size': 2}))
+    counts = await validator.validate_all(progress)
+
+    assert counts == {'checked': 3, 'valid': 1, 'invalid': 1, 'errors': 1, 'changed': 2}
+    # Une écriture par lot, limitée aux tokens refusés
+    writes = [call.args[0] for call in token_service.save_token_validity.call_args_list]
+    assert writes == [[(22, False)], []]
+    assert token_service.get_tokens_batch.call_args_list[1].args == (2, 2)
+    assert progress.call_count == 2
+    assert not validator.running
+
+@pytest.mark.asyncio
+async def test_validate_all_propagates_read_errors(stub_server):
+    # Un lot illisible interrompt la vérification au lieu de la terminer
+    token_service = Mock()
+    token_service.get_tokens_batch = AsyncMock(side_effect=[
+        [
+            {'id': 1, 'discord_user_id': 11, 'access_token': 'ok'},
+            {'id': 2, 'discord_user_id': 22, 'access_token': 'ok'}
+        ],
+        ConnectionError("connexion perdue")
+    ])
+    token_service.save_token_validity = AsyncMock(return_value=0)
+
+    validator = TokenValidator(token_service, Config({'url': stub_server, 'batch_size': 2}))
+    with pytest.raises(ConnectionError):
+        await validator.validate_all()
+    assert not validator.running
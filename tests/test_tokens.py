@@ -108,6 +108,7 @@ async def test_update_vote_counts(mock_bot, mock_vote_service):
     mock_channel = Mock(spec=discord.TextChannel)
     mock_message = Mock(spec=discord.Message)
     mock_reaction = Mock()
+    mock_reaction.emoji = "✅"
     mock_reaction.count = 6  # 5 votes + 1 pour le bot
     mock_message.reactions = [mock_reaction]
 
@@ -125,5 +126,5 @@ async def test_update_vote_counts(mock_bot, mock_vote_service):
     # Vérifier que la mise à jour a été effectuée
     mock_conn.execute.assert_called_once()
     args, kwargs = mock_conn.execute.call_args
-    assert args[1] == 5  # vote_count (6 - 1 pour le bot)
-    assert args[2] == 1  # vote_id
+    assert args[1] == [456]  # message_id
+    assert args[2] == [5]  # vote_count (6 - 1 pour le bot)
@@ -0,0 +1,73 @@
+import discord
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.services.vote_service import VoteService, VOTE_EMOJI
+
+def http_error(cls, status):
+    return cls(Mock(status=status, reason="error"), "error")
+
+def mock_pool(conn):
+    pool = Mock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+    return pool
+
+@pytest.mark.asyncio
+async def test_fetch_vote_counts_skips_unreadable_messages():
+    reaction = Mock(emoji=VOTE_EMOJI, count=4)
+    channel = Mock()
+    channel.fetch_message = AsyncMock(side_effect=[
+        Mock(reactions=[reaction]),
+        http_error(discord.Forbidden, 403),
+        http_error(discord.HTTPException, 503),
+        http_error(discord.NotFound, 404)
+    ])
+    bot = Mock()
+    bot.get_channel.return_value = channel
+    service = VoteService.__new__(VoteService)
+    service.bot = bot
+    service.logger = Mock()
+
+    votes = [{'channel_id': 1, 'message_id': message_id} for message_id in (10, 11, 12, 13)]
+    # Le vote du bot n'est pas compté ; les messages illisibles gardent leur décompte enregistré
+    assert await service.fetch_vote_counts(votes) == {10: 3}
+
+@pytest.mark.asyncio
+async def test_reactions_during_reconciliation_are_kept():
+    service = VoteService.__new__(VoteService)
+    service.bot = Mock(user=None)
+    service.logger = Mock()
+    service.vote_counts = {10: 2, 11: 5}
+    service._dirty_votes = set()
+    service._saved_counts = {}
+    service._reconciling = None
+    service.save_vote_counts = AsyncMock(return_value=1)
+    votes = [{'channel_id': 1, 'message_id': 10}, {'channel_id': 1, 'message_id': 11}]
+    conn = Mock()
+    conn.fetch = AsyncMock(return_value=votes)
+    service.db_pool = mock_pool(conn)
+
+    async def fetch_vote_counts(votes):
+        # Réaction reçue pendant la récupération : l'instantané de 11 est périmé
+        service.handle_reaction(Mock(message_id=11, emoji=VOTE_EMOJI, user_id=1), 1)
+        return {10: 3, 11: 5}
+    service.fetch_vote_counts = fetch_vote_counts
+
+    await service.update_vote_counts()
+
+    assert service.vote_counts == {10: 3, 11: 6}
+    assert service._dirty_votes == {11}
+    service.save_vote_counts.assert_awaited_once_with(conn, {10: 3})
+
+@pytest.mark.asyncio
+async def test_close_session_without_new_session():
+    service = VoteService.__new__(VoteService)
+    service.logger = Mock()
+    service._session = {'id': 1, 'number': 1}
+    conn = Mock()
+    conn.fetchrow = AsyncMock(return_value=None)
+    service.db_pool = mock_pool(conn)
+
+    assert await service.close_session({10: 3}) is None
+    assert service._session is None
+    service.logger.error.assert_called_once()